@@ -0,0 +1,556 @@
+"""Frame-time benchmark of the three demos, rendered headlessly.
+
+Each (demo, entity count) scene runs in its own process on an offscreen context
+(see headless.py) and records per-frame CPU and wall time, the number of GL/GLU
+calls issued by the demo code and the peak resident memory. Results are written
+as JSON so runs from different commits can be compared:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+
+--imports instead times importing each demo (and so OpenGL.GL) in a fresh process,
+with the eager and the lazy (PYOPENGL_LAZY_GL_IMPORT) OpenGL.GL import modes, and
+--calls times single GL calls with the generic wrappers, the generated
+(PYOPENGL_WRAPPER_CODEGEN) wrapper call functions and the scalar fast path
+(PYOPENGL_SCALAR_FAST_PATH), and with errors checked once per frame
+(PYOPENGL_DEFERRED_ERROR_CHECKING), and with glGet* state answered from the
+client-side cache (PYOPENGL_STATE_CACHE). --readback measures the frames per second
+of rendering and capturing every frame, with synchronous glReadPixels and
+through double and triple buffered pixel-pack buffers (PixelReadPipeline), and
+--shaders times creating a shader program from source and through the on-disk
+ProgramCache, in a first and a second process, and a set of programs one by one
+and through the batched, memoizing compilePrograms.
+"""
+import argparse
+import ctypes
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import headless
+
+# demo -> entity counts: balls, raindrops, or diamond (and minimum catcher) size in pixels
+SCENARIOS = {
+    'random_ball': [1000, 10000, 100000, 1000000],
+    'house_rainfall': [100, 10000, 100000, 1000000],
+    'catch_the_diamond': [25, 200, 600],
+}
+QUICK_SCENARIOS = {
+    'random_ball': [1000, 100000],
+    'house_rainfall': [100, 100000],
+    'catch_the_diamond': [25, 600],
+}
+
+
+def populate_random_ball(module, count):
+    import numpy as np
+    rng = np.random.default_rng(0)
+    angles = np.radians(rng.choice([45, 135, 225, 315], count))
+    speed = module.current_speed
+    module.points.clear()
+    module.points.add_many(
+        rng.uniform(-1, 1, (count, 2)),
+        np.stack([np.cos(angles), np.sin(angles)], axis=1) * speed,
+        rng.random((count, 3)),
+        False, 0.0,
+    )
+
+
+def populate_house_rainfall(module, count):
+    module.init_rain(count)
+    module.rain_angle = 20
+
+
+def populate_catch_the_diamond(module, size):
+    module.diamond_size = size
+    module.catcher_width = max(module.catcher_width, size)
+    module.spawn_diamond()
+
+
+POPULATE = {
+    'random_ball': populate_random_ball,
+    'house_rainfall': populate_house_rainfall,
+    'catch_the_diamond': populate_catch_the_diamond,
+}
+
+
+class CallCounter:
+    """Counts calls to the gl*/glu* functions the demo's own modules imported.
+
+    `fast` counts the calls to entry points bound by PyOpenGL's scalar fast path
+    (PYOPENGL_SCALAR_FAST_PATH).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.fast = 0
+
+    def install(self, demo_dir):
+        from OpenGL.platform import fastpath  # The demo's own PyOpenGL copy
+        for module in list(sys.modules.values()):
+            filename = getattr(module, '__file__', None) or ''
+            if not filename.startswith(demo_dir + os.sep) or os.sep + 'OpenGL' + os.sep in filename:
+                continue
+            namespace = vars(module)
+            for name, value in list(namespace.items()):
+                if name.startswith('gl') and name[2:3].isupper() or name.startswith('glu'):
+                    if callable(value) and not isinstance(value, type):
+                        namespace[name] = self._wrap(value, fastpath.is_routed(value))
+
+    def _wrap(self, function, fast):
+        if fast:
+            def counted(*args, **named):
+                self.count += 1
+                self.fast += 1
+                return function(*args, **named)
+        else:
+            def counted(*args, **named):
+                self.count += 1
+                return function(*args, **named)
+        return functools.wraps(function)(counted)
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS, KiB elsewhere
+
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        'mean': statistics.fmean(ordered),
+        'median': statistics.median(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1],
+    }
+
+
+def run_scene(demo, count, frames, warmup, dt):
+    """Runs one scene in this process and returns its measurements."""
+    runner = headless.HeadlessRunner(demo, setup=lambda module: POPULATE[demo](module, count))
+    from OpenGL.GL import glFinish  # The demo's own PyOpenGL copy, importable once the demo is loaded
+    counter = CallCounter()
+    counter.install(os.path.join(headless.ROOT, demo))
+    cpu_ms, wall_ms, calls, fast_calls = [], [], [], []
+    try:
+        for index in range(warmup + frames):
+            counter.count = counter.fast = 0
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            runner.frame(dt)
+            glFinish()
+            cpu_end, wall_end = time.process_time(), time.perf_counter()
+            if index >= warmup:
+                cpu_ms.append((cpu_end - cpu_start) * 1000.0)
+                wall_ms.append((wall_end - wall_start) * 1000.0)
+                calls.append(counter.count)
+                fast_calls.append(counter.fast)
+    finally:
+        runner.close()
+    return {
+        'demo': demo,
+        'count': count,
+        'frames': frames,
+        'cpu_ms': summarize(cpu_ms),
+        'wall_ms': summarize(wall_ms),
+        'gl_calls_per_frame': statistics.fmean(calls),
+        'fast_path_calls_per_frame': statistics.fmean(fast_calls),
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def time_import(demo):
+    """Seconds taken to import a demo, and the OpenGL.GL it star-imports, in this process."""
+    start = time.perf_counter()
+    headless.load_demo(demo)
+    return time.perf_counter() - start
+
+
+def run_worker(arguments, environ):
+    """Runs benchmark.py in a subprocess; returns the JSON of its last output line, or an error."""
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__)] + arguments,
+        capture_output=True, text=True, env=environ,
+    )
+    if process.returncode:
+        return {'error': process.stderr.strip().splitlines()[-1:]}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def run_imports(demos, runs):
+    """Times importing each demo in fresh processes, eager vs lazy OpenGL.GL."""
+    results = []
+    for demo in demos:
+        for lazy in (False, True):
+            environ = dict(os.environ, PYOPENGL_LAZY_GL_IMPORT='1' if lazy else '0')
+            seconds = []
+            for _ in range(runs):
+                seconds.append(run_worker(['--import-worker', demo], environ))
+                if isinstance(seconds[-1], dict):
+                    break
+            result = {'demo': demo, 'lazy': lazy}
+            if isinstance(seconds[-1], dict):
+                result.update(seconds[-1])
+            else:
+                result.update(runs=runs, import_ms=summarize([s * 1000.0 for s in seconds]))
+            results.append(result)
+            print('%s %s import: %s' % (
+                demo, 'lazy' if lazy else 'eager',
+                result.get('error') or '%.1f ms median' % result['import_ms']['median'],
+            ), file=sys.stderr)
+    return results
+
+
+# name -> (setup, statement) timed per call; setup runs once on the demo's context
+CALLS = {
+    'glVertex2f': ('glBegin(GL_POINTS)', 'glVertex2f(0.0, 0.0)'),
+    'glColor3f': ('', 'glColor3f(1.0, 0.5, 0.0)'),
+    'glDrawArrays': ('', 'glDrawArrays(GL_POINTS, 0, 0)'),
+    'glReadPixels': ('', 'glReadPixels(0, 0, 1, 1, GL_RGB, GL_UNSIGNED_BYTE)'),
+    'glVertexPointer': ('', 'glVertexPointer(2, GL_FLOAT, 0, vertices)'),
+    'glVertexPointer(ctypes)': ('', 'glVertexPointer(2, GL_FLOAT, 0, ctypes_vertices)'),
+    'glVertexPointer(bytes)': ('', 'glVertexPointer(2, GL_FLOAT, 0, bytes_vertices)'),
+    'glVertexPointer+glDrawArrays': (
+        'glEnableClientState(GL_VERTEX_ARRAY)',
+        'glVertexPointer(2, GL_FLOAT, 0, vertices); glDrawArrays(GL_POINTS, 0, 4)',
+    ),
+    'glGetIntegerv': ('', 'glGetIntegerv(GL_VIEWPORT)'),
+    'glGetDoublev': ('', 'glGetDoublev(GL_MODELVIEW_MATRIX)'),
+    'gluProject': ('from OpenGL.GLU import gluProject', 'gluProject(0.5, 0.5, 0.0)'),
+    'glLoadIdentity': ('', 'glLoadIdentity()'),
+    'glViewport': ('', 'glViewport(0, 0, 100, 100)'),
+}
+CALL_TEARDOWN = {
+    'glVertex2f': 'glEnd()',
+    'glVertexPointer+glDrawArrays': 'glDisableClientState(GL_VERTEX_ARRAY)',
+}
+
+
+def time_calls(demo, number):
+    """Nanoseconds per call of each CALLS statement, on the demo's own PyOpenGL copy."""
+    import timeit
+    import numpy as np
+    runner = headless.HeadlessRunner(demo)
+    namespace = {
+        'vertices': np.zeros((4, 2), dtype=np.float32),
+        'ctypes_vertices': (ctypes.c_float * 8)(),
+        'bytes_vertices': bytes(32),
+    }
+    exec('from OpenGL.GL import *', namespace)
+    timings = {}
+    try:
+        for name, (setup, statement) in CALLS.items():
+            exec(setup, namespace)
+            timer = timeit.Timer(statement, globals=namespace)
+            timer.timeit(number // 10)  # warm up: finalises the wrapper
+            timings[name] = min(timer.repeat(5, number)) / number * 1e9
+            exec(CALL_TEARDOWN.get(name, ''), namespace)
+    finally:
+        runner.close()
+    return timings
+
+
+# call benchmark mode -> PyOpenGL environment variables
+CALL_MODES = {
+    'generic': {},
+    'codegen': {'PYOPENGL_WRAPPER_CODEGEN': '1'},
+    'fast_path': {'PYOPENGL_SCALAR_FAST_PATH': '1'},
+    'deferred_errors': {'PYOPENGL_DEFERRED_ERROR_CHECKING': '1'},
+    'state_cache': {'PYOPENGL_STATE_CACHE': '1'},
+}
+
+
+def run_calls(demos, number):
+    """Times single GL calls in fresh processes, in each of the CALL_MODES."""
+    results = []
+    for demo in demos:
+        for mode, variables in CALL_MODES.items():
+            environ = dict(os.environ)
+            for other in CALL_MODES.values():
+                environ.update(dict.fromkeys(other, '0'))
+            environ.update(variables)
+            result = {'demo': demo, 'mode': mode, 'number': number}
+            timings = run_worker(['--call-worker', demo, '--call-number', str(number)], environ)
+            if 'error' in timings:
+                result.update(timings)
+            else:
+                result['ns_per_call'] = timings
+            results.append(result)
+            print('%s %s: %s' % (
+                demo, mode,
+                result.get('error') or ', '.join('%s %.0f ns' % item for item in timings.items()),
+            ), file=sys.stderr)
+    return results
+
+
+# readback benchmark mode -> pixel-pack buffers in flight, 0 reads each frame synchronously
+READBACK_MODES = {
+    'sync': 0,
+    'double_buffered': 2,
+    'triple_buffered': 3,
+}
+
+
+def time_readback(demo, frames, warmup):
+    """Frames per second rendering and reading back every frame, in each of the READBACK_MODES."""
+    runner = headless.HeadlessRunner(demo)
+    checksum = []
+
+    def consume(index, image):
+        checksum.append(int(image[0, 0, 0]))
+
+    fps = {}
+    try:
+        for mode, buffers in READBACK_MODES.items():
+            runner.run(warmup, on_frame=consume, buffers=buffers)
+            start = time.perf_counter()
+            runner.run(frames, on_frame=consume, buffers=buffers)
+            fps[mode] = frames / (time.perf_counter() - start)
+    finally:
+        runner.close()
+    return fps
+
+
+def run_readback(demos, frames, warmup):
+    """Measures frame capture throughput of each demo in a fresh process."""
+    results = []
+    for demo in demos:
+        result = {'demo': demo, 'frames': frames}
+        fps = run_worker(['--readback-worker', demo, '--frames', str(frames), '--warmup', str(warmup)], os.environ)
+        if 'error' in fps:
+            result.update(fps)
+        else:
+            result['fps'] = fps
+        results.append(result)
+        print('%s readback: %s' % (
+            demo, result.get('error') or ', '.join('%s %.1f fps' % item for item in fps.items()),
+        ), file=sys.stderr)
+    return results
+
+
+# point-sprite ball shaders standing in for a shader-based scene, for --shaders
+SHADER_SOURCES = (
+    ('GL_VERTEX_SHADER', """#version 120
+uniform float point_scale;
+varying vec4 color;
+void main() {
+    gl_Position = gl_ModelViewProjectionMatrix * gl_Vertex;
+    gl_PointSize = max(1.0, point_scale / gl_Position.w);
+    color = gl_Color;
+}
+"""),
+    ('GL_FRAGMENT_SHADER', """#version 120
+varying vec4 color;
+void main() {
+    vec2 offset = gl_PointCoord - vec2(0.5);
+    float distance = dot(offset, offset);
+    if (distance > 0.25) discard;
+    float light = 1.0 - 2.0 * distance;
+    gl_FragColor = vec4(color.rgb * light, color.a);
+}
+"""),
+)
+
+SHADER_VARIANTS = 8
+
+
+def time_shaders(demo, directory):
+    """Milliseconds to build SHADER_SOURCES from source, and through a ProgramCache in directory."""
+    runner = headless.HeadlessRunner(demo)
+    from OpenGL import GL
+    from OpenGL.GL import shaders
+    try:
+        # a unique comment keeps the driver's own shader cache out of the compile timing
+        nonce = '// %r\n' % time.time()
+        start = time.perf_counter()
+        shaders.compileProgram(*[
+            shaders.compileShader(source + nonce, getattr(GL, kind)) for kind, source in SHADER_SOURCES
+        ])
+        compile_ms = (time.perf_counter() - start) * 1000.0
+        # the same sources in both processes of one benchmark run, new ones for every run
+        tag = '// %s\n' % directory
+        cache = shaders.ProgramCache(directory)
+        start = time.perf_counter()
+        cache.compileProgram(*[(source + tag, getattr(GL, kind)) for kind, source in SHADER_SOURCES])
+        cache_ms = (time.perf_counter() - start) * 1000.0
+        # SHADER_VARIANTS programs sharing the vertex shader: one by one, batched, batched again (memoized)
+        def variants(tag):
+            return [
+                [(source.replace('1.0 - 2.0', '1.0 - %d.0' % (index + 2)) + tag, getattr(GL, kind))
+                 for kind, source in SHADER_SOURCES]
+                for index in range(SHADER_VARIANTS)
+            ]
+        start = time.perf_counter()
+        for program in variants(nonce + '// serial\n'):
+            shaders.compileProgram(*[shaders.compileShader(source, kind) for source, kind in program])
+        serial_ms = (time.perf_counter() - start) * 1000.0
+        batch = variants(nonce + '// batch\n')
+        start = time.perf_counter()
+        shaders.compilePrograms(*batch)
+        batch_ms = (time.perf_counter() - start) * 1000.0
+        start = time.perf_counter()
+        shaders.compilePrograms(*batch)
+        memoized_ms = (time.perf_counter() - start) * 1000.0
+    finally:
+        runner.close()
+    return {
+        'compile_ms': compile_ms, 'program_cache_ms': cache_ms, 'program_cache': cache.stats,
+        'variants': SHADER_VARIANTS, 'serial_ms': serial_ms, 'batch_ms': batch_ms, 'memoized_ms': memoized_ms,
+    }
+
+
+def run_shaders(demos):
+    """Times program creation in two fresh processes sharing an empty program cache."""
+    import tempfile
+    results = []
+    for demo in demos:
+        with tempfile.TemporaryDirectory() as directory:
+            for run in ('first_run', 'second_run'):
+                result = {'demo': demo, 'run': run}
+                result.update(run_worker(['--shader-worker', demo, '--shader-cache', directory], os.environ))
+                results.append(result)
+                print('%s shaders %s: %s' % (
+                    demo, run,
+                    result.get('error') or (
+                        'compile %.2f ms, program cache %.2f ms, '
+                        '%d programs serial %.2f ms, batch %.2f ms, memoized %.2f ms' % (
+                            result['compile_ms'], result['program_cache_ms'], result['variants'],
+                            result['serial_ms'], result['batch_ms'], result['memoized_ms'],
+                        )
+                    ),
+                ), file=sys.stderr)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=headless.ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Prints the median CPU frame time of each scene against a previous run."""
+    previous = {(r['demo'], r['count']): r for r in baseline['results']}
+    for result in results:
+        old = previous.get((result['demo'], result['count']))
+        if old is None or 'error' in result or 'error' in old:
+            continue
+        before, after = old['cpu_ms']['median'], result['cpu_ms']['median']
+        print('%-18s %8d  %9.2f ms -> %9.2f ms  (x%.2f)' % (
+            result['demo'], result['count'], before, after, before / after if after else float('inf'),
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--demo', action='append', choices=sorted(SCENARIOS), help='demo to run (repeatable), default all')
+    parser.add_argument('--counts', help='comma-separated entity counts overriding the defaults')
+    parser.add_argument('--quick', action='store_true', help='run a reduced set of entity counts')
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--dt', type=float, default=1.0 / 60)
+    parser.add_argument('--output', help='JSON file to write, default stdout')
+    parser.add_argument('--compare', help='previous JSON result to compare against')
+    parser.add_argument('--imports', action='store_true', help='benchmark import time, eager vs lazy OpenGL.GL')
+    parser.add_argument('--import-runs', type=int, default=5, help='processes per demo and import mode')
+    parser.add_argument('--import-worker', metavar='DEMO', help=argparse.SUPPRESS)
+    parser.add_argument('--calls', action='store_true', help='benchmark per-call overhead in each of the CALL_MODES')
+    parser.add_argument('--call-number', type=int, default=100000, help='calls per timing')
+    parser.add_argument('--call-worker', metavar='DEMO', help=argparse.SUPPRESS)
+    parser.add_argument('--readback', action='store_true', help='benchmark frame capture, synchronous vs pixel-pack buffers')
+    parser.add_argument('--readback-worker', metavar='DEMO', help=argparse.SUPPRESS)
+    parser.add_argument('--shaders', action='store_true', help='benchmark shader program creation, compiled vs ProgramCache')
+    parser.add_argument('--shader-worker', metavar='DEMO', help=argparse.SUPPRESS)
+    parser.add_argument('--shader-cache', help=argparse.SUPPRESS)
+    parser.add_argument('--worker', nargs=2, metavar=('DEMO', 'COUNT'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        demo, count = args.worker[0], int(args.worker[1])
+        print(json.dumps(run_scene(demo, count, args.frames, args.warmup, args.dt)))
+        return
+    if args.import_worker:
+        print(repr(time_import(args.import_worker)))
+        return
+    if args.call_worker:
+        print(json.dumps(time_calls(args.call_worker, args.call_number)))
+        return
+    if args.readback_worker:
+        print(json.dumps(time_readback(args.readback_worker, args.frames, args.warmup)))
+        return
+    if args.shader_worker:
+        print(json.dumps(time_shaders(args.shader_worker, args.shader_cache)))
+        return
+
+    scenarios = QUICK_SCENARIOS if args.quick else SCENARIOS
+    results = []
+    demos = args.demo or sorted(scenarios)
+    imports = calls = readback = programs = None
+    if args.imports:
+        imports, demos = run_imports(demos, args.import_runs), []
+    elif args.calls:
+        calls, demos = run_calls(demos, args.call_number), []
+    elif args.readback:
+        readback, demos = run_readback(demos, args.frames, args.warmup), []
+    elif args.shaders:
+        programs, demos = run_shaders(demos), []
+    for demo in demos:
+        counts = [int(c) for c in args.counts.split(',')] if args.counts else scenarios[demo]
+        for count in counts:
+            # One process per scene: demos cannot share a process and peak memory stays per scene
+            process = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', demo, str(count),
+                 '--frames', str(args.frames), '--warmup', str(args.warmup), '--dt', repr(args.dt)],
+                capture_output=True, text=True,
+            )
+            if process.returncode:
+                result = {'demo': demo, 'count': count, 'error': process.stderr.strip().splitlines()[-1:]}
+            else:
+                result = json.loads(process.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print('%s %d: %s' % (
+                demo, count,
+                result.get('error') or '%.2f ms CPU median' % result['cpu_ms']['median'],
+            ), file=sys.stderr)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': os.environ.get('PYOPENGL_PLATFORM', 'egl'),
+        'frames': args.frames,
+        'results': results,
+    }
+    if imports is not None:
+        report['imports'] = imports
+    if calls is not None:
+        report['calls'] = calls
+    if readback is not None:
+        report['readback'] = readback
+    if programs is not None:
+        report['shaders'] = programs
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
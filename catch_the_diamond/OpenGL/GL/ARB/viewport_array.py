@@ -69,4 +69,9 @@ glGetFloati_v=wrapper.wrapper(glGetFloati_v).setOutput(
 glGetDoublei_v=wrapper.wrapper(glGetDoublei_v).setOutput(
     'data',size=_glgets._glget_size_mapping,pnameArg='target',orPassIn=True
 )
-### END AUTOGENERATED SECTION
\ No newline at end of file
+### END AUTOGENERATED SECTION
+
+from OpenGL import STATE_CACHE as _STATE_CACHE
+if _STATE_CACHE:
+    from OpenGL.GL import statecache as _statecache
+    _statecache.install( globals() )
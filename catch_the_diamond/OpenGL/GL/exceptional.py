@@ -15,6 +15,8 @@ __all__ = [
     'glColor',
     'glDeleteTextures',
     'glEnd',
+    'glFinish',
+    'glFlush',
     'glMap1d',
     'glMap1f',
     'glMap2d',
@@ -47,6 +49,23 @@ else:
     glBegin = full.glBegin
     glEnd = full.glEnd
 
+if _configflags.ERROR_CHECKING and _configflags.DEFERRED_ERROR_CHECKING:
+    @_lazy( full.glFinish )
+    def glFinish( baseFunction ):
+        """Finish all GL operations, then raise any deferred GL error"""
+        result = baseFunction( )
+        _errors._error_checker.checkDeferred( baseFunction )
+        return result
+    @_lazy( full.glFlush )
+    def glFlush( baseFunction ):
+        """Flush GL operations, then raise any deferred GL error"""
+        result = baseFunction( )
+        _errors._error_checker.checkDeferred( baseFunction )
+        return result
+else:
+    glFinish = full.glFinish
+    glFlush = full.glFlush
+
 @_lazy( full.glDeleteTextures )
 def glDeleteTextures( baseFunction, size, array=_NULL ):
     """Delete specified set of textures
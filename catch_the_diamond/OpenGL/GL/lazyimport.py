@@ -0,0 +1,138 @@
+"""On-demand loading of the OpenGL.GL VERSION modules (see OpenGL.LAZY_GL_IMPORT)
+
+With LAZY_GL_IMPORT set, OpenGL.GL only imports the OpenGL 1.0/1.1 core
+eagerly.  Every name defined by the VERSION.GL_1_2 ... GL_4_6 modules is
+looked up in a precomputed name -> module index (OpenGL.GL._lazyimport_index)
+and the module is imported, and its wrappers built, the first time one of
+its names is accessed as an attribute of OpenGL.GL or imported by name::
+
+    from OpenGL.GL import *                 # core 1.0/1.1 API only
+    from OpenGL.GL import glGenBuffers      # loads VERSION.GL_1_5
+    GL.glUseProgram                         # loads VERSION.GL_2_0
+
+Note that ``from OpenGL.GL import *`` cannot trigger the lazy lookup, so in
+lazy mode it only provides the eagerly loaded core names.  The few core
+functions a later VERSION module re-declares (e.g. glGetPointerv in GL_4_3)
+keep their core 1.1 wrappers in lazy mode.
+
+The index must be regenerated whenever the VERSION modules change::
+
+    python -m OpenGL.GL.lazyimport
+"""
+import importlib, os, types
+
+LAZY_MODULES = tuple(
+    'OpenGL.GL.VERSION.GL_%s' % (version,)
+    for version in (
+        '1_2', '1_3', '1_4', '1_5', '2_0', '2_1',
+        '3_0', '3_1', '3_2', '3_3',
+        '4_0', '4_1', '4_2', '4_3', '4_4', '4_5', '4_6',
+    )
+)
+# Modules imported eagerly by OpenGL.GL before the lazy ones
+CORE_MODULES = (
+    'OpenGL.GL.VERSION.GL_1_1',
+    'OpenGL.GL.pointers',
+    'OpenGL.GL.images',
+    'OpenGL.GL.exceptional',
+    'OpenGL.GL.glget',
+)
+
+def _public( module ):
+    """Names a star-import of module provides"""
+    namespace = vars( module )
+    names = getattr( module, '__all__', None )
+    if names is not None:
+        return dict( (name, namespace[name]) for name in names )
+    return dict(
+        (name, value) for (name, value) in namespace.items()
+        if not name.startswith( '_' )
+        # submodules (glget, imaging...) are package attributes, not API
+        and not isinstance( value, types.ModuleType )
+    )
+
+def build_index():
+    """Compute {module name: (names,...)} the way OpenGL.GL's star-imports resolve
+
+    A name is attributed to the last lazy module defining it (later star-imports
+    win), and core names are only listed when a lazy module replaces a core
+    function with a different wrapper (e.g. glGetPointerv from GL_4_3).
+    """
+    core = {}
+    for name in CORE_MODULES:
+        core.update( _public( importlib.import_module( name )))
+    owners = {}
+    for module_name in LAZY_MODULES:
+        for name, value in _public( importlib.import_module( module_name )).items():
+            if name in core:
+                current = core[name]
+                if current is value or not callable( value ) or isinstance( value, type ):
+                    continue
+            owners[name] = module_name
+    index = dict( (module_name, []) for module_name in LAZY_MODULES )
+    for name, module_name in owners.items():
+        index[module_name].append( name )
+    return dict( (key, tuple(sorted(value))) for (key, value) in index.items() )
+
+def write_index( filename=None ):
+    """Regenerate OpenGL/GL/_lazyimport_index.py"""
+    if filename is None:
+        filename = os.path.join( os.path.dirname( __file__ ), '_lazyimport_index.py' )
+    index = build_index()
+    with open( filename, 'w' ) as fh:
+        fh.write( '"""Name index for OpenGL.GL.lazyimport, generated by "python -m OpenGL.GL.lazyimport", do not edit"""\n' )
+        fh.write( 'INDEX = {\n' )
+        for module_name in LAZY_MODULES:
+            fh.write( '    %r: (\n' % (module_name,) )
+            for name in index[module_name]:
+                fh.write( '        %r,\n' % (name,) )
+            fh.write( '    ),\n' )
+        fh.write( '}\n' )
+    return filename
+
+class LazyNamespace( object ):
+    """Resolves missing attributes of a module namespace from the lazy index"""
+    def __init__( self, namespace, index, wrap=None ):
+        """Index namespace's lazy names
+
+        wrap -- if not None, wrap( name, value ) is published instead of
+            each lazily loaded value (see OpenGL.GL.statecache.wrap)
+        """
+        self.namespace = namespace
+        self.wrap = wrap
+        self.owners = {}
+        for module_name, names in index.items():
+            for name in names:
+                self.owners[name] = module_name
+        # core names a lazy module re-declares (glGetPointerv...) keep their
+        # core binding, so a star-import still provides the whole core API
+        for name in [name for name in self.owners if name in namespace]:
+            del self.owners[name]
+        self.loaded = set()
+    def load( self, module_name ):
+        """Import a lazy module and publish all of its indexed names"""
+        module = importlib.import_module( module_name )
+        if module_name not in self.loaded:
+            self.loaded.add( module_name )
+            for name, owner in self.owners.items():
+                if owner == module_name:
+                    value = getattr( module, name )
+                    if self.wrap is not None:
+                        value = self.wrap( name, value )
+                    self.namespace[name] = value
+        return module
+    def resolve( self, name ):
+        """Module-level __getattr__ implementation"""
+        module_name = self.owners.get( name )
+        if module_name is None:
+            raise AttributeError(
+                "module %r has no attribute %r" % (self.namespace.get( '__name__' ), name)
+            )
+        self.load( module_name )
+        return self.namespace[name]
+    def names( self ):
+        """Module-level __dir__ implementation"""
+        return sorted( set( self.namespace ) | set( self.owners ))
+
+if __name__ == "__main__":
+    print( write_index() )
@@ -11,4 +11,9 @@ from OpenGL.GLU.glunurbs import *
 import ctypes
 
 gluErrorString.restype = ctypes.c_char_p
-gluGetString.restype = ctypes.c_char_p
\ No newline at end of file
+gluGetString.restype = ctypes.c_char_p
+
+from OpenGL import STATE_CACHE as _STATE_CACHE
+if _STATE_CACHE:
+    from OpenGL.GL import statecache as _statecache
+    _statecache.install( globals() )
\ No newline at end of file
@@ -177,6 +177,75 @@ import occurs the flags should no longer be changed.
         annotations dictionary are generally either ctypes types or 
         ArrayDataType references, so this isn't *likely* to be all that useful
         without further work.
+
+    LAZY_GL_IMPORT -- if True, OpenGL.GL only imports the OpenGL 1.0/1.1
+        core when it is imported, and loads the OpenGL 1.2 to 4.6 VERSION
+        modules the first time one of their names is accessed (see
+        OpenGL.GL.lazyimport).  This considerably reduces start-up time,
+        but ``from OpenGL.GL import *`` then only provides the core names,
+        later entry points must be imported by name or accessed as
+        attributes of OpenGL.GL.
+
+        Default: False
+
+    WRAPPER_CODEGEN -- if True, and OpenGL_accelerate is not available,
+        each wrapper's call is a generated straight-line function for its
+        exact converter layout instead of the generic generator-based
+        pipeline (see OpenGL.wrappercodegen).  Generated code is cached
+        on disk, in $PYOPENGL_WRAPPER_CODEGEN_CACHE or ~/.cache/pyopengl.
+
+        Default: False
+
+    SCALAR_FAST_PATH -- if True, core GL entry points taking only scalar
+        arguments (glVertex2f, glColor3f, glPointSize...) are bound directly
+        to their ctypes functions when declared, and the immediate-mode
+        attribute calls valid inside glBegin/glEnd (glVertex*, glColor*,
+        glNormal*, glTexCoord*...) skip the per-call error check (see
+        OpenGL.platform.fastpath).  Ignored with CONTEXT_CHECKING,
+        ERROR_LOGGING or FULL_LOGGING.
+
+        Default: False
+
+    DEFERRED_ERROR_CHECKING -- if True (and ERROR_CHECKING is True), GL
+        calls do not call glGetError after each call, they are only
+        recorded in a small ring buffer and errors are checked at sync
+        points: glFinish, glFlush and glutSwapBuffers, or explicitly with
+        OpenGL.error.checkDeferredErrors().  The GLError raised names the
+        oldest call since the last clean check and lists the recorded
+        calls (see GLError.recentCalls), trading exact attribution for
+        one glGetError per frame.  If more calls were made than the ring
+        buffer holds, it names the sync point (see GLError.droppedCalls).
+
+        Default: False
+
+    OBJECT_POOL -- if True, VBO buffer names come from a per-context
+        OpenGL.objectpool.ObjectPool, which generates names in batches and
+        recycles released names by size class.  Deleted or collected VBOs
+        hand their names back to the pool without calling GL, the names the
+        pool does not keep are deleted in one call at the next frame
+        boundary (glutSwapBuffers or OpenGL.objectpool.end_frame()).
+
+        Default: False
+
+    READBACK_POOL -- if True, glReadPixels and glGetTexImage return arrays
+        from a per-context OpenGL.images.ImageBufferPool when no array is
+        passed in: each read of the same format, type and size returns the
+        same array, overwritten by the next one.  (Reads returning bytes
+        always use the pool for their temporary array.)
+
+        Default: False
+
+    STATE_CACHE -- if True, OpenGL.GL and OpenGL.GLU answer glGetBooleanv,
+        glGetIntegerv, glGetFloatv and glGetDoublev queries of the matrices,
+        matrix stack depths, viewport, matrix mode, pixel map sizes and
+        implementation limits from a per-context cache, which glViewport,
+        glMatrixMode, glLoadIdentity and the other matrix calls, gluOrtho2D,
+        gluPerspective, gluLookAt, glPixelMap*, glActiveTexture (for the
+        texture matrix) and glPopAttrib invalidate.
+        State changed behind PyOpenGL's back must be followed by
+        OpenGL.GL.statecache.invalidate().  See OpenGL.GL.statecache.
+
+        Default: False
 """
 from OpenGL.version import __version__
 import os
@@ -209,6 +278,13 @@ ALLOW_NUMPY_SCALARS = environ_key("ALLOW_NUMPY_SCALARS", False)
 UNSIGNED_BYTE_IMAGES_AS_STRING = environ_key("UNSIGNED_BYTE_IMAGES_AS_STRING", True)
 MODULE_ANNOTATIONS = False
 TYPE_ANNOTATIONS = False
+LAZY_GL_IMPORT = environ_key("LAZY_GL_IMPORT", False)
+WRAPPER_CODEGEN = environ_key("WRAPPER_CODEGEN", False)
+SCALAR_FAST_PATH = environ_key("SCALAR_FAST_PATH", False)
+DEFERRED_ERROR_CHECKING = environ_key("DEFERRED_ERROR_CHECKING", False)
+OBJECT_POOL = environ_key("OBJECT_POOL", False)
+READBACK_POOL = environ_key("READBACK_POOL", False)
+STATE_CACHE = environ_key("STATE_CACHE", False)
 
 
 # Declarations of plugins provided by PyOpenGL itself
@@ -358,6 +434,8 @@ FormatHandler(
         "OpenGL.arrays._buffers.Py_buffer",
         _bi + ".memoryview",
         _bi + ".bytearray",
+        "array.array",
+        "mmap.mmap",
     ],
     isOutput=True,
 )
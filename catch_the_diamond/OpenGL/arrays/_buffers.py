@@ -78,7 +78,8 @@ class Py_buffer(ctypes.Structure):
         if self.obj:
             ReleaseBuffer( self )
     def __del__( self ):
-        if self.obj:
+        # ReleaseBuffer is already gone if we are collected at interpreter exit
+        if self.obj and ReleaseBuffer is not None:
             ReleaseBuffer( self )
     
 BUFFER_POINTER = ctypes.POINTER( Py_buffer )
@@ -108,8 +108,9 @@ else:
             dataType = typ.typeConstant
             arraySize = typ.arraySize
             expectedBytes = ctypes.sizeof( typ.baseType ) * size
+            dispatch = typ.getRegistry().dispatch.get
             def asArraySize( incoming, function, args ):
-                handler = typ.getHandler( incoming )
+                handler = dispatch( incoming.__class__ ) or typ.getHandler( incoming )
                 result = handler.asArray( incoming, dataType )
                 # check that the number of bytes expected is present...
                 byteSize = handler.arrayByteCount( result )
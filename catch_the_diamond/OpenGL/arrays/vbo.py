@@ -33,27 +33,38 @@ implementation of the VBO functions.
 from OpenGL.arrays.arraydatatype import ArrayDatatype
 from OpenGL.arrays.formathandler import FormatHandler
 from OpenGL.raw.GL import _types 
-from OpenGL import error
+from OpenGL import error, _configflags
 from OpenGL._bytes import bytes,unicode,as_8_bit
 import ctypes,logging
 _log = logging.getLogger( 'OpenGL.arrays.vbo' )
 from OpenGL._bytes import long, integer_types
 
-import weakref
-__all__ = ('VBO','VBOHandler','mapVBO')
+import weakref, importlib, bisect
+__all__ = ('VBO','VBOHandler','StreamingVBO','mapVBO')
 
 class Implementation( object ):
     """Abstraction point for the various implementations that can be used
     """
     IMPLEMENTATION_CLASSES = []
+    IMPLEMENTATION_MODULES = []
     CHOSEN = None
     @classmethod
     def register( cls ):
         cls.IMPLEMENTATION_CLASSES.append( cls )
+    @classmethod
+    def register_module( cls, module ):
+        """Register a module (name) that registers implementations when imported
+
+        The module is only imported when an implementation is first needed,
+        used by OpenGL.GL when LAZY_GL_IMPORT is set.
+        """
+        cls.IMPLEMENTATION_MODULES.append( module )
     
     @classmethod 
     def get_implementation( cls, *args ):
         if cls.CHOSEN is None:
+            while cls.IMPLEMENTATION_MODULES:
+                importlib.import_module( cls.IMPLEMENTATION_MODULES.pop(0) )
             for possible in cls.IMPLEMENTATION_CLASSES:
                 implementation = possible()
                 if possible:
@@ -82,7 +93,35 @@ class Implementation( object ):
     GL_UNIFORM_BUFFER
     GL_TEXTURE_BUFFER
     GL_TRANSFORM_FEEDBACK_BUFFER'''.split()
+    # used by StreamingVBO when the GL provides them, see load_optional
+    OPTIONAL_NAMES = '''glMapBufferRange
+    glBufferStorage
+    glFenceSync
+    glClientWaitSync
+    glDeleteSync
+    GL_MAP_WRITE_BIT
+    GL_MAP_INVALIDATE_RANGE_BIT
+    GL_MAP_UNSYNCHRONIZED_BIT
+    GL_MAP_PERSISTENT_BIT
+    GL_MAP_COHERENT_BIT
+    GL_SYNC_GPU_COMMANDS_COMPLETE
+    GL_SYNC_FLUSH_COMMANDS_BIT
+    GL_ALREADY_SIGNALED
+    GL_TIMEOUT_EXPIRED
+    GL_WAIT_FAILED'''.split()
     available = False
+    def load_optional( self, *sources ):
+        """Set each of OPTIONAL_NAMES from the first source defining it (None if none does)"""
+        for name in self.OPTIONAL_NAMES:
+            value = None
+            for source in sources:
+                value = getattr( source, name, None )
+                if value is not None:
+                    break
+            setattr( self, name, value )
+    def supports( self, *names ):
+        """Are all the given (optional) entry points available?"""
+        return all( getattr( self, name, None ) for name in names )
     def _arbname( self, name ):
         return (
             (name.startswith( 'gl' ) and name.endswith( 'ARB' )) or
@@ -123,6 +162,25 @@ class Implementation( object ):
             except KeyError as err:
                 pass
         return doBufferDeletion
+    def pool_deleter( self, pool, buffers, size, key ):
+        """Produce a deleter callback returning the given buffer to an object pool
+
+        Unlike deleter, this does not call GL, the pool deletes or recycles
+        the name at its next end_frame.
+        """
+        def doBufferRelease( *args, **named ):
+            while buffers:
+                try:
+                    buffer = buffers.pop()
+                except IndexError as err:
+                    break
+                else:
+                    pool.release( 'buffer', buffer, size )
+            try:
+                self._DELETERS_.pop( key )
+            except KeyError as err:
+                pass
+        return doBufferRelease
     _DELETERS_ = {}
 
 get_implementation = Implementation.get_implementation
@@ -197,7 +255,19 @@ if VBO is None:
             self.target = target
             self.buffers = []
             self._copy_segments = []
+            self._dirty_bytes = 0
+            self._pool = None
+            self._pool_size = None
+            self.stats = dict(
+                writes=0, uploads=0, full_uploads=0, orphans=0,
+                bytes_uploaded=0, calls_saved=0,
+            )
         _I_ = None
+        # dirty ranges closer than this many bytes are uploaded as one range,
+        # re-sending a few unchanged bytes is cheaper than another driver call
+        merge_gap = 64
+        # past this fraction of the buffer dirty, re-upload the whole buffer
+        full_upload_fraction = 0.5
         implementation = property( get_implementation, )
         def resolve( self, value ):
             """Resolve string constant to constant"""
@@ -214,6 +284,7 @@ if VBO is None:
             """
             self.data = data
             self.copied = False
+            self._row_size = None
             if size is not None:
                 self.size = size
             elif self.data is not None:
@@ -228,62 +299,100 @@ if VBO is None:
                 be the same as the internal data-array to work properly, if
                 not, the amount of data copied will be wrong.
 
-            This is a reasonably complex operation, it has to have all sorts
-            of state-aware changes to correctly map the source into the low-level
-            OpenGL view of the buffer (which is just bytes as far as the GL
-            is concerned).
+            The changed byte range is recorded as dirty and uploaded from
+            our data-array at the next bind, see mark_dirty.  stats counts
+            the writes, the glBufferSubData (uploads) and glBufferData
+            (full_uploads) calls, the full uploads forced by
+            full_upload_fraction (orphans), bytes_uploaded and calls_saved
+            compared to one glBufferSubData per write.
             """
             if slice.step and not slice.step == 1:
                 raise NotImplemented( """Don't know how to map stepped arrays yet""" )
             # TODO: handle e.g. mapping character data into an integer data-set
             data = ArrayDatatype.asArray( array )
-            data_length = ArrayDatatype.arrayByteCount( array )
+            length = len(self.data)
             start = (slice.start or 0)
-            stop = (slice.stop or len(self.data))
+            stop = length if slice.stop is None else slice.stop
             if start < 0:
-                start += len(self.data)
+                start += length
                 start = max((start,0))
             if stop < 0:
-                stop += len(self.data)
+                stop += length
                 stop = max((stop,0))
+            stop = min((stop,length))
             self.data[ slice ] = data
-            if self.copied and self.buffers:
-                if start-stop == len(self.data):
-                    # re-copy the whole data-set
-                    self.copied = False
-                elif len(data):
-                    # now the fun part, we need to make the array match the
-                    # structure of the array we're going to copy into and make
-                    # the "size" parameter match the value we're going to copy in,
-                    # note that a 2D array (rather than a 1D array) may require
-                    # multiple mappings to copy into the memory area...
-
-                    # find the step size from the dimensions and base size...
-                    size = ArrayDatatype.arrayByteCount( self.data[0] )
-                    #baseSize = ArrayDatatype.unitSize( data )
-                    # now create the start and distance values...
-                    start *= size
-                    stop *= size
-                    # wait until the last moment (bind) to copy the data...
-                    self._copy_segments.append(
-                        (start,(stop-start), data)
-                    )
+            if self.buffers and stop > start:
+                size = self._row_size
+                if size is None:
+                    # byte size of one row (first-dimension item) of the data-array
+                    size = self._row_size = ArrayDatatype.arrayByteCount( self.data ) // length
+                self.mark_dirty( start * size, stop * size )
+        def mark_dirty( self, start, stop ):
+            """Record bytes [start,stop) of our data-array as changed since the last upload
+
+            Dirty ranges are kept sorted, and ranges which overlap, touch or
+            are at most merge_gap bytes apart are merged, so that copy_data
+            issues one glBufferSubData per disjoint range.  Once more than
+            full_upload_fraction of the buffer is dirty the ranges are dropped
+            and the next bind re-uploads (orphans) the whole buffer instead.
+            """
+            self.stats['writes'] += 1
+            if not self.copied:
+                return
+            segments = self._copy_segments
+            gap = self.merge_gap
+            dirty = self._dirty_bytes
+            index = bisect.bisect_left( segments, (start,stop) )
+            # absorb a preceding range reaching (nearly) up to start
+            if index and segments[index-1][1] + gap >= start:
+                index -= 1
+                begin, end = segments.pop( index )
+                dirty -= end - begin
+                start = begin
+                stop = max( stop, end )
+            # and the following ones starting (nearly) before stop
+            while index < len(segments) and segments[index][0] <= stop + gap:
+                begin, end = segments.pop( index )
+                dirty -= end - begin
+                stop = max( stop, end )
+            segments.insert( index, (start,stop) )
+            dirty += stop - start
+            if self.size and dirty > self.full_upload_fraction * self.size:
+                self.copied = False
+                self.stats['orphans'] += 1
+                del segments[:]
+                dirty = 0
+            self._dirty_bytes = dirty
         def __len__( self ):
             """Delegate length/truth checks to our data-array"""
             return len( self.data )
         def __getattr__( self, key ):
             """Delegate failing attribute lookups to our data-array"""
-            if key not in ('data','usage','target','buffers', 'copied','_I_','implementation','_copy_segments' ):
+            if key not in ('data','usage','target','buffers', 'copied','_I_','implementation','_copy_segments','stats','_dirty_bytes','_row_size','_pool','_pool_size' ):
                 return getattr( self.data, key )
             else:
                 raise AttributeError( key )
         def create_buffers( self ):
-            """Create the internal buffer(s)"""
+            """Create the internal buffer(s)
+
+            With OBJECT_POOL the buffer name comes from the current context's
+            object pool, and goes back to it when we are deleted/collected.
+            """
             assert not self.buffers, """Already created the buffer"""
-            self.buffers = [ long(self.implementation.glGenBuffers(1)) ]
+            if _configflags.OBJECT_POOL:
+                from OpenGL import objectpool
+                self._pool = objectpool.getPool()
+                # the name goes back under the size it was allocated for, even
+                # if set_array resizes us later
+                self._pool_size = objectpool.size_class( self.size or 0 )
+                self.buffers = [ self._pool.acquire( 'buffer', self._pool_size ) ]
+                deleter = self.implementation.pool_deleter( self._pool, self.buffers, self._pool_size, id(self) )
+            else:
+                self.buffers = [ long(self.implementation.glGenBuffers(1)) ]
+                deleter = self.implementation.deleter( self.buffers, id(self) )
             self.target = self.resolve( self.target )
             self.usage = self.resolve( self.usage )
-            self.implementation._DELETERS_[ id(self) ] = weakref.ref( self, self.implementation.deleter( self.buffers, id(self) ))
+            self.implementation._DELETERS_[ id(self) ] = weakref.ref( self, deleter )
             return self.buffers
         def copy_data( self ):
             """Copy our data into the buffer on the GL side (if required)
@@ -294,24 +403,64 @@ if VBO is None:
             data with glBufferSubData.
             """
             assert self.buffers, """Should do create_buffers before copy_data"""
+            stats = self.stats
             if self.copied:
                 if self._copy_segments:
-                    while self._copy_segments:
-                        start,size,data  = self._copy_segments.pop(0)
-                        dataptr = ArrayDatatype.voidDataPointer( data )
-                        self.implementation.glBufferSubData(self.target, start, size, dataptr)
-            else:
-                if self.data is not None and self.size is None:
-                    self.size = ArrayDatatype.arrayByteCount( self.data )
-                self.implementation.glBufferData(
-                    self.target,
-                    self.size,
-                    self.data,
-                    self.usage,
-                )
-                self.copied = True
+                    data = self.data
+                    flags = getattr( data, 'flags', None )
+                    if flags is not None and not flags['C_CONTIGUOUS']:
+                        # strided or Fortran-order view, the dirty byte ranges
+                        # are offsets into its C-order copy, not its memory
+                        data = data.copy( order='C' )
+                    try:
+                        base = ArrayDatatype.dataPointer( data )
+                    except (TypeError, AttributeError, ValueError) as err:
+                        # no stable data-pointer (e.g. lists), re-copy the whole data-set
+                        base = None
+                    if base is not None:
+                        for start,stop in self._copy_segments:
+                            self.implementation.glBufferSubData(
+                                self.target, start, stop-start, ctypes.c_void_p( base + start ),
+                            )
+                            stats['uploads'] += 1
+                            stats['bytes_uploaded'] += stop-start
+                        del self._copy_segments[:]
+                        self._dirty_bytes = 0
+                        self.update_calls_saved()
+                        return
+                    del self._copy_segments[:]
+                    self._dirty_bytes = 0
+                    self.copied = False
+                    stats['orphans'] += 1
+                else:
+                    return
+            if self.data is not None and self.size is None:
+                self.size = ArrayDatatype.arrayByteCount( self.data )
+            self.implementation.glBufferData(
+                self.target,
+                self.size,
+                self.data,
+                self.usage,
+            )
+            self.copied = True
+            del self._copy_segments[:]
+            self._dirty_bytes = 0
+            stats['full_uploads'] += 1
+            stats['bytes_uploaded'] += self.size or 0
+            self.update_calls_saved()
+        def update_calls_saved( self ):
+            """Each recorded write used to cost one glBufferSubData call"""
+            stats = self.stats
+            stats['calls_saved'] = stats['writes'] - stats['uploads'] - stats['orphans']
         def delete( self ):
-            """Delete this buffer explicitly"""
+            """Delete this buffer explicitly
+
+            Pooled buffer names are given back to their pool instead.
+            """
+            if self.buffers and self._pool is not None:
+                while self.buffers:
+                    self._pool.release( 'buffer', self.buffers.pop(0), self._pool_size )
+                self.implementation._DELETERS_.pop( id(self), None )
             if self.buffers:
                 while self.buffers:
                     try:
@@ -430,6 +579,243 @@ if VBO is None:
             """Returns a c_void_p( instance.offset )"""
             return ctypes.c_void_p( instance.offset )
 
+class StreamingVBO( object ):
+    """Ring buffer for vertex data re-specified every frame (particles etc.)
+
+    Basic usage:
+
+        stream = vbo.StreamingVBO()
+        ...
+        # every frame
+        positions = stream.write( position_array )
+        colours = stream.write( colour_array )
+        with stream:
+            glVertexPointer( 2, GL_FLOAT, 0, positions )
+            glColorPointer( 3, GL_FLOAT, 0, colours )
+            glDrawArrays( GL_POINTS, 0, count )
+        stream.next_frame()
+
+    The buffer holds `frames` regions of `size` bytes.  Each frame's writes
+    are appended to the current region and next_frame() fences it and moves
+    on to the next region, waiting only if the GL is still reading that
+    region from `frames` frames ago.  The buffer storage is never
+    re-specified, except to grow it when a frame needs more than `size`
+    bytes.
+
+    Writes use, depending on what the GL provides:
+
+        persistent -- glBufferStorage with a coherent persistent mapping
+            (GL 4.4/ARB_buffer_storage), writes are plain memory copies
+        map_range -- glMapBufferRange with the invalidate-range and
+            unsynchronized flags (GL 3.0/ARB_map_buffer_range)
+        sub_data -- glBufferSubData, the GL synchronises (no fences)
+
+    stats counts writes, bytes, frames, fence waits (glClientWaitSync
+    calls which found the GL still busy) and re-allocations.
+    Unlike VBO the instance is not array data itself; write() returns the
+    VBOOffset to pass to the pointer functions.
+    """
+    ALIGNMENT = 16
+    WAIT_TIMEOUT = 1000000000 # 1s in ns, per glClientWaitSync call
+    def __init__(
+        self, size=1<<16, frames=3,
+        target='GL_ARRAY_BUFFER', usage='GL_STREAM_DRAW', mode=None,
+    ):
+        """Initialize the ring (GL objects are created on first write)
+
+        size -- initial number of bytes available to each frame
+        frames -- number of frame regions in the ring
+        target -- VBO target to which to bind
+        usage -- usage hint for the sub_data and map_range modes
+        mode -- force 'persistent', 'map_range' or 'sub_data', default
+            is the first one the implementation supports
+        """
+        self.size = size
+        self.frames = frames
+        self.target = target
+        self.usage = usage
+        self.mode = mode
+        self.buffers = []
+        self.bound = False
+        self.pointer = None
+        self.fences = [None] * frames
+        self.region = 0
+        self.used = 0
+        self.pending = []
+        self.data = None
+        self.stats = dict(
+            writes=0, bytes=0, frames=0, waits=0, reallocations=0,
+        )
+    implementation = property( get_implementation, )
+    def resolve( self, value ):
+        """Resolve string constant to constant"""
+        if isinstance( value, (bytes,unicode)):
+            return getattr( self.implementation, self.implementation.basename( value ) )
+        return value
+    def choose_mode( self ):
+        implementation = self.implementation
+        if implementation.supports( 'glBufferStorage', 'glMapBufferRange', 'glFenceSync' ):
+            return 'persistent'
+        if implementation.supports( 'glMapBufferRange', 'glFenceSync' ):
+            return 'map_range'
+        return 'sub_data'
+    @property
+    def capacity( self ):
+        """Total bytes in the ring"""
+        return self.size * self.frames
+    def create_buffers( self ):
+        """Create (or re-create at the current size) the ring's buffer"""
+        implementation = self.implementation
+        if self.mode is None:
+            self.mode = self.choose_mode()
+        self.target = self.resolve( self.target )
+        self.usage = self.resolve( self.usage )
+        if self.buffers:
+            self.delete()
+        self.buffers = [ long(implementation.glGenBuffers(1)) ]
+        implementation._DELETERS_[ id(self) ] = weakref.ref( self, implementation.deleter( self.buffers, id(self) ))
+        implementation.glBindBuffer( self.target, self.buffers[0] )
+        if self.mode == 'persistent':
+            flags = (
+                implementation.GL_MAP_WRITE_BIT |
+                implementation.GL_MAP_PERSISTENT_BIT |
+                implementation.GL_MAP_COHERENT_BIT
+            )
+            implementation.glBufferStorage( self.target, self.capacity, None, flags )
+            self.pointer = implementation.glMapBufferRange( self.target, 0, self.capacity, flags )
+        else:
+            implementation.glBufferData( self.target, self.capacity, None, self.usage )
+        self.restore_binding()
+        return self.buffers
+    def delete( self ):
+        """Delete the buffer and any pending fences explicitly"""
+        implementation = self.implementation
+        self.release_fences()
+        if self.buffers:
+            if self.pointer:
+                implementation.glBindBuffer( self.target, self.buffers[0] )
+                implementation.glUnmapBuffer( self.target )
+                self.pointer = None
+            while self.buffers:
+                try:
+                    implementation.glDeleteBuffers(1, self.buffers.pop(0))
+                except (AttributeError,error.NullFunctionError) as err:
+                    pass
+    def release_fences( self ):
+        for index, fence in enumerate( self.fences ):
+            if fence is not None:
+                self.implementation.glDeleteSync( fence )
+                self.fences[index] = None
+    def grow( self, needed ):
+        """Re-allocate with regions of at least needed bytes, restarting the ring
+
+        Data already written this frame is copied to the new buffer and the
+        VBOOffsets returned for it are updated in place.
+        """
+        size = self.size
+        while size < needed:
+            size *= 2
+        self.size = size
+        self.region = 0
+        self.stats['reallocations'] += 1
+        self.create_buffers()
+        for offset, data, start, length in self.pending:
+            offset.offset = start
+            self.copy( start, data, length )
+    def copy( self, offset, data, size ):
+        """Copy size bytes of (contiguous) data to offset in the buffer"""
+        implementation = self.implementation
+        source = ArrayDatatype.voidDataPointer( data )
+        if self.mode == 'persistent':
+            ctypes.memmove( self.pointer + offset, source, size )
+            return
+        implementation.glBindBuffer( self.target, self.buffers[0] )
+        if self.mode == 'map_range':
+            if size:
+                pointer = implementation.glMapBufferRange(
+                    self.target, offset, size,
+                    implementation.GL_MAP_WRITE_BIT |
+                    implementation.GL_MAP_INVALIDATE_RANGE_BIT |
+                    implementation.GL_MAP_UNSYNCHRONIZED_BIT,
+                )
+                ctypes.memmove( pointer, source, size )
+                implementation.glUnmapBuffer( self.target )
+        else:
+            implementation.glBufferSubData( self.target, offset, size, source )
+        self.restore_binding()
+    def write( self, data ):
+        """Append data to the current frame's region, returns a VBOOffset to it
+
+        data -- PyOpenGL-compatible array-data structure, numpy arrays, ctypes arrays, etc.
+
+        Do all of a frame's writes before drawing from them: if the region
+        overflows the ring is re-allocated and earlier offsets change.
+        """
+        if not self.buffers:
+            self.create_buffers()
+        data = ArrayDatatype.asArray( data )
+        size = ArrayDatatype.arrayByteCount( data )
+        start = self.used
+        if start + size > self.size:
+            self.grow( start + size )
+        offset = VBOOffset( self, self.region * self.size + start )
+        self.copy( offset.offset, data, size )
+        self.pending.append( (offset, data, start, size) )
+        self.used = start + (size + self.ALIGNMENT - 1) // self.ALIGNMENT * self.ALIGNMENT
+        self.data = data
+        self.stats['writes'] += 1
+        self.stats['bytes'] += size
+        return offset
+    def next_frame( self ):
+        """Fence the current region after its draw calls and move to the next one"""
+        implementation = self.implementation
+        if self.mode != 'sub_data' and self.buffers:
+            if self.fences[self.region] is not None:
+                implementation.glDeleteSync( self.fences[self.region] )
+            self.fences[self.region] = implementation.glFenceSync(
+                implementation.GL_SYNC_GPU_COMMANDS_COMPLETE, 0
+            )
+        self.region = (self.region + 1) % self.frames
+        self.used = 0
+        del self.pending[:]
+        self.stats['frames'] += 1
+        fence = self.fences[self.region]
+        if fence is not None:
+            self.fences[self.region] = None
+            flags = implementation.GL_SYNC_FLUSH_COMMANDS_BIT
+            while True:
+                result = implementation.glClientWaitSync( fence, flags, self.WAIT_TIMEOUT )
+                if result != implementation.GL_ALREADY_SIGNALED:
+                    self.stats['waits'] += 1
+                if result != implementation.GL_TIMEOUT_EXPIRED:
+                    break
+            implementation.glDeleteSync( fence )
+            if result == implementation.GL_WAIT_FAILED:
+                raise RuntimeError( """glClientWaitSync failed for streaming buffer region %s"""%( self.region, ))
+    def __int__( self ):
+        """Get our VBO id"""
+        if not self.buffers:
+            self.create_buffers()
+        return self.buffers[0]
+    def restore_binding( self ):
+        """Re-establish bind()/unbind() state after binding the buffer internally"""
+        self.implementation.glBindBuffer( self.target, self.buffers[0] if self.bound else 0 )
+    def bind( self ):
+        """Bind the ring buffer for use in vertex calls"""
+        if not self.buffers:
+            self.create_buffers()
+        self.implementation.glBindBuffer( self.target, self.buffers[0] )
+        self.bound = True
+    def unbind( self ):
+        """Unbind the buffer (make normal array operations active)"""
+        self.implementation.glBindBuffer( self.target, 0 )
+        self.bound = False
+    __enter__ = bind
+    def __exit__( self, exc_type=None, exc_val=None, exc_tb=None ):
+        """Context manager exit"""
+        self.unbind()
+        return False # do not supress exceptions...
+
 _cleaners = {}
 def _cleaner( vbo ):
     """Construct a mapped-array cleaner function to unmap vbo.target"""
@@ -44,19 +44,25 @@ from OpenGL.raw.GL.VERSION import GL_1_1 as _simple
 from OpenGL import arrays
 from OpenGL import error
 from OpenGL import _configflags
+from OpenGL import contextdata
+import collections
 import ctypes
 
-def SetupPixelRead( format, dims, type):
+def SetupPixelRead( format, dims, type, pool=None ):
     """Setup transfer mode for a read into a numpy array return the array
     
     Calls setupDefaultTransferMode, sets rankPacking and then 
     returns a createTargetArray for the parameters.
+
+    pool -- optional ImageBufferPool providing (and keeping) the array
     """
     setupDefaultTransferMode()
     # XXX this is wrong? dims may grow or it may not, depends on whether
     # the format can fit in the type or not, but rank is a property of the 
     # image itself?  Don't know, should test.
     rankPacking( len(dims)+1 )
+    if pool is not None:
+        return pool.get( format, dims, type )
     return createTargetArray( format, dims, type )
 
 def setupDefaultTransferMode( ):
@@ -165,3 +171,58 @@ TIGHT_PACK_FORMATS = {
 RANK_PACKINGS = {
     # rank (integer): list of (function,**arg) to setup for that rank
 }
+
+# bytes of destination arrays an ImageBufferPool keeps by default
+MAX_POOLED_BYTES = 64 << 20
+POOL_KEY = 'OpenGL.images.pool'
+
+class ImageBufferPool( object ):
+    """Destination arrays for image reads, reused by (format, dims, type)
+
+    Repeated reads of the same shape get the same array back, so
+    reading at video rates allocates nothing per frame.  The least
+    recently used arrays are dropped once the pool holds more than
+    max_bytes, arrays larger than that are never kept.
+    """
+    def __init__( self, max_bytes=MAX_POOLED_BYTES ):
+        self.max_bytes = max_bytes
+        self.arrays = collections.OrderedDict()
+        self.nbytes = 0
+        self.stats = dict( hits=0, misses=0, evictions=0 )
+    def get( self, format, dims, type ):
+        """Get the pooled array for format, dims and type, creating it if necessary"""
+        key = (format, tuple(dims), type)
+        entry = self.arrays.get( key )
+        if entry is not None:
+            self.arrays.move_to_end( key )
+            self.stats['hits'] += 1
+            return entry[0]
+        self.stats['misses'] += 1
+        array = createTargetArray( format, key[1], type )
+        size = arrays.ArrayDatatype.arrayByteCount( array )
+        if size <= self.max_bytes:
+            self.arrays[key] = (array, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                old, (oldArray, oldSize) = self.arrays.popitem( last=False )
+                self.nbytes -= oldSize
+                self.stats['evictions'] += 1
+        return array
+    def clear( self ):
+        """Drop all pooled arrays"""
+        self.arrays.clear()
+        self.nbytes = 0
+    def counters( self ):
+        """Pooled array count and bytes, plus the hit/miss statistics"""
+        result = dict( self.stats )
+        result['arrays'] = len( self.arrays )
+        result['bytes'] = self.nbytes
+        return result
+
+def getReadbackPool( context=None ):
+    """Get (creating if necessary) the ImageBufferPool of context (default current)"""
+    pool = contextdata.getValue( POOL_KEY, context=context )
+    if pool is None:
+        pool = ImageBufferPool()
+        contextdata.setValue( POOL_KEY, pool, context=context )
+    return pool
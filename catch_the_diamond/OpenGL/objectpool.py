@@ -0,0 +1,151 @@
+"""Per-context pools of GL object names (see OpenGL.OBJECT_POOL)
+
+Short-lived GL objects normally cost a glGen* call when created and a
+glDelete* call whenever the garbage collector gets to them (for VBOs through
+the weakref deleters in OpenGL.arrays.vbo), possibly while some other
+context is current.  An ObjectPool instead:
+
+    * generates names in batches (one glGen* call per `batch` names)
+    * keeps released names, grouped by kind and size class, and hands them
+      out again before generating new ones
+    * never calls GL when a name is released, releasing is safe from
+      weakref callbacks; names which are not kept are deleted by
+      end_frame(), with one glDelete* call per kind
+
+With OBJECT_POOL set, VBO takes its buffer names from the current context's
+pool and gives them back when deleted or collected, and glutSwapBuffers calls
+end_frame().  Applications not using GLUT should call end_frame() at their
+own frame boundary::
+
+    from OpenGL import objectpool
+    pool = objectpool.getPool()
+    texture = pool.acquire( 'texture', (256, 256, GL_RGBA8) )
+    ...
+    pool.release( 'texture', texture, (256, 256, GL_RGBA8) )
+    ...
+    objectpool.end_frame()
+
+The size class (key) is whatever describes objects which are interchangeable
+for the caller, e.g. size_class(nbytes) for buffers or (width, height, format)
+for textures.  Only pool buffers with mutable (glBufferData) storage,
+storage allocated with glBufferStorage cannot be re-specified.
+"""
+from OpenGL import contextdata
+from OpenGL.raw.GL import _types
+
+# kind -> (generating function, deleting function), looked up in OpenGL.GL
+KINDS = {
+    'buffer': ('glGenBuffers', 'glDeleteBuffers'),
+    'texture': ('glGenTextures', 'glDeleteTextures'),
+    'framebuffer': ('glGenFramebuffers', 'glDeleteFramebuffers'),
+    'renderbuffer': ('glGenRenderbuffers', 'glDeleteRenderbuffers'),
+}
+# key of freshly generated names, which have no storage yet
+FRESH = None
+CONTEXT_KEY = 'OpenGL.objectpool'
+
+def size_class( nbytes ):
+    """Round a byte count up to a power of two (at least 256)"""
+    size = 256
+    while size < nbytes:
+        size *= 2
+    return size
+
+class ObjectPool( object ):
+    """Names of one context's GL objects, by kind and size class"""
+    def __init__( self, batch=16, max_pooled=32 ):
+        """Initialize the pool
+
+        batch -- number of names generated per glGen* call
+        max_pooled -- number of released names kept per (kind, key), the
+            others are deleted at the next end_frame
+        """
+        self.batch = batch
+        self.max_pooled = max_pooled
+        self.pooled = {}
+        self.pending = []
+        self.live = dict( (kind, 0) for kind in KINDS )
+        self.functions = {}
+        self.stats = dict(
+            generated=0, deleted=0, reused=0,
+            gen_calls=0, delete_calls=0,
+        )
+    def function( self, kind, index ):
+        key = (kind, index)
+        function = self.functions.get( key )
+        if function is None:
+            from OpenGL import GL
+            function = self.functions[key] = getattr( GL, KINDS[kind][index] )
+        return function
+    def generate( self, kind, count ):
+        """Generate count names of kind with a single glGen* call"""
+        names = (_types.GLuint * count)()
+        self.function( kind, 0 )( count, names )
+        self.stats['generated'] += count
+        self.stats['gen_calls'] += 1
+        return list( names )
+    def acquire( self, kind, key=FRESH ):
+        """Get a name of kind, preferably one released with the same key"""
+        names = None if key is FRESH else self.pooled.get( (kind, key) )
+        if names:
+            self.stats['reused'] += 1
+        else:
+            names = self.pooled.get( (kind, FRESH) )
+            if not names:
+                names = self.pooled[(kind, FRESH)] = self.generate( kind, self.batch )
+        self.live[kind] += 1
+        return names.pop()
+    def release( self, kind, name, key=FRESH ):
+        """Give a name back to the pool, never calls GL"""
+        self.live[kind] -= 1
+        names = self.pooled.setdefault( (kind, key), [] )
+        if len( names ) < self.max_pooled:
+            names.append( name )
+        else:
+            self.pending.append( (kind, name) )
+    def discard( self, kind, name ):
+        """Give a name back for deletion at the next end_frame, never calls GL"""
+        self.live[kind] -= 1
+        self.pending.append( (kind, name) )
+    def end_frame( self ):
+        """Delete the names queued for deletion, one glDelete* call per kind"""
+        pending, self.pending = self.pending, []
+        byKind = {}
+        for kind, name in pending:
+            byKind.setdefault( kind, [] ).append( name )
+        for kind, names in byKind.items():
+            array = (_types.GLuint * len( names ))( *names )
+            self.function( kind, 1 )( len( names ), array )
+            self.stats['deleted'] += len( names )
+            self.stats['delete_calls'] += 1
+    def clear( self ):
+        """Delete all pooled names (live names stay with their owners)"""
+        for (kind, key), names in self.pooled.items():
+            self.pending.extend( [(kind, name) for name in names] )
+        self.pooled.clear()
+        self.end_frame()
+    def counters( self ):
+        """Live and pooled object counts per kind, plus the call statistics"""
+        pooled = dict( (kind, 0) for kind in KINDS )
+        for (kind, key), names in self.pooled.items():
+            pooled[kind] += len( names )
+        result = dict( self.stats )
+        result['live'] = dict( self.live )
+        result['pooled'] = pooled
+        result['pending'] = len( self.pending )
+        return result
+
+def getPool( context=None ):
+    """Get (creating if necessary) the object pool of context (default current)"""
+    pool = contextdata.getValue( CONTEXT_KEY, context=context )
+    if pool is None:
+        pool = ObjectPool()
+        contextdata.setValue( CONTEXT_KEY, pool, context=context )
+    return pool
+
+def end_frame( context=None ):
+    """Run the frame-boundary deletions of context's pool (if it has one)"""
+    pool = contextdata.getValue( CONTEXT_KEY, context=context )
+    if pool is not None:
+        pool.end_frame()
+    return pool
@@ -84,6 +84,12 @@ def unpack_constants( constants, namespace ):
 
 def createFunction( function, dll,extension, deprecated=False, error_checker=None, force_extension=False ):
     """Allows the more compact declaration format to use the old-style constructor"""
+    if _configflags.SCALAR_FAST_PATH:
+        from OpenGL.platform import fastpath
+        if fastpath.enabled():
+            func = fastpath.bind( function, dll or PLATFORM.GL, extension, deprecated, error_checker )
+            if func is not None:
+                return func
     return nullFunction(
         function.__name__,
         dll or PLATFORM.GL,
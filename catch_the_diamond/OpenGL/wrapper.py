@@ -2,7 +2,7 @@
 import ctypes, logging
 from OpenGL import platform, error
 assert platform
-from OpenGL._configflags import STORE_POINTERS, ERROR_ON_COPY, SIZE_1_ARRAY_UNPACK
+from OpenGL._configflags import STORE_POINTERS, ERROR_ON_COPY, SIZE_1_ARRAY_UNPACK, WRAPPER_CODEGEN
 from OpenGL import converters
 from OpenGL.converters import DefaultCConverter
 from OpenGL.converters import returnCArgument,returnPyArgument
@@ -393,6 +393,9 @@ class Wrapper( LateBind ):
             if hasattr( item, 'finalise' ):
                 item.finalise( self )
         callFunction = self.finaliseCall()
+        if callFunction and WRAPPER_CODEGEN and not cWrapper:
+            from OpenGL import wrappercodegen
+            callFunction = wrappercodegen.specialise( self, callFunction )
         if not callFunction:
             raise RuntimeError( """Missing finalised call type for %s"""%( self, ))
         else:
@@ -4,8 +4,12 @@
 
 # --- Imports ---
 import time  # Needed to calculate delta time for smooth animation.
+from functools import lru_cache # Needed to keep a bounded cache of rasterized shape outlines.
 import random # Needed for random.randint() (diamond horizontal position) and random.choice() (diamond color).
 
+import numpy as np # Needed for the reusable vertex/color buffers of the batched point rasterizer.
+from line_raster import rasterize_line, rasterize_polygon # Vectorized midpoint kernel used in batched mode.
+
 # Import necessary modules from the PyOpenGL library
 from OpenGL.GL import * # Core OpenGL functions (drawing, setting color, clearing screen, etc.)
 from OpenGL.GLUT import * # OpenGL Utility Toolkit functions (window creation, event handling like keyboard/mouse, main loop)
@@ -17,6 +21,10 @@ from OpenGL.GLU import * # OpenGL Utility Library functions (like gluOrtho2D for
 WINDOW_WIDTH = 800      # Defines the width of the game window in pixels.
 WINDOW_HEIGHT = 700     # Defines the height of the game window in pixels.
 POINT_SIZE = 2          # Sets the size of the points drawn by GL_POINTS. Adjust for visibility.
+# When True, points are collected into NumPy buffers and sent with a single glDrawArrays call per frame
+# instead of one glBegin/glVertex2i/glEnd round trip per pixel. Set to False for the original immediate mode.
+BATCHED_RASTERIZER = True
+SHAPE_CACHE_SIZE = 32   # Maximum number of rasterized shape outlines kept in the geometry cache (least recently used go first).
 
 # Game States are represented by integers for clarity in managing game flow.
 STATE_PLAYING = 1       # Constant representing the active gameplay state.
@@ -78,11 +86,91 @@ pause_button_rect = {'x': WINDOW_WIDTH // 2 - button_size_w // 2, 'y': button_y_
 exit_button_rect = {'x': WINDOW_WIDTH - button_size_w - button_margin, 'y': button_y_pos, 'w': button_size_w, 'h': button_size_h}
 
 
+# --- Batched Point Rasterizer ---
+# Every pixel produced by the midpoint algorithm used to cost three wrapper calls (glBegin, glVertex2i, glEnd).
+# In batched mode the pixels are appended to reusable NumPy arrays instead, and the whole frame is drawn
+# at once from client-side vertex and color arrays. GL_POINTS is still the only primitive used.
+
+class PointBatch:
+    """A growable buffer of integer points (and the color of each point) drawn with one glDrawArrays call."""
+
+    def __init__(self, capacity=4096):
+        self.vertices = np.zeros((capacity, 2), dtype=np.int32)  # (x, y) integer pixel coordinates.
+        self.colors = np.zeros((capacity, 3), dtype=np.float32)   # (r, g, b) color of each point.
+        self.count = 0                                            # Number of points currently stored.
+        self.color = COLOR_WHITE                                  # Color given to points added from now on.
+
+    def reserve(self, extra):
+        """Makes sure there is room for `extra` more points, doubling the capacity when needed."""
+        needed = self.count + extra
+        capacity = len(self.vertices)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        # Copy the points already stored into the larger arrays; the old arrays are then dropped.
+        vertices = np.zeros((capacity, 2), dtype=np.int32)
+        colors = np.zeros((capacity, 3), dtype=np.float32)
+        vertices[:self.count] = self.vertices[:self.count]
+        colors[:self.count] = self.colors[:self.count]
+        self.vertices, self.colors = vertices, colors
+
+    def add(self, x, y):
+        """Adds a single point in the current color."""
+        if self.count == len(self.vertices):
+            self.reserve(1)
+        self.vertices[self.count] = (x, y)
+        self.colors[self.count] = self.color
+        self.count += 1
+
+    def add_many(self, xs, ys):
+        """Adds a run of points (equal-length sequences of x and y) in the current color."""
+        n = len(xs)
+        self.reserve(n)
+        end = self.count + n
+        self.vertices[self.count:end, 0] = xs
+        self.vertices[self.count:end, 1] = ys
+        self.colors[self.count:end] = self.color
+        self.count = end
+
+    def clear(self):
+        """Forgets all stored points but keeps the allocated arrays for the next frame."""
+        self.count = 0
+
+    def flush(self):
+        """Draws every stored point with a single glDrawArrays call, then clears the buffer."""
+        if self.count:
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_COLOR_ARRAY)
+            glVertexPointer(2, GL_INT, 0, self.vertices)
+            glColorPointer(3, GL_FLOAT, 0, self.colors)
+            glDrawArrays(GL_POINTS, 0, self.count)
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+        self.clear()
+
+point_batch = PointBatch() # The frame's point buffer, reused across frames to avoid reallocating.
+
+def add_points(points):
+    """Adds an (N, 2) array of integer points, as returned by line_raster, to the frame's batch."""
+    point_batch.add_many(points[:, 0], points[:, 1])
+
+def set_color(color):
+    """Sets the color for the points drawn next, in either rasterizer mode."""
+    if BATCHED_RASTERIZER:
+        point_batch.color = color # Stored per point and sent together with the vertices.
+    else:
+        glColor3f(color[0], color[1], color[2]) # Immediate mode: set the current OpenGL color directly.
+
 # --- Midpoint Line Algorithm Implementation ---
 # This section implements the core drawing requirement of the assignment.
 
 def draw_point(x, y):
     """Draws a single point at integer coordinates (x, y)."""
+    if BATCHED_RASTERIZER:
+        # Only record the point; it is drawn when the frame's batch is flushed.
+        point_batch.add(int(round(x)), int(round(y)))
+        return
     glBegin(GL_POINTS) # Specifies that we are drawing individual points. This is the ONLY primitive allowed by the assignment.
     # glVertex2i specifies a 2D vertex with integer coordinates.
     # round() ensures that calculated coordinates (which might be float) are rounded
@@ -176,6 +264,11 @@ def draw_line_midpoint(x1, y1, x2, y2):
     # Rounds inputs to avoid potential floating point inaccuracies in zone finding/conversion.
     x1, y1, x2, y2 = map(round, [x1, y1, x2, y2])
 
+    # Batched mode: compute every pixel of the line in one NumPy pass (same pixels, same order).
+    if BATCHED_RASTERIZER:
+        add_points(rasterize_line(x1, y1, x2, y2))
+        return
+
     # Handle perfectly vertical lines: Midpoint algorithm relies on dx != 0 for zone 0.
     if x1 == x2:
         y_start, y_end = min(y1, y2), max(y1, y2) # Ensure drawing from min y to max y.
@@ -209,11 +302,8 @@ def draw_line_midpoint(x1, y1, x2, y2):
 # --- Drawing Functions (using Midpoint Line) ---
 # These functions define how to draw game objects using the `draw_line_midpoint` function.
 
-def draw_catcher(cx, cy, top_width, height, bottom_ratio, color):
-    """Draws the catcher as an upside-down trapezium using midpoint lines."""
-    # Set the current drawing color for OpenGL. Affects subsequent draw_point calls.
-    glColor3f(color[0], color[1], color[2]) # Takes Red, Green, Blue floats (0.0-1.0).
-
+def catcher_vertices(cx, cy, top_width, height, bottom_ratio):
+    """Returns the 4 corners of the upside-down trapezium catcher centered at (cx, cy)."""
     # Calculate half dimensions for easier coordinate calculation around the center (cx, cy).
     half_h = height / 2.0
     half_top_w = top_width / 2.0
@@ -225,6 +315,59 @@ def draw_catcher(cx, cy, top_width, height, bottom_ratio, color):
     p2 = (cx + half_top_w, cy + half_h)     # Top Right vertex.
     p3 = (cx + half_bottom_w, cy - half_h) # Bottom Right vertex.
     p4 = (cx - half_bottom_w, cy - half_h) # Bottom Left vertex.
+    return p1, p2, p3, p4
+
+def diamond_vertices(cx, cy, size):
+    """Returns the 4 vertices (top, right, bottom, left) of the diamond centered at (cx, cy)."""
+    half_s = size // 2 # Calculate half size for coordinate calculation.
+
+    # Define the 4 vertices of the diamond relative to its center (cx, cy).
+    top = (cx, cy + half_s)      # Top vertex.
+    bottom = (cx, cy - half_s)   # Bottom vertex.
+    left = (cx - half_s, cy)     # Left vertex.
+    right = (cx + half_s, cy)    # Right vertex.
+    return top, right, bottom, left
+
+# --- Static Geometry Cache ---
+# The diamond only translates and the catcher only translates or changes color, so their outlines
+# are rasterized once and reused with an offset. Vertices can land on .5 coordinates (e.g. a catcher
+# bottom width of 75), and round() rounds halves to the nearest even number, so the rasterized pixels
+# are only invariant under even translations. The cache therefore stores each outline centered on
+# (cx % 2, cy % 2) and shifts it by the remaining even offset.
+
+def shape_vertices(shape, cx, cy, size, ratio):
+    """Returns the vertices of a 'catcher' (size = (top_width, height)) or a 'diamond' centered at (cx, cy)."""
+    if shape == 'catcher':
+        return catcher_vertices(cx, cy, size[0], size[1], ratio)
+    return diamond_vertices(cx, cy, size)
+
+@lru_cache(maxsize=SHAPE_CACHE_SIZE)
+def rasterize_shape(shape, size, ratio, parity_x, parity_y):
+    """Rasterizes a shape outline centered on (parity_x, parity_y). Cached, so the result is read-only."""
+    points = rasterize_polygon(shape_vertices(shape, parity_x, parity_y, size, ratio))
+    points.flags.writeable = False # Shared between every frame that hits the cache.
+    return points
+
+def shape_points(shape, size, ratio, cx, cy):
+    """Returns the outline pixels of a shape centered at (cx, cy), from the cache when possible."""
+    if cx != int(cx) or cy != int(cy):
+        # Fractional centers do not translate exactly; rasterize them directly.
+        return rasterize_polygon(shape_vertices(shape, cx, cy, size, ratio))
+    cx, cy = int(cx), int(cy)
+    parity_x, parity_y = cx % 2, cy % 2
+    return rasterize_shape(shape, size, ratio, parity_x, parity_y) + (cx - parity_x, cy - parity_y)
+
+def draw_catcher(cx, cy, top_width, height, bottom_ratio, color):
+    """Draws the catcher as an upside-down trapezium using midpoint lines."""
+    # Set the current drawing color. Affects subsequent draw_point calls.
+    set_color(color) # Takes Red, Green, Blue floats (0.0-1.0).
+
+    # Batched mode: reuse the cached outline, shifted to the catcher's position.
+    if BATCHED_RASTERIZER:
+        add_points(shape_points('catcher', (top_width, height), bottom_ratio, cx, cy))
+        return
+
+    p1, p2, p3, p4 = catcher_vertices(cx, cy, top_width, height, bottom_ratio)
 
     # Draw the four line segments connecting the vertices using the midpoint algorithm.
     draw_line_midpoint(p1[0], p1[1], p2[0], p2[1]) # Top edge.
@@ -234,14 +377,14 @@ def draw_catcher(cx, cy, top_width, height, bottom_ratio, color):
 
 def draw_diamond(cx, cy, size, color):
     """Draws a diamond shape using midpoint lines."""
-    glColor3f(color[0], color[1], color[2]) # Set the drawing color for the diamond.
-    half_s = size // 2 # Calculate half size for coordinate calculation.
+    set_color(color) # Set the drawing color for the diamond.
 
-    # Define the 4 vertices of the diamond relative to its center (cx, cy).
-    top = (cx, cy + half_s)      # Top vertex.
-    bottom = (cx, cy - half_s)   # Bottom vertex.
-    left = (cx - half_s, cy)     # Left vertex.
-    right = (cx + half_s, cy)    # Right vertex.
+    # Batched mode: reuse the cached outline, shifted to the diamond's position.
+    if BATCHED_RASTERIZER:
+        add_points(shape_points('diamond', size, None, cx, cy))
+        return
+
+    top, right, bottom, left = diamond_vertices(cx, cy, size)
 
     # Draw the 4 line segments connecting the vertices.
     draw_line_midpoint(top[0], top[1], right[0], right[1])
@@ -252,7 +395,7 @@ def draw_diamond(cx, cy, size, color):
 def draw_buttons():
     """Draws the three control buttons with their icons using midpoint lines."""
     # --- Restart Button (Left Arrow) ---
-    glColor3f(COLOR_TEAL[0], COLOR_TEAL[1], COLOR_TEAL[2]) # Set color for restart button icon.
+    set_color(COLOR_TEAL) # Set color for restart button icon.
     # Get the button's bounding box coordinates and dimensions.
     bx, by, bw, bh = restart_button_rect.values()
     # Calculate coordinates for the arrow lines, scaled to fit within the button's bounds (bw, bh).
@@ -266,7 +409,7 @@ def draw_buttons():
     draw_line_midpoint(arrow_tip_x, arrow_mid_y, arrow_base_x, arrow_wing_y2)
 
     # --- Pause/Play Button (Triangle/Two Bars) ---
-    glColor3f(COLOR_AMBER[0], COLOR_AMBER[1], COLOR_AMBER[2]) # Set color for pause/play icon.
+    set_color(COLOR_AMBER) # Set color for pause/play icon.
     bx, by, bw, bh = pause_button_rect.values() # Get button bounds.
     # Check the game state to determine which icon to draw.
     if game_state == STATE_PAUSED:
@@ -294,7 +437,7 @@ def draw_buttons():
         draw_line_midpoint(x2 + bar_width*0.5, bar_y_start, x2 + bar_width*0.5, bar_y_end) # Right bar center.
 
     # --- Exit Button (Cross 'X') ---
-    glColor3f(COLOR_RED[0], COLOR_RED[1], COLOR_RED[2]) # Set color for exit icon.
+    set_color(COLOR_RED) # Set color for exit icon.
     bx, by, bw, bh = exit_button_rect.values() # Get button bounds.
     # Calculate margins to draw the cross within the button bounds.
     margin_x = bw * 0.25
@@ -303,6 +446,32 @@ def draw_buttons():
     draw_line_midpoint(bx + margin_x, by + margin_y, bx + bw - margin_x, by + bh - margin_y) # Top-left to bottom-right.
     draw_line_midpoint(bx + bw - margin_x, by + margin_y, bx + margin_x, by + bh - margin_y) # Top-right to bottom-left.
 
+# --- Static Button Layer ---
+# The buttons never move, so they are compiled once into an OpenGL display list and replayed with a
+# single glCallList per frame. The pause/play button has two icons, so one list is kept per icon.
+# The lists are deleted in reshape() (the buttons move when the window size changes) and rebuilt lazily.
+button_layer_lists = {} # Maps "is the play icon shown" (True/False) to a compiled display list id.
+
+def draw_button_layer():
+    """Draws the buttons from their compiled display list, compiling it first if needed."""
+    show_play_icon = game_state == STATE_PAUSED # The only thing that changes the buttons' look.
+    display_list = button_layer_lists.get(show_play_icon)
+    if display_list is None:
+        display_list = glGenLists(1) # Reserve one display list name.
+        glNewList(display_list, GL_COMPILE) # Record the following commands instead of executing them.
+        draw_buttons()
+        if BATCHED_RASTERIZER:
+            point_batch.flush() # The client-side arrays are copied into the list at this point.
+        glEndList()
+        button_layer_lists[show_play_icon] = display_list
+    glCallList(display_list) # Replay the recorded button drawing.
+
+def delete_button_layer():
+    """Deletes the compiled button display lists so they are rebuilt on the next frame."""
+    for display_list in button_layer_lists.values():
+        glDeleteLists(display_list, 1)
+    button_layer_lists.clear()
+
 # --- Game Logic Functions ---
 # These functions handle the rules and state changes of the game.
 
@@ -356,19 +525,10 @@ def check_collision():
                 catcher_box['y'] + catcher_box['height'] > diamond_box['y'])
     return collided
 
-def update(value):
-    """Updates game state (movement, collision, etc.) - called periodically by glutTimerFunc."""
+def advance(delta_t):
+    """Advances the game logic (movement, collision, etc.) by delta_t seconds."""
     # Need global access to modify game state variables.
-    global game_state, score, catcher_color, diamond_y, diamond_velocity_y, last_frame_time
-
-    # --- Delta Time Calculation ---
-    current_time = time.time() # Get the current system time.
-    # Calculate time elapsed since the last call to update().
-    delta_t = current_time - last_frame_time
-    # Clamp delta_t: Prevents huge jumps in movement if the game pauses or lags significantly.
-    # Limits the maximum time step considered to 0.1 seconds (100ms).
-    delta_t = min(delta_t, 0.1)
-    last_frame_time = current_time # Store current time for the next frame's calculation.
+    global game_state, score, catcher_color, diamond_y, diamond_velocity_y
 
     # --- Game Logic Update (only if playing) ---
     if game_state == STATE_PLAYING:
@@ -395,6 +555,21 @@ def update(value):
             # Effectively remove the diamond by placing it off-screen.
             diamond_y = WINDOW_HEIGHT * 2
 
+def update(value):
+    """Updates game state once per frame - called periodically by glutTimerFunc."""
+    global last_frame_time # Needed to remember when the previous frame happened.
+
+    # --- Delta Time Calculation ---
+    current_time = time.time() # Get the current system time.
+    # Calculate time elapsed since the last call to update().
+    delta_t = current_time - last_frame_time
+    # Clamp delta_t: Prevents huge jumps in movement if the game pauses or lags significantly.
+    # Limits the maximum time step considered to 0.1 seconds (100ms).
+    delta_t = min(delta_t, 0.1)
+    last_frame_time = current_time # Store current time for the next frame's calculation.
+
+    advance(delta_t) # Move the game forward by the elapsed time.
+
     # --- Request Redraw ---
     # Tell GLUT that the display needs to be updated in the next cycle.
     # This will trigger a call to the 'display' function.
@@ -410,21 +585,28 @@ def update(value):
 # These functions are registered with GLUT and are called automatically
 # in response to specific events (like drawing, resizing, input).
 
-def display():
-    """OpenGL display callback. This function does the actual drawing."""
+def render():
+    """Draws the current game state. Does not swap buffers, so it also works without a window."""
     # Clear the screen (color buffer) and depth buffer (though depth isn't heavily used in 2D).
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     # Reset the model-view matrix (transformations) for this frame.
     glLoadIdentity()
 
     # --- Draw all game elements ---
-    draw_buttons() # Draw the static buttons first.
+    draw_button_layer() # Draw the static buttons first (from their display list).
     # Only draw the diamond if the game is not over.
     if game_state != STATE_GAMEOVER:
          # Pass coordinates rounded to integers for drawing consistency.
          draw_diamond(int(round(diamond_x)), int(round(diamond_y)), diamond_size, diamond_color)
     # Draw the catcher, passing all necessary parameters.
     draw_catcher(int(round(catcher_x)), int(round(catcher_y)), catcher_width, catcher_height, catcher_bottom_ratio, catcher_color)
+    # In batched mode nothing has been drawn yet: send all of the frame's points in one call.
+    if BATCHED_RASTERIZER:
+        point_batch.flush()
+
+def display():
+    """OpenGL display callback. This function does the actual drawing."""
+    render() # Draw everything into the back buffer.
 
     # Swap the front (visible) and back (drawing) buffers. Required for smooth animation
     # when using double buffering (GLUT_DOUBLE).
@@ -459,6 +641,8 @@ def reshape(w, h):
     pause_button_rect['y'] = button_y_pos
     exit_button_rect['x'] = WINDOW_WIDTH - button_size_w - button_margin
     exit_button_rect['y'] = button_y_pos
+    # The buttons moved, so their compiled display lists are out of date.
+    delete_button_layer()
 
 
 def keyboard(key, x, y):
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Vectorized midpoint line rasterization.
+
+Computes the same pixels as the scalar `draw_line_midpoint` in catch_the_diamond.py,
+but for a whole segment (or a batch of segments) in one NumPy pass. Instead of running
+find_zone / convert_to_zone0 / convert_from_zone0 for every pixel, each segment looks up
+its octant once in a precomputed table of 2x2 transform matrices.
+"""
+
+import numpy as np
+
+# --- Octant Transform Tables ---
+# Row `zone` of TO_ZONE0 maps a point of that zone onto Zone 0, and FROM_ZONE0 maps it back.
+# They are the matrix form of convert_to_zone0 / convert_from_zone0.
+TO_ZONE0 = np.array([
+    [[1, 0], [0, 1]],    # Zone 0: ( x,  y)
+    [[0, 1], [1, 0]],    # Zone 1: ( y,  x)
+    [[0, -1], [1, 0]],   # Zone 2: (-y,  x)
+    [[-1, 0], [0, 1]],   # Zone 3: (-x,  y)
+    [[-1, 0], [0, -1]],  # Zone 4: (-x, -y)
+    [[0, -1], [-1, 0]],  # Zone 5: (-y, -x)
+    [[0, 1], [-1, 0]],   # Zone 6: ( y, -x)
+    [[1, 0], [0, -1]],   # Zone 7: ( x, -y)
+], dtype=np.int64)
+FROM_ZONE0 = np.array([
+    [[1, 0], [0, 1]],    # Zone 0: ( x,  y)
+    [[0, 1], [1, 0]],    # Zone 1: ( y,  x)
+    [[0, 1], [-1, 0]],   # Zone 2: ( y, -x)
+    [[-1, 0], [0, 1]],   # Zone 3: (-x,  y)
+    [[-1, 0], [0, -1]],  # Zone 4: (-x, -y)
+    [[0, -1], [-1, 0]],  # Zone 5: (-y, -x)
+    [[0, -1], [1, 0]],   # Zone 6: (-y,  x)
+    [[1, 0], [0, -1]],   # Zone 7: ( x, -y)
+], dtype=np.int64)
+
+# Zone lookup indexed by [steep, dx < 0, dy < 0], where steep means |dy| > |dx|.
+ZONE_TABLE = np.array([
+    [[0, 7], [3, 4]],    # Slope magnitude <= 1.
+    [[1, 6], [2, 5]],    # Slope magnitude > 1.
+], dtype=np.int64)
+
+
+def find_zones(dx, dy):
+    """Returns the zone (0-7) of every segment with the given deltas, like find_zone."""
+    dx = np.asarray(dx)
+    dy = np.asarray(dy)
+    return ZONE_TABLE[(np.abs(dy) > np.abs(dx)).astype(np.int64), (dx < 0).astype(np.int64), (dy < 0).astype(np.int64)]
+
+
+def rasterize_segments(x1, y1, x2, y2):
+    """Rasterizes a batch of segments with the midpoint algorithm.
+
+    The endpoint arguments are equal-length sequences (or scalars). They are rounded the
+    same way as draw_line_midpoint. Returns an (N, 2) int64 array of pixel coordinates,
+    segment after segment, in the order the scalar implementation draws them.
+    """
+    x1, y1, x2, y2 = (np.atleast_1d(np.round(np.asarray(v, dtype=np.float64))).astype(np.int64) for v in (x1, y1, x2, y2))
+    dx = x2 - x1
+    dy = y2 - y1
+    zone = find_zones(dx, dy)
+
+    # Convert both endpoints to Zone 0 and order them so that x increases.
+    p1 = np.einsum('nij,nj->ni', TO_ZONE0[zone], np.stack([x1, y1], axis=1))
+    p2 = np.einsum('nij,nj->ni', TO_ZONE0[zone], np.stack([x2, y2], axis=1))
+    swap = (p1[:, 0] > p2[:, 0])[:, None]
+    start_z0 = np.where(swap, p2, p1)
+    end_z0 = np.where(swap, p1, p2)
+    run = end_z0[:, 0] - start_z0[:, 0]     # Number of steps along the Zone 0 x axis.
+    rise = end_z0[:, 1] - start_z0[:, 1]    # Total Zone 0 y increase (0 <= rise <= run).
+    start = np.einsum('nij,nj->ni', FROM_ZONE0[zone], start_z0)
+
+    # Vertical and horizontal lines take the scalar fast paths: they are walked from the
+    # smaller coordinate upwards. Expressed as a Zone 1 / Zone 0 walk with no rise.
+    vertical = dx == 0
+    horizontal = (dy == 0) & ~vertical
+    zone = np.where(vertical, 1, np.where(horizontal, 0, zone))
+    start[vertical, 0] = x1[vertical]
+    start[vertical, 1] = np.minimum(y1, y2)[vertical]
+    start[horizontal, 0] = np.minimum(x1, x2)[horizontal]
+    start[horizontal, 1] = y1[horizontal]
+    run = np.where(vertical, np.abs(dy), np.where(horizontal, np.abs(dx), run))
+    rise = np.where(vertical | horizontal, 0, rise)
+
+    # Step k of a segment moves k pixels along Zone 0 x. The midpoint decision variable
+    # takes the NE step exactly ceil((2*rise*k - run) / (2*run)) times in the first k steps.
+    counts = run + 1
+    segment = np.repeat(np.arange(len(counts)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    run = run[segment]
+    ne_steps = -((run - 2 * rise[segment] * k) // np.maximum(2 * run, 1))
+    offsets = np.einsum('nij,nj->ni', FROM_ZONE0[zone[segment]], np.stack([k, ne_steps], axis=1))
+    return start[segment] + offsets
+
+
+def rasterize_line(x1, y1, x2, y2):
+    """Rasterizes a single segment; see rasterize_segments."""
+    return rasterize_segments([x1], [y1], [x2], [y2])
+
+
+def rasterize_polygon(vertices):
+    """Rasterizes the closed outline through `vertices`, a sequence of (x, y) pairs."""
+    start = np.asarray(vertices, dtype=np.float64)
+    end = np.roll(start, -1, axis=0)
+    return rasterize_segments(start[:, 0], start[:, 1], end[:, 0], end[:, 1])
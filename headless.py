@@ -0,0 +1,247 @@
+"""Run the demos without a window, on an offscreen EGL or OSMesa context.
+
+The OpenGL platform is chosen through PYOPENGL_PLATFORM (egl by default):
+
+    python headless.py random_ball --frames 120
+    PYOPENGL_PLATFORM=osmesa python headless.py catch_the_diamond --output frames/
+
+Each demo is imported from its own directory (so it uses its own copy of PyOpenGL)
+and driven through its reshape/advance/render functions instead of the GLUT main loop.
+Frames are read back with glReadPixels, asynchronously through pixel-pack buffers
+unless --readback-buffers is 0, and can be saved as PPM images.
+Only one demo can be loaded per process.
+"""
+import argparse
+import ctypes
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# name -> window size and the function advancing the demo's simulation by dt seconds
+DEMOS = {
+    'random_ball': {'size': (800, 800), 'advance': 'advance'},
+    'house_rainfall': {'size': (800, 600), 'advance': 'update_rain'},
+    'catch_the_diamond': {'size': (800, 700), 'advance': 'advance'},
+}
+
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+
+class EGLContext:
+    """Pbuffer-backed EGL context, on the default display or Mesa's surfaceless platform."""
+
+    def __init__(self, width, height):
+        from OpenGL import EGL
+        self.EGL = EGL
+        self.display = self._initialize()
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        attributes = (EGL.EGLint * 13)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8,
+            EGL.EGL_BLUE_SIZE, 8, EGL.EGL_ALPHA_SIZE, 8,
+            EGL.EGL_NONE,
+        )
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        EGL.eglChooseConfig(self.display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count))
+        if not count.value:
+            raise RuntimeError('No EGL config with a pbuffer and desktop OpenGL')
+        size = (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE)
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, size)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RuntimeError('Unable to make the EGL context current')
+
+    def _initialize(self):
+        EGL = self.EGL
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        try:
+            if display and EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+                return display
+        except EGL.EGLError:
+            pass
+        # No display server: fall back to Mesa's surfaceless platform
+        from OpenGL.EGL.EXT.platform_base import eglGetPlatformDisplayEXT
+        display = eglGetPlatformDisplayEXT(EGL_PLATFORM_SURFACELESS_MESA, None, None)
+        EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor))
+        return display
+
+    def destroy(self):
+        EGL = self.EGL
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroySurface(self.display, self.surface)
+        EGL.eglDestroyContext(self.display, self.context)
+        EGL.eglTerminate(self.display)
+
+
+class OSMesaContext:
+    """Software OSMesa context rendering into a client-side RGBA buffer."""
+
+    def __init__(self, width, height):
+        from OpenGL import osmesa, arrays
+        from OpenGL.GL import GL_UNSIGNED_BYTE
+        self.osmesa = osmesa
+        self.context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not self.context:
+            raise RuntimeError('Unable to create an OSMesa context')
+        self.buffer = arrays.GLubyteArray.zeros((height, width, 4))
+        if not osmesa.OSMesaMakeCurrent(self.context, self.buffer, GL_UNSIGNED_BYTE, width, height):
+            raise RuntimeError('Unable to make the OSMesa context current')
+
+    def destroy(self):
+        self.osmesa.OSMesaDestroyContext(self.context)
+
+
+CONTEXTS = {
+    'egl': EGLContext,
+    'osmesa': OSMesaContext,
+}
+
+
+def load_demo(name):
+    """Imports a demo module from its directory; selects the egl platform unless one is set."""
+    if name not in DEMOS:
+        raise ValueError('Unknown demo %r, expected one of %s' % (name, ', '.join(DEMOS)))
+    os.environ.setdefault('PYOPENGL_PLATFORM', 'egl')
+    sys.path.insert(0, os.path.join(ROOT, name))
+    return importlib.import_module(name)
+
+
+def create_context(width, height):
+    platform = os.environ.get('PYOPENGL_PLATFORM', 'egl')
+    if platform not in CONTEXTS:
+        raise ValueError('Headless rendering needs PYOPENGL_PLATFORM=egl or osmesa, not %r' % platform)
+    return CONTEXTS[platform](width, height)
+
+
+def frame_image(pixels, width, height):
+    """Wraps read-back RGB pixels as a (height, width, 3) uint8 array, top row first, without copying.
+
+    The rows must be tightly packed, i.e. read with GL_PACK_ALIGNMENT 1.
+    """
+    import numpy as np
+    return np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 3)[::-1]
+
+
+def read_frame(width, height):
+    """Reads the current frame back as a (height, width, 3) uint8 array, top row first."""
+    from OpenGL.GL import glPixelStorei, glReadPixels, GL_PACK_ALIGNMENT, GL_RGB, GL_UNSIGNED_BYTE
+    # no row padding for widths where width * 3 is not a multiple of 4
+    glPixelStorei(GL_PACK_ALIGNMENT, 1)
+    return frame_image(glReadPixels(0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE), width, height)
+
+
+def save_ppm(path, image):
+    height, width = image.shape[:2]
+    with open(path, 'wb') as f:
+        f.write(b'P6 %d %d 255\n' % (width, height))
+        f.write(image.tobytes())
+
+
+class HeadlessRunner:
+    """Drives one demo's callbacks on an offscreen context.
+
+    `setup`, if given, is called with the demo module after the context exists
+    and before the first frame, e.g. to populate the scene.
+    """
+
+    def __init__(self, name, width=None, height=None, setup=None):
+        self.name = name
+        self.width, self.height = width or DEMOS[name]['size'][0], height or DEMOS[name]['size'][1]
+        self.module = load_demo(name)
+        self.context = create_context(self.width, self.height)
+        if hasattr(self.module, 'init'):
+            self.module.init()
+        self.module.reshape(self.width, self.height)
+        if hasattr(self.module, 'spawn_diamond'):
+            self.module.spawn_diamond()
+        if setup is not None:
+            setup(self.module)
+        self.advance = getattr(self.module, DEMOS[name]['advance'])
+
+    def frame(self, dt):
+        """Advances the simulation by dt seconds and renders one frame.
+
+        There is no glutSwapBuffers here, so the frame ends with its
+        frame-boundary work: deleting the names the object pool queued
+        (PYOPENGL_OBJECT_POOL) and raising the GL errors deferred during it
+        (PYOPENGL_DEFERRED_ERROR_CHECKING).
+        """
+        self.advance(dt)
+        self.module.render()
+        from OpenGL import _configflags, error, objectpool
+        if _configflags.OBJECT_POOL:
+            objectpool.end_frame()
+        error.checkDeferredErrors(self.frame)
+
+    def run(self, frames, dt=1.0 / 60, on_frame=None, buffers=0):
+        """Renders `frames` frames; on_frame(index, image) receives each read-back frame.
+
+        With `buffers` > 0 frames are read back asynchronously through that many
+        pixel-pack buffers (OpenGL.GL.PixelReadPipeline): on_frame is called
+        `buffers - 1` frames late and the image is only valid during the call.
+        """
+        if on_frame is None:
+            from OpenGL.GL import glFinish
+            for index in range(frames):
+                self.frame(dt)
+                glFinish()
+            return
+        if not buffers:
+            for index in range(frames):
+                self.frame(dt)
+                on_frame(index, read_frame(self.width, self.height))
+            return
+        from OpenGL.GL import glPixelStorei, PixelReadPipeline, GL_PACK_ALIGNMENT, GL_RGB, GL_UNSIGNED_BYTE
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        pipeline = PixelReadPipeline(self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE, buffers=buffers)
+        delivered = 0
+        try:
+            for index in range(frames):
+                self.frame(dt)
+                pixels = pipeline.read()
+                if pixels is not None:
+                    on_frame(delivered, frame_image(pixels, self.width, self.height))
+                    delivered += 1
+            for pixels in pipeline.drain():
+                on_frame(delivered, frame_image(pixels, self.width, self.height))
+                delivered += 1
+        finally:
+            pipeline.delete()
+
+    def close(self):
+        self.context.destroy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('demo', choices=sorted(DEMOS))
+    parser.add_argument('--frames', type=int, default=60, help='number of frames to render')
+    parser.add_argument('--dt', type=float, default=1.0 / 60, help='simulated seconds per frame')
+    parser.add_argument('--size', help='WIDTHxHEIGHT, defaults to the demo\'s window size')
+    parser.add_argument('--output', help='directory to write frame_NNNNN.ppm images to')
+    parser.add_argument('--readback-buffers', type=int, default=3,
+                        help='pixel-pack buffers for asynchronous readback, 0 reads each frame synchronously')
+    args = parser.parse_args(argv)
+
+    width = height = None
+    if args.size:
+        width, height = (int(v) for v in args.size.lower().split('x'))
+    runner = HeadlessRunner(args.demo, width, height)
+    on_frame = None
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        def on_frame(index, image):
+            save_ppm(os.path.join(args.output, 'frame_%05d.ppm' % index), image)
+    try:
+        runner.run(args.frames, args.dt, on_frame, args.readback_buffers)
+    finally:
+        runner.close()
+
+
+if __name__ == '__main__':
+    main()
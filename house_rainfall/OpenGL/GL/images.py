@@ -13,7 +13,7 @@
         glCompressedTexSubImage1D
 """
 from OpenGL.raw.GL.VERSION import GL_1_1,GL_1_2, GL_3_0
-from OpenGL import images, arrays, wrapper
+from OpenGL import images, arrays, wrapper, _configflags
 from OpenGL.arrays import arraydatatype
 from OpenGL._bytes import bytes,integer_types
 from OpenGL.raw.GL import _types
@@ -143,6 +143,7 @@ __all__ = (
     'glReadPixelsus',
 
     'glGetTexImage',
+    'PixelReadPipeline',
 
     'glDrawPixels',
     'glDrawPixelsb',
@@ -226,6 +227,19 @@ __all__ = (
     #'glGetMinmax',
 )
 
+def _pixel_read_pool( type, outputType ):
+    """ImageBufferPool for a read into a new array, or None to allocate one
+
+    The array is reused when the caller only ever sees a copy of it (bytes
+    output), or for every read with OpenGL.READBACK_POOL set.
+    """
+    if _configflags.READBACK_POOL or (
+        outputType is bytes and _configflags.UNSIGNED_BYTE_IMAGES_AS_STRING
+        and type == GL_1_1.GL_UNSIGNED_BYTE
+    ):
+        return images.getReadbackPool()
+    return None
+
 def _get_texture_level_dims(target,level):
     """Retrieve texture dims for given level and target"""
     dims = []
@@ -261,7 +275,7 @@ for suffix,type in [
         arrayType = arrays.GL_CONSTANT_TO_ARRAY_TYPE[ images.TYPE_TO_ARRAYTYPE.get(type,type) ]
         
         if array is None:
-            array = imageData = images.SetupPixelRead( format, (width,height), type )
+            array = imageData = images.SetupPixelRead( format, (width,height), type, _pixel_read_pool( type, outputType ) )
             owned = True
         else:
             if isinstance( array, integer_types):
@@ -301,7 +315,7 @@ for suffix,type in [
         arrayType = arrays.GL_CONSTANT_TO_ARRAY_TYPE[ images.TYPE_TO_ARRAYTYPE.get(type,type) ]
         if array is None:
             dims = _get_texture_level_dims(target,level)
-            array = imageData = images.SetupPixelRead( format, tuple(dims), type )
+            array = imageData = images.SetupPixelRead( format, tuple(dims), type, _pixel_read_pool( type, outputType ) )
             owned = True
         else:
             if isinstance( array, integer_types):
@@ -357,7 +371,7 @@ def glReadPixels( x,y,width,height,format,type, array=None, outputType=bytes ):
 
     arrayType = arrays.GL_CONSTANT_TO_ARRAY_TYPE[ images.TYPE_TO_ARRAYTYPE.get(type,type) ]
     if array is None:
-        array = imageData = images.SetupPixelRead( format, (width,height), type )
+        array = imageData = images.SetupPixelRead( format, (width,height), type, _pixel_read_pool( type, outputType ) )
         owned = True
     else:
         if isinstance( array, integer_types):
@@ -397,7 +411,7 @@ def glGetTexImage( target, level,format,type, array=None, outputType=bytes ):
     arrayType = arrays.GL_CONSTANT_TO_ARRAY_TYPE[ images.TYPE_TO_ARRAYTYPE.get(type,type) ]
     if array is None:
         dims = _get_texture_level_dims(target,level)
-        array = imageData = images.SetupPixelRead( format, tuple(dims), type )
+        array = imageData = images.SetupPixelRead( format, tuple(dims), type, _pixel_read_pool( type, outputType ) )
     else:
         if isinstance( array, integer_types):
             imageData = ctypes.c_void_p( array )
@@ -412,6 +426,244 @@ def glGetTexImage( target, level,format,type, array=None, outputType=bytes ):
     else:
         return array
 
+class PixelReadPipeline( object ):
+    """Asynchronous glReadPixels through a ring of pixel-pack buffers
+
+    Basic usage (e.g. capturing every rendered frame):
+
+        pipeline = PixelReadPipeline( width, height, GL_RGB, GL_UNSIGNED_BYTE )
+        # every frame, after rendering
+        image = pipeline.read()
+        if image is not None:
+            save( image ) # the frame from buffers-1 frames ago
+        ...
+        for image in pipeline.drain():
+            save( image )
+        pipeline.delete()
+
+    read() starts reading the current frame into the next of `buffers`
+    GL_PIXEL_PACK_BUFFERs, which returns without waiting for the GL, and
+    fences it.  Once all the buffers are in flight it also returns the
+    oldest read, which has normally finished by then.  issue(), ready()
+    and fetch( block=False ) allow polling instead.
+
+    Results come back in the shape glReadPixels( ..., outputType=None )
+    would produce, in:
+
+        out -- if passed (any writable array glReadPixels accepts), the
+            pixels are copied into it, nothing is allocated per frame
+        a zero-copy read-only memoryview of the buffer's persistent
+            mapping -- in 'persistent' mode, valid until the next read()
+            or issue() reuses the buffer, use numpy.asarray( view ) for
+            an ndarray
+        the pipeline's destination array -- otherwise, allocated once
+            and overwritten by every fetch
+
+    Modes, depending on what the GL provides:
+
+        persistent -- glBufferStorage with a coherent persistent read
+            mapping (GL 4.4)
+        map_range -- glBufferData storage mapped with glMapBufferRange
+            for each fetch (GL 3.0)
+        sync -- no pixel-pack buffers, each read() is a synchronous
+            glReadPixels into a client-side array
+
+    stats counts reads, fetches, waits (fetches which found the GL still
+    busy) and the bytes copied.
+    """
+    WAIT_TIMEOUT = 1000000000 # 1s in ns, per glClientWaitSync call
+    def __init__(
+        self, width, height, format=GL_1_1.GL_RGB, type=GL_1_1.GL_UNSIGNED_BYTE,
+        buffers=3, x=0, y=0, mode=None,
+    ):
+        """Initialize the pipeline (GL objects are created on first read)
+
+        width, height, format, type, x, y -- as for glReadPixels
+        buffers -- number of reads in flight, results lag buffers-1 frames
+        mode -- force 'persistent', 'map_range' or 'sync', default is the
+            first one the GL supports
+        """
+        self.x, self.y = asInt(x), asInt(y)
+        self.width, self.height = asInt(width), asInt(height)
+        self.format = format
+        self.type = type
+        self.count = buffers
+        self.mode = mode
+        self.arrayType = arrays.GL_CONSTANT_TO_ARRAY_TYPE[ images.TYPE_TO_ARRAYTYPE.get(type,type) ]
+        self.destination = images.createTargetArray( format, (self.width,self.height), type )
+        self.shape = tuple( self.arrayType.dimensions( self.destination ))
+        self.nbytes = self.arrayType.arrayByteCount( self.destination )
+        from OpenGL.arrays.buffers import GL_TYPE_TO_ARRAY_CODE
+        self.typeCode = GL_TYPE_TO_ARRAY_CODE[ images.TYPE_TO_ARRAYTYPE.get(type,type) ]
+        self.buffers = []
+        self.pointers = []
+        self.fences = []
+        self.pending = []
+        self.slot = 0
+        self.stats = dict( reads=0, fetches=0, waits=0, bytes_copied=0 )
+    @staticmethod
+    def entry_points():
+        from OpenGL.raw.GL.VERSION import GL_1_5, GL_2_1, GL_3_0, GL_3_2, GL_4_4
+        return GL_1_5, GL_2_1, GL_3_0, GL_3_2, GL_4_4
+    def choose_mode( self ):
+        GL_1_5, GL_2_1, GL_3_0, GL_3_2, GL_4_4 = self.entry_points()
+        if not (GL_1_5.glGenBuffers and GL_3_0.glMapBufferRange):
+            return 'sync'
+        if GL_4_4.glBufferStorage and GL_3_2.glFenceSync:
+            return 'persistent'
+        return 'map_range'
+    def create_buffers( self ):
+        """Create the pixel-pack buffers (or client-side arrays in sync mode)"""
+        if self.mode is None:
+            self.mode = self.choose_mode()
+        if self.mode == 'sync':
+            self.buffers = [
+                images.createTargetArray( self.format, (self.width,self.height), self.type )
+                for i in range( self.count )
+            ]
+            self.fences = [None] * self.count
+            return self.buffers
+        GL_1_5, GL_2_1, GL_3_0, GL_3_2, GL_4_4 = self.entry_points()
+        names = (_types.GLuint * self.count)()
+        GL_1_5.glGenBuffers( self.count, names )
+        self.buffers = list( names )
+        self.pointers = [None] * self.count
+        self.fences = [None] * self.count
+        target = GL_2_1.GL_PIXEL_PACK_BUFFER
+        flags = GL_3_0.GL_MAP_READ_BIT | GL_4_4.GL_MAP_PERSISTENT_BIT | GL_4_4.GL_MAP_COHERENT_BIT
+        for index, buffer in enumerate( self.buffers ):
+            GL_1_5.glBindBuffer( target, buffer )
+            if self.mode == 'persistent':
+                GL_4_4.glBufferStorage( target, self.nbytes, None, flags )
+                self.pointers[index] = GL_3_0.glMapBufferRange( target, 0, self.nbytes, flags )
+            else:
+                GL_1_5.glBufferData( target, self.nbytes, None, GL_1_5.GL_STREAM_READ )
+        GL_1_5.glBindBuffer( target, 0 )
+        return self.buffers
+    def delete( self ):
+        """Delete the buffers and fences, discarding reads still pending"""
+        if self.mode != 'sync' and self.buffers:
+            GL_1_5, GL_2_1, GL_3_0, GL_3_2, GL_4_4 = self.entry_points()
+            target = GL_2_1.GL_PIXEL_PACK_BUFFER
+            for fence in self.fences:
+                if fence is not None:
+                    GL_3_2.glDeleteSync( fence )
+            for buffer, pointer in zip( self.buffers, self.pointers ):
+                if pointer:
+                    GL_1_5.glBindBuffer( target, buffer )
+                    GL_1_5.glUnmapBuffer( target )
+            GL_1_5.glBindBuffer( target, 0 )
+            GL_1_5.glDeleteBuffers( len(self.buffers), (_types.GLuint * len(self.buffers))( *self.buffers ))
+        self.buffers = []
+        self.pointers = []
+        self.fences = []
+        del self.pending[:]
+    def issue( self ):
+        """Start reading the current frame into the next buffer"""
+        if not self.buffers:
+            self.create_buffers()
+        if len( self.pending ) >= self.count:
+            raise RuntimeError( """All %s buffers are in flight, fetch() before issuing another read"""%( self.count, ))
+        slot = self.slot
+        images.setupDefaultTransferMode()
+        images.rankPacking( 3 )
+        if self.mode == 'sync':
+            GL_1_1.glReadPixels(
+                self.x, self.y, self.width, self.height, self.format, self.type,
+                self.arrayType.voidDataPointer( self.buffers[slot] ),
+            )
+        else:
+            GL_1_5, GL_2_1, GL_3_0, GL_3_2, GL_4_4 = self.entry_points()
+            target = GL_2_1.GL_PIXEL_PACK_BUFFER
+            GL_1_5.glBindBuffer( target, self.buffers[slot] )
+            # with a pack buffer bound the pixels argument is an offset into it
+            GL_1_1.glReadPixels(
+                self.x, self.y, self.width, self.height, self.format, self.type,
+                ctypes.c_void_p( 0 ),
+            )
+            GL_1_5.glBindBuffer( target, 0 )
+            if GL_3_2.glFenceSync:
+                self.fences[slot] = GL_3_2.glFenceSync( GL_3_2.GL_SYNC_GPU_COMMANDS_COMPLETE, 0 )
+        self.pending.append( slot )
+        self.slot = (slot + 1) % self.count
+        self.stats['reads'] += 1
+    def ready( self ):
+        """Has the oldest pending read finished (never blocks)?"""
+        if not self.pending:
+            return False
+        fence = self.fences[self.pending[0]]
+        if fence is None:
+            return True
+        GL_1_5, GL_2_1, GL_3_0, GL_3_2, GL_4_4 = self.entry_points()
+        result = GL_3_2.glClientWaitSync( fence, GL_3_2.GL_SYNC_FLUSH_COMMANDS_BIT, 0 )
+        return result in (GL_3_2.GL_ALREADY_SIGNALED, GL_3_2.GL_CONDITION_SATISFIED)
+    def wait( self, slot ):
+        fence = self.fences[slot]
+        if fence is None:
+            return
+        GL_1_5, GL_2_1, GL_3_0, GL_3_2, GL_4_4 = self.entry_points()
+        self.fences[slot] = None
+        while True:
+            result = GL_3_2.glClientWaitSync( fence, GL_3_2.GL_SYNC_FLUSH_COMMANDS_BIT, self.WAIT_TIMEOUT )
+            if result != GL_3_2.GL_ALREADY_SIGNALED:
+                self.stats['waits'] += 1
+            if result != GL_3_2.GL_TIMEOUT_EXPIRED:
+                break
+        GL_3_2.glDeleteSync( fence )
+        if result == GL_3_2.GL_WAIT_FAILED:
+            raise RuntimeError( """glClientWaitSync failed for pixel-pack buffer %s"""%( slot, ))
+    def fetch( self, out=None, block=True ):
+        """Retrieve the oldest pending read (see the class docstring for out)
+
+        block -- if False, return None instead of waiting when the read has
+            not finished yet (or nothing is pending)
+        """
+        if not self.pending or not (block or self.ready()):
+            return None
+        slot = self.pending.pop( 0 )
+        self.wait( slot )
+        self.stats['fetches'] += 1
+        if out is None and self.mode == 'persistent':
+            view = memoryview( (ctypes.c_ubyte * self.nbytes).from_address( self.pointers[slot] ))
+            return view.toreadonly().cast( 'B' ).cast( self.typeCode, self.shape )
+        if out is None:
+            out = self.destination
+        else:
+            out = self.arrayType.asArray( out )
+            if self.arrayType.arrayByteCount( out ) < self.nbytes:
+                raise ValueError( """Destination has %s bytes, the image needs %s"""%(
+                    self.arrayType.arrayByteCount( out ), self.nbytes,
+                ))
+        target = self.arrayType.voidDataPointer( out )
+        if self.mode == 'sync':
+            ctypes.memmove( target, self.arrayType.voidDataPointer( self.buffers[slot] ), self.nbytes )
+        elif self.mode == 'persistent':
+            ctypes.memmove( target, self.pointers[slot], self.nbytes )
+        else:
+            GL_1_5, GL_2_1, GL_3_0, GL_3_2, GL_4_4 = self.entry_points()
+            bufferTarget = GL_2_1.GL_PIXEL_PACK_BUFFER
+            GL_1_5.glBindBuffer( bufferTarget, self.buffers[slot] )
+            pointer = GL_3_0.glMapBufferRange( bufferTarget, 0, self.nbytes, GL_3_0.GL_MAP_READ_BIT )
+            ctypes.memmove( target, pointer, self.nbytes )
+            GL_1_5.glUnmapBuffer( bufferTarget )
+            GL_1_5.glBindBuffer( bufferTarget, 0 )
+        self.stats['bytes_copied'] += self.nbytes
+        return out
+    def read( self, out=None ):
+        """Issue a read of the current frame, returns the oldest one once all buffers are in flight"""
+        if len( self.pending ) >= self.count:
+            result = self.fetch( out )
+            self.issue()
+            return result
+        self.issue()
+        if len( self.pending ) >= self.count:
+            return self.fetch( out )
+        return None
+    def drain( self, out=None ):
+        """Yield the reads still pending, oldest first"""
+        while self.pending:
+            yield self.fetch( out )
+
 
 INT_DIMENSION_NAMES = [
     'width','height','depth','x','y','z',
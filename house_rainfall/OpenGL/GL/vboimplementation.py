@@ -1,5 +1,5 @@
 from OpenGL.arrays import vbo
-from OpenGL.GL.VERSION import GL_1_5, GL_3_0, GL_3_1
+from OpenGL.GL.VERSION import GL_1_5, GL_3_0, GL_3_1, GL_3_2, GL_4_4
 
 class Implementation( vbo.Implementation ):
     """OpenGL-based implementation of VBO interfaces"""
@@ -15,6 +15,7 @@ class Implementation( vbo.Implementation ):
                     found = True 
                     break 
             assert found, name
+        self.load_optional( GL_3_0, GL_3_2, GL_4_4 )
         if GL_1_5.glBufferData:
             self.available = True
 
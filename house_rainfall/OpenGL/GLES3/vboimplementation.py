@@ -15,6 +15,7 @@ class Implementation( vbo.Implementation ):
                     else:
                         found = True
                 assert found, name
+        self.load_optional( GLES3_3_0 )
         if GLES3_3_0.glBufferData:
             self.available = True
 Implementation.register()
@@ -16,4 +16,10 @@ from OpenGL import (
     UNSIGNED_BYTE_IMAGES_AS_STRING,
     MODULE_ANNOTATIONS,
     TYPE_ANNOTATIONS,
+    WRAPPER_CODEGEN,
+    SCALAR_FAST_PATH,
+    DEFERRED_ERROR_CHECKING,
+    OBJECT_POOL,
+    READBACK_POOL,
+    STATE_CACHE,
 )
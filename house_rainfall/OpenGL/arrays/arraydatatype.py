@@ -25,6 +25,15 @@ if acceleratesupport.ACCELERATE_AVAILABLE:
 if ADT is None:
     # Python-coded version
     class HandlerRegistry(dict):
+        """Registry of format handlers by type (and by plugin name)
+
+        Attributes:
+
+            dispatch -- exact type -> handler table consulted first on every
+                lookup (and inline by ArrayDatatype), filled as types are
+                resolved and cleared whenever a handler is registered, so
+                steady-state lookups are a single dict hit
+        """
         GENERIC_OUTPUT_PREFERENCES = ["numpy", "ctypesarrays"]
 
         def __init__(self, plugin_match):
@@ -32,9 +41,22 @@ if ADT is None:
             self.output_handler = None
             self.preferredOutput = None
             self.all_output_handlers = []
+            self.dispatch = {}
+
+        def __setitem__(self, key, handler):
+            """Register handler for key, invalidating the dispatch table"""
+            dict.__setitem__(self, key, handler)
+            self.dispatch.clear()
 
         def __call__(self, value):
             """Lookup of handler for given value"""
+            try:
+                return self.dispatch[value.__class__]
+            except (KeyError, AttributeError):
+                return self.lookup(value)
+
+        def lookup(self, value):
+            """Resolve the handler for value's type via __mro__ and plugins"""
             try:
                 typ = value.__class__
             except AttributeError:
@@ -54,12 +76,14 @@ if ADT is None:
                             self[typ] = handler
                             if hasattr(handler, "registerEquivalent"):
                                 handler.registerEquivalent(typ, base)
+                            self.dispatch[typ] = handler
                             return handler
                 print(self.keys())
                 raise TypeError(
                     """No array-type handler for type %s.%s (value: %s) registered"""
                     % (typ.__module__, typ.__name__, repr(value)[:50])
                 )
+            self.dispatch[typ] = handler
             return handler
 
         def handler_by_plugin_name(self, name):
@@ -110,6 +134,7 @@ if ADT is None:
 
     GLOBAL_REGISTRY = HandlerRegistry(plugins.FormatHandler.match)
     formathandler.FormatHandler.TYPE_REGISTRY = GLOBAL_REGISTRY
+    _dispatch = GLOBAL_REGISTRY.dispatch.get
 
     class ArrayDatatype(object):
         """Mix-in for array datatype classes
@@ -132,7 +157,8 @@ if ADT is None:
 
         def from_param(cls, value, typeConstant=None):
             """Given a value in a known data-pointer type, convert to a ctypes pointer"""
-            return cls.getHandler(value).from_param(value, cls.typeConstant)
+            handler = _dispatch(value.__class__) or cls.getHandler(value)
+            return handler.from_param(value, cls.typeConstant)
 
         from_param = classmethod(logs.logOnFail(from_param, _log))
 
@@ -168,7 +194,8 @@ if ADT is None:
 
         def asArray(cls, value, typeCode=None):
             """Given a value, convert to preferred array representation"""
-            return cls.getHandler(value).asArray(value, typeCode or cls.typeConstant)
+            handler = _dispatch(value.__class__) or cls.getHandler(value)
+            return handler.asArray(value, typeCode or cls.typeConstant)
 
         asArray = classmethod(logs.logOnFail(asArray, _log))
 
@@ -184,7 +211,8 @@ if ADT is None:
 
         def arraySize(cls, value, typeCode=None):
             """Given a data-value, calculate dimensions for the array (number-of-units)"""
-            return cls.getHandler(value).arraySize(value, typeCode or cls.typeConstant)
+            handler = _dispatch(value.__class__) or cls.getHandler(value)
+            return handler.arraySize(value, typeCode or cls.typeConstant)
 
         arraySize = classmethod(logs.logOnFail(arraySize, _log))
 
@@ -214,7 +242,8 @@ if ADT is None:
 
             For most data-types this is arraySize() * atomic-unit-size
             """
-            return cls.getHandler(value).arrayByteCount(value)
+            handler = _dispatch(value.__class__) or cls.getHandler(value)
+            return handler.arrayByteCount(value)
 
         arrayByteCount = classmethod(logs.logOnFail(arrayByteCount, _log))
 
@@ -4,12 +4,12 @@
 Will *only* work for Python 2.6+, and pretty much just works for strings
 under 2.6 (in terms of the common object types).
 """
-import sys,operator,logging,traceback
+import array,ctypes,sys,operator,logging,traceback
 from OpenGL.arrays import _buffers
 from OpenGL.raw.GL import _types
 #from OpenGL.raw.GL.VERSION import GL_1_1
 from OpenGL.arrays import formathandler
-from OpenGL import _configflags
+from OpenGL import _configflags, error
 from OpenGL import acceleratesupport
 _log = logging.getLogger( __name__ )
 try:
@@ -33,30 +33,51 @@ if sys.version_info[:2] > (2,6):
             BufferHandler = MemoryviewHandler
 if not BufferHandler:
     class BufferHandler( formathandler.FormatHandler ):
-        """Buffer-protocol data-type handler for OpenGL"""
+        """Buffer-protocol data-type handler for OpenGL
+
+        Handles any object exporting the buffer protocol (bytearray,
+        memoryview, array.array, mmap.mmap...) through a memoryview of it.
+        C-contiguous buffers are passed to GL without copying: writable ones
+        via ctypes' from_buffer, read-only ones via a Py_buffer export.
+
+        Strided (non C-contiguous) buffers, and typed buffers whose format
+        does not match the requested GL type, have to be copied, which
+        raises CopyError when ERROR_ON_COPY is set.  Byte-format buffers
+        (bytearray, mmap...) are untyped storage and are never converted.
+        """
         isOutput=False
         ERROR_ON_COPY = _configflags.ERROR_ON_COPY
-        if sys.version_info[0] >= 3:
-            @classmethod
-            def from_param( cls, value, typeCode=None ):
-                if not isinstance( value, _buffers.Py_buffer ):
-                    value = cls.asArray( value )
-                    #raise TypeError( """Can't convert value to py-buffer in from_param""" )
-                # TODO: only do this IFF value.internal is None
+        @classmethod
+        def from_param( cls, value, typeCode=None ):
+            if isinstance( value, _buffers.Py_buffer ):
                 return _types.GLvoidp( value.buf )
-#                return value
-        else:
-            @classmethod
-            def from_param( cls, value, typeCode=None ):
-                if not isinstance( value, _buffers.Py_buffer ):
-                    value = cls.asArray( value )
-                    #raise TypeError( """Can't convert value to py-buffer in from_param""" )
-                return value.buf
+            value = cls.asArray( value, typeCode )
+            pointer = _types.GLvoidp( cls.dataPointer( value ) )
+            # keeps the export (and any copy) alive for the duration of the call
+            pointer._temporary_array_ = (value,)
+            return pointer
+        @staticmethod
         def dataPointer( value ):
-            if not isinstance( value, _buffers.Py_buffer ):
-                value = _buffers.Py_buffer.from_object( value )
-            return value.buf
-        dataPointer = staticmethod( dataPointer )
+            """Address of the first byte of a C-contiguous buffer (None if empty)"""
+            # nothing here keeps value's memory alive, the caller must hold value (the view asArray returned)
+            if isinstance( value, _buffers.Py_buffer ):
+                return value.buf
+            try:
+                return ctypes.addressof( ctypes.c_char.from_buffer( value ) )
+            except ValueError:
+                # empty buffer
+                return None
+            except TypeError:
+                # read-only (or strided, which from_object refuses too)
+                return _buffers.Py_buffer.from_object( value ).buf
+        @classmethod
+        def view( cls, value ):
+            """memoryview of value (Py_buffer instances are viewed as bytes)"""
+            if isinstance( value, memoryview ):
+                return value
+            if isinstance( value, _buffers.Py_buffer ):
+                return memoryview( (ctypes.c_char * value.len).from_address( value.buf ) ).cast( 'B' )
+            return memoryview( value )
         @classmethod
         def zeros( cls, dims, typeCode=None ):
             """Currently don't allow strings as output types!"""
@@ -69,30 +90,80 @@ if not BufferHandler:
         @classmethod
         def arrayToGLType( cls, value ):
             """Given a value, guess OpenGL type of the corresponding pointer"""
-            format = value.format 
+            format = native_format( cls.view( value ).format )
             if format in ARRAY_TO_GL_TYPE_MAPPING:
                 return ARRAY_TO_GL_TYPE_MAPPING[format]
             raise TypeError( 'Unknown format: %r'%(format,))
         @classmethod
         def arraySize( cls, value, typeCode = None ):
             """Given a data-value, calculate ravelled size for the array"""
-            return value.len // value.itemsize
+            view = cls.view( value )
+            return view.nbytes // view.itemsize
         @classmethod
         def arrayByteCount( cls, value, typeCode = None ):
             """Given a data-value, calculate number of bytes required to represent"""
-            return value.len
+            return cls.view( value ).nbytes
         @classmethod 
         def unitSize( cls, value, default=None ):
-            return value.dims[-1]
+            shape = cls.view( value ).shape
+            return shape[-1] if shape else 1
         @classmethod
         def asArray( cls, value, typeCode=None ):
-            """Convert given value to an array value of given typeCode"""
-            buf = _buffers.Py_buffer.from_object( value )
-            return buf
+            """Convert given value to a C-contiguous memoryview of given typeCode
+
+            Returns a view of value itself whenever no copy is needed.
+            """
+            if isinstance( value, _buffers.Py_buffer ):
+                return value
+            view = cls.view( value )
+            format = native_format( view.format )
+            convert = (
+                typeCode is not None
+                and format not in UNTYPED_FORMATS
+                and GL_TYPE_TO_ARRAY_CODE.get( typeCode, format ) != format
+            )
+            if not convert and view.c_contiguous:
+                return view
+            if cls.ERROR_ON_COPY:
+                raise error.CopyError(
+                    """%s passed, cannot copy with ERROR_ON_COPY set (%s), please pass a C-contiguous buffer of the matching type"""%(
+                        value.__class__.__name__,
+                        'format %r needs conversion to %s'%( view.format, typeCode ) if convert else 'buffer is not C-contiguous',
+                    )
+                )
+            if convert:
+                items = memoryview( view.tobytes() ).cast( format )
+                code = GL_TYPE_TO_ARRAY_CODE[typeCode]
+                if code not in 'fd':
+                    # array.array refuses floats for integer codes, truncate
+                    # them the way the numpy and list handlers do
+                    items = map( int, items )
+                converted = array.array( code, items )
+                return memoryview( converted ).cast( 'B' ).cast( converted.typecode, view.shape )
+            return memoryview( bytearray( view ) ).cast( format, view.shape )
         @classmethod
         def dimensions( cls, value, typeCode=None ):
             """Determine dimensions of the passed array value (if possible)"""
-            return value.dims
+            return cls.view( value ).shape
+
+def native_format( format ):
+    """Strip native byte order/alignment markers from a struct format"""
+    if format[:1] in NATIVE_ORDER:
+        return format[1:]
+    return format
+NATIVE_ORDER = ('@', '=', '<' if sys.byteorder == 'little' else '>')
+# raw storage, passed as-is whatever GL type is requested
+UNTYPED_FORMATS = ('B', 'b', 'c')
+GL_TYPE_TO_ARRAY_CODE = {
+    _buffers.GL_FLOAT: 'f',
+    _buffers.GL_DOUBLE: 'd',
+    _buffers.GL_INT: 'i',
+    _buffers.GL_UNSIGNED_INT: 'I',
+    _buffers.GL_SHORT: 'h',
+    _buffers.GL_UNSIGNED_SHORT: 'H',
+    _buffers.GL_BYTE: 'b',
+    _buffers.GL_UNSIGNED_BYTE: 'B',
+}
 
 ARRAY_TO_GL_TYPE_MAPPING = _buffers.ARRAY_TO_GL_TYPE_MAPPING
 BYTE_SIZES = _buffers.BYTE_SIZES
@@ -7,7 +7,7 @@ ErrorChecker is an _ErrorChecker instance that allows you
 to register a new error-checking function for use 
 throughout the system.
 """
-import logging
+import collections, logging
 _log = logging.getLogger( 'OpenGL.error' )
 from OpenGL import platform, _configflags
 from ctypes import ArgumentError
@@ -57,7 +57,21 @@ class GLError( Error ):
         cArguments -- ctypes-level arguments to the operation,
             often raw integers for pointers and the like
         description -- OpenGL description of the error (textual)
+        syncPoint -- with DEFERRED_ERROR_CHECKING, the call at which
+            the error was detected
+        recentCalls -- with DEFERRED_ERROR_CHECKING, the recorded
+            (operation, cArguments) calls since the last clean check,
+            oldest first; when droppedCalls is 0 the error was raised by
+            baseOperation (the oldest of them) or one of the calls
+            following it
+        droppedCalls -- with DEFERRED_ERROR_CHECKING, the number of calls
+            since the last clean check which no longer fit in recentCalls;
+            if not 0 the failing call may be one of them, so baseOperation
+            is the sync point instead
     """
+    syncPoint = None
+    recentCalls = None
+    droppedCalls = None
     def __init__( 
         self, 
         err=None, 
@@ -82,6 +96,9 @@ class GLError( Error ):
         'err', 
         'description',
         'baseOperation',
+        'syncPoint',
+        'droppedCalls',
+        'recentCalls',
         'pyArgs', 
         'cArgs',
         'cArguments',
@@ -145,6 +162,23 @@ class GLError( Error ):
             return r
         else:
             return r[:117] + '...'
+    def format_syncPoint( self, property, value ):
+        """Format the sync point as its operation name"""
+        return self.format_baseOperation( property, value )
+    def format_droppedCalls( self, property, value ):
+        """Warn that the failing call may be older than recentCalls"""
+        if not value:
+            return None
+        return '%s = %s (the failing call may not be in recentCalls)'%( property, value )
+    def format_recentCalls( self, property, value ):
+        """Format recorded calls as one name(cArguments) line each"""
+        lines = []
+        for (operation,cArguments) in value:
+            arguments = repr( tuple(cArguments or ()) )
+            if len(arguments) > 80:
+                arguments = arguments[:77] + '...'
+            lines.append( '%s%s'%( getattr( operation, '__name__', operation ), arguments ))
+        return '%s = [\n\t\t%s\n\t]'%( property, ',\n\t\t'.join( lines ))
     def format_baseOperation( self, property, value ):
         """Format a baseOperation reference for display"""
         if hasattr( value, '__name__' ):
@@ -160,6 +194,13 @@ class GLUTError( Error ):
 class EGLError( GLError ):
     """EGL error implementation class"""
 
+# (operation, cArguments) of the calls since the last check in deferred mode,
+# shared by all the GL-family checkers as they share one glGetError
+DEFERRED_HISTORY = 16
+_deferredCalls = collections.deque( maxlen=DEFERRED_HISTORY )
+# calls pushed out of _deferredCalls since the last check
+_deferredDropped = 0
+
 if _configflags.ERROR_CHECKING:
     from OpenGL import acceleratesupport
     _ErrorChecker = None
@@ -176,10 +217,18 @@ if _configflags.ERROR_CHECKING:
                 _registeredChecker -- the checking function enabled when 
                     not doing onBegin/onEnd processing
                 _currentChecker -- currently active checking function
+                _deferred -- whether glCheckError only records the call
+                    for checkDeferred (DEFERRED_ERROR_CHECKING)
             """
             _getErrors = None
-            def __init__( self, platform, baseOperation=None, noErrorResult=0, errorClass=GLError ):
-                """Initialize from a platform module/reference"""
+            _deferred = False
+            _recording = True
+            def __init__( self, platform, baseOperation=None, noErrorResult=0, errorClass=GLError, deferred=None ):
+                """Initialize from a platform module/reference
+
+                deferred -- if None, defer GLError checks when
+                    DEFERRED_ERROR_CHECKING is set
+                """
                 self._isValid = platform.CurrentContextIsValid
                 self._getErrors = baseOperation
                 self._noErrorResult = noErrorResult
@@ -192,6 +241,12 @@ if _configflags.ERROR_CHECKING:
                 else:
                     self._registeredChecker = self.nullGetError
                 self._currentChecker = self._registeredChecker
+                if deferred is None:
+                    deferred = _configflags.DEFERRED_ERROR_CHECKING and errorClass is GLError
+                if deferred and self._getErrors:
+                    self._deferred = True
+                    # bound as the errcheck of every function created from now on
+                    self.glCheckError = self.recordCall
             def __bool__( self ):
                 """We are "true" if we actually do anything"""
                 if self._registeredChecker is self.nullGetError:
@@ -234,14 +289,71 @@ if _configflags.ERROR_CHECKING:
                         baseOperation = baseOperation,
                     )
                 return result
+            def recordCall(
+                self,
+                result,
+                baseOperation=None,
+                cArguments=None,
+                *args
+            ):
+                """Deferred-mode errcheck: remember the call for checkDeferred"""
+                global _deferredDropped
+                if self._recording:
+                    if len( _deferredCalls ) == DEFERRED_HISTORY:
+                        _deferredDropped += 1
+                    _deferredCalls.append( (baseOperation, cArguments) )
+                return result
+            def checkDeferred( self, syncPoint=None ):
+                """Check for errors raised by the calls since the last check
+
+                Called at sync points (glFinish, glFlush, glutSwapBuffers) in
+                deferred mode, can also be called explicitly.  A GL error
+                raises a GLError naming the oldest call recorded since the
+                last check, with recentCalls listing the candidates.  If
+                more calls were made than DEFERRED_HISTORY keeps, the
+                failing call may be lost and the error names syncPoint.
+                """
+                global _deferredDropped
+                err = self._currentChecker()
+                calls = list( _deferredCalls )
+                dropped = _deferredDropped
+                _deferredCalls.clear()
+                _deferredDropped = 0
+                if err != self._noErrorResult:
+                    if calls and not dropped:
+                        baseOperation, cArguments = calls[0]
+                    else:
+                        baseOperation, cArguments = syncPoint, None
+                    exception = self._errorClass(
+                        err,
+                        cArguments = cArguments,
+                        baseOperation = baseOperation,
+                    )
+                    exception.syncPoint = syncPoint
+                    exception.recentCalls = calls
+                    exception.droppedCalls = dropped
+                    raise exception
             def onBegin( self ):
                 """Called by glBegin to record the fact that glGetError won't work"""
                 self._currentChecker = self.nullGetError
+                self._recording = False
             def onEnd( self ):
                 """Called by glEnd to record the fact that glGetError will work"""
                 self._currentChecker = self._registeredChecker
+                self._recording = True
 else:
     _ErrorChecker = None
+
+def checkDeferredErrors( syncPoint=None ):
+    """Raise any GL error deferred since the last check (DEFERRED_ERROR_CHECKING)
+
+    A no-op unless deferred checking is enabled.
+    """
+    from OpenGL.raw.GL import _errors
+    checker = _errors._error_checker
+    if checker is not None and getattr( checker, '_deferred', False ):
+        checker.checkDeferred( syncPoint )
+
 # Compatibility with PyOpenGL 2.x series
 GLUerror = GLUError
 GLerror = GLError 
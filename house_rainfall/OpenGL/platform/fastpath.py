@@ -0,0 +1,101 @@
+"""Direct ctypes binding of scalar-only GL entry points (see OpenGL.SCALAR_FAST_PATH)
+
+Normally every raw GL entry point starts out as a _NullFunctionPointer which
+resolves the real ctypes function on its first call and then forwards to it,
+and the ctypes function calls the error checker after every call.  With
+SCALAR_FAST_PATH set, core GL entry points whose arguments are all scalars
+(glVertex2f, glColor3f, glPointSize, glViewport...) are resolved when they
+are declared and the declaring module gets the ctypes function itself, with
+its fixed argtypes.
+
+The immediate-mode attribute calls which are legal between glBegin and glEnd
+and cannot raise GL errors (glVertex*, glColor*, glNormal*, glTexCoord*...)
+are bound without error checking at all, so no Python code runs for them.
+Inside glBegin/glEnd the error checker would skip glGetError anyway; outside
+of it they generate no errors, and anything they leave behind is reported by
+the next checked call.  Other scalar entry points keep their error checker.
+
+The mode is disabled when CONTEXT_CHECKING, ERROR_LOGGING or FULL_LOGGING
+need to wrap the functions.  report() tells which entry points were routed;
+benchmark.py counts the demo's calls that went through them.
+"""
+import ctypes, logging, re
+from OpenGL import _configflags
+_log = logging.getLogger( 'OpenGL.platform.fastpath' )
+
+# entry points which are valid inside glBegin/glEnd and generate no GL errors
+IMMEDIATE_NAMES = re.compile(
+    r'^gl(Vertex|Color|Normal|TexCoord|Index|EdgeFlag|SecondaryColor|FogCoord|EvalCoord|EvalPoint)'
+    r'[1-4]?(b|s|i|f|d|ub|us|ui)?$'
+)
+NON_SCALAR_TYPES = (ctypes.c_char_p, ctypes.c_wchar_p, ctypes.c_void_p)
+
+IMMEDIATE = 'immediate'
+CHECKED = 'checked'
+# name -> (kind, ctypes function) for every routed entry point
+ROUTED = {}
+
+def is_scalar( typ ):
+    """Is typ a ctypes scalar type (not a pointer, string or array type)?"""
+    return (
+        isinstance( typ, type )
+        and issubclass( typ, ctypes._SimpleCData )
+        and not issubclass( typ, NON_SCALAR_TYPES )
+    )
+
+def is_immediate( name ):
+    """Is name an error-free attribute call valid inside glBegin/glEnd?"""
+    return IMMEDIATE_NAMES.match( name ) is not None
+
+def enabled():
+    return (
+        _configflags.SCALAR_FAST_PATH
+        and not _configflags.CONTEXT_CHECKING
+        and not _configflags.ERROR_LOGGING
+        and not _configflags.FULL_LOGGING
+    )
+
+def bind( function, dll, extension, deprecated=False, error_checker=None ):
+    """Return the ctypes function for a scalar-only core GL declaration, or None
+
+    function -- declaration decorated by OpenGL.platform.types
+    """
+    from OpenGL import platform
+    name = function.__name__
+    if (
+        dll is not platform.PLATFORM.GL
+        or not extension or extension.split('_')[1] != 'VERSION'
+        or (deprecated and _configflags.FORWARD_COMPATIBLE_ONLY)
+        or not (function.resultType is None or is_scalar( function.resultType ))
+        or not all( is_scalar( typ ) for typ in function.argTypes )
+    ):
+        return None
+    kind = IMMEDIATE if is_immediate( name ) else CHECKED
+    try:
+        func = platform.PLATFORM.constructFunction(
+            name, dll,
+            resultType=function.resultType, argTypes=function.argTypes,
+            argNames=function.argNames,
+            extension=extension,
+            deprecated=deprecated,
+            error_checker=error_checker if kind == CHECKED else None,
+        )
+    except AttributeError as err:
+        _log.debug( 'No fast path for %s: %s', name, err )
+        return None
+    ROUTED[name] = (kind, func)
+    return func
+
+def is_routed( func ):
+    """Is func (a module attribute) one of the routed ctypes functions?"""
+    name = getattr( func, '__name__', None )
+    return name in ROUTED and ROUTED[name][1] is func
+
+def report():
+    """Summarise the routed entry points as {kind: sorted names}"""
+    result = {IMMEDIATE: [], CHECKED: []}
+    for name, (kind, func) in ROUTED.items():
+        result[kind].append( name )
+    for names in result.values():
+        names.sort()
+    return result
@@ -11,6 +11,7 @@ class LookupInt( object ):
     def __int__( self ):
         global _get
         if _get is None:
+            # with STATE_CACHE this answers from OpenGL.GL.statecache
             from OpenGL.GL import glGetIntegerv
             _get = glGetIntegerv
         output = self.format()
@@ -0,0 +1,224 @@
+"""Straight-line call functions for OpenGL.wrapper.Wrapper (see OpenGL.WRAPPER_CODEGEN)
+
+Without OpenGL_accelerate, Wrapper.finaliseCall builds each wrapper's call out
+of the generic calculate_pyArgs/calculate_cArgs/calculate_cArguments generator
+pipelines, which iterate over the converter lists and build intermediate
+tuples on every call.  With WRAPPER_CODEGEN set, Wrapper.finalise instead asks
+specialise() for a function generated for the wrapper's exact converter
+layout: one tuple display per stage, DefaultCConverters and pass-through
+arguments inlined as plain indexing, no generators and no per-call branches.
+
+Only the happy path is specialised.  If any converter raises (or required
+arguments are missing) the call is re-run through the generic call function
+so that errors are reported exactly as before, and a wrapper whose code cannot
+be generated keeps the generic call function.
+
+Wrappers with the same layout share the generated code.  Compiled code is
+cached in memory and in a marshal file keyed by the PyOpenGL version and the
+Python bytecode magic number, in $PYOPENGL_WRAPPER_CODEGEN_CACHE (default
+$XDG_CACHE_HOME/pyopengl or ~/.cache/pyopengl), so later processes skip the
+compile step.  The file is rewritten at exit when new layouts were compiled.
+"""
+import atexit, ctypes, importlib.util, logging, marshal, os, tempfile
+from OpenGL import error
+from OpenGL.version import __version__
+from OpenGL.converters import DefaultCConverter
+from OpenGL._null import NULL
+_log = logging.getLogger( 'OpenGL.wrappercodegen' )
+
+PASS = 'p'
+CALL = 'c'
+OPTIONAL = 'o'
+CONSTANT = 'k'
+DEFAULT = 'd'
+
+def layout( wrapper ):
+    """Describe wrapper's converters as a hashable key for the generated code"""
+    pyConverters = getattr( wrapper, 'pyConverters', None ) or ()
+    cConverters = getattr( wrapper, 'cConverters', None ) or ()
+    cResolvers = getattr( wrapper, 'cResolvers', None ) or ()
+    py = tuple(
+        PASS if converter is None else
+        OPTIONAL if getattr( converter, 'optional', False ) else
+        CALL
+        for converter in pyConverters
+    )
+    c = tuple(
+        (DEFAULT, converter.index) if isinstance( converter, DefaultCConverter ) else
+        CALL if hasattr( converter, '__call__' ) else
+        CONSTANT
+        for converter in cConverters
+    )
+    resolvers = tuple(
+        PASS if converter is None else CALL
+        for converter in cResolvers
+    )
+    return (
+        py, c, resolvers,
+        getattr( wrapper, 'storeValues', None ) is not None,
+        getattr( wrapper, 'returnValues', None ) is not None,
+    )
+
+def source( key ):
+    """Generate the source of build(), which returns wrapperCall for layout key"""
+    py, c, resolvers, store, returns = key
+    lines = [
+        'def build( self, wrappedOperation, fallback, pyConverters, cConverters, cResolvers, storeValues, returnValues ):',
+    ]
+    for i, kind in enumerate( py ):
+        if kind != PASS:
+            lines.append( '    py_%d = pyConverters[%d]' % (i, i) )
+    for i, kind in enumerate( c ):
+        if kind in (CALL, CONSTANT):
+            lines.append( '    c_%d = cConverters[%d]' % (i, i) )
+    for i, kind in enumerate( resolvers ):
+        if kind == CALL:
+            lines.append( '    r_%d = cResolvers[%d]' % (i, i) )
+    lines.append( '    def wrapperCall( *args ):' )
+    lines.append( '        try:' )
+    if py:
+        items = []
+        for i, kind in enumerate( py ):
+            if kind == PASS:
+                items.append( 'args[%d]' % (i,) )
+            elif kind == CALL:
+                items.append( 'py_%d( args[%d], self, args )' % (i, i) )
+            else:
+                items.append( '(py_%d( args[%d], self, args ) if len( args ) > %d else NULL)' % (i, i, i) )
+        lines.append( '            pyArgs = (%s,)' % (', '.join( items ),) )
+    else:
+        lines.append( '            pyArgs = args' )
+    if c:
+        items = []
+        for i, kind in enumerate( c ):
+            if kind == CALL:
+                items.append( 'c_%d( pyArgs, %d, self )' % (i, i) )
+            elif kind == CONSTANT:
+                items.append( 'c_%d' % (i,) )
+            else:
+                items.append( 'pyArgs[%d]' % (kind[1],) )
+        lines.append( '            cArgs = (%s,)' % (', '.join( items ),) )
+    else:
+        lines.append( '            cArgs = pyArgs' )
+    if resolvers:
+        items = [
+            'cArgs[%d]' % (i,) if kind == PASS else 'r_%d( cArgs[%d] )' % (i, i)
+            for i, kind in enumerate( resolvers )
+        ]
+        lines.append( '            cArguments = (%s,)' % (', '.join( items ),) )
+    else:
+        lines.append( '            cArguments = cArgs' )
+    lines.extend( [
+        '        except Exception:',
+        '            return fallback( *args )',
+        '        try:',
+        '            result = wrappedOperation( *cArguments )',
+        '        except ctypes.ArgumentError as err:',
+        '            err.args = err.args + (cArguments,)',
+        '            raise',
+        '        except GLError as err:',
+        '            err.cArgs = cArgs',
+        '            err.pyArgs = pyArgs',
+        '            raise',
+    ] )
+    if store:
+        lines.append( '        storeValues( result, self, pyArgs, cArgs )' )
+    if returns:
+        lines.append( '        return returnValues( result, self, pyArgs, cArgs )' )
+    else:
+        lines.append( '        return result' )
+    lines.append( '    return wrapperCall' )
+    return '\n'.join( lines ) + '\n'
+
+class CodeCache( object ):
+    """Layout -> compiled build() code, persisted with marshal"""
+    def __init__( self, filename=None ):
+        self.filename = filename or self.default_filename()
+        self.code = None
+        self.builders = {}
+        self.dirty = False
+    @staticmethod
+    def default_filename():
+        directory = os.environ.get( 'PYOPENGL_WRAPPER_CODEGEN_CACHE' )
+        if not directory:
+            directory = os.path.join(
+                os.environ.get( 'XDG_CACHE_HOME' ) or os.path.join( os.path.expanduser( '~' ), '.cache' ),
+                'pyopengl',
+            )
+        return os.path.join( directory, 'wrappers-%s-%s.marshal' % (
+            __version__, importlib.util.MAGIC_NUMBER.hex(),
+        ))
+    def load( self ):
+        self.code = {}
+        try:
+            with open( self.filename, 'rb' ) as fh:
+                code = marshal.load( fh )
+        except FileNotFoundError:
+            return
+        except Exception as err:
+            _log.info( 'Ignoring unreadable wrapper code cache %s: %s', self.filename, err )
+            return
+        if isinstance( code, dict ):
+            self.code = code
+    def save( self ):
+        """Atomically rewrite the cache file if new code was compiled"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname( self.filename )
+        try:
+            os.makedirs( directory, exist_ok=True )
+            fd, temporary = tempfile.mkstemp( dir=directory, suffix='.tmp' )
+            try:
+                with os.fdopen( fd, 'wb' ) as fh:
+                    marshal.dump( self.code, fh )
+                os.replace( temporary, self.filename )
+            except BaseException:
+                os.unlink( temporary )
+                raise
+        except OSError as err:
+            _log.info( 'Unable to write wrapper code cache %s: %s', self.filename, err )
+        else:
+            self.dirty = False
+    def builder( self, key ):
+        """Retrieve (compiling if necessary) the build() function for key"""
+        builder = self.builders.get( key )
+        if builder is None:
+            if self.code is None:
+                self.load()
+            name = repr( key )
+            code = self.code.get( name )
+            if code is None:
+                code = compile( source( key ), '<wrapper %s>' % (name,), 'exec' )
+                self.code[name] = code
+                self.dirty = True
+            namespace = {'ctypes': ctypes, 'GLError': error.GLError, 'NULL': NULL}
+            exec( code, namespace )
+            builder = self.builders[key] = namespace['build']
+        return builder
+
+CACHE = CodeCache()
+atexit.register( CACHE.save )
+
+def specialise( wrapper, fallback ):
+    """Return a generated call function for wrapper, or fallback if there is nothing to specialise
+
+    fallback -- the generic call function from Wrapper.finaliseCall, used
+        whenever argument conversion fails
+    """
+    key = layout( wrapper )
+    if not (key[0] or key[1] or key[2]):
+        return fallback
+    try:
+        return CACHE.builder( key )(
+            wrapper,
+            wrapper.wrappedOperation,
+            fallback,
+            getattr( wrapper, 'pyConverters', None ),
+            getattr( wrapper, 'cConverters', None ),
+            getattr( wrapper, 'cResolvers', None ),
+            getattr( wrapper, 'storeValues', None ),
+            getattr( wrapper, 'returnValues', None ),
+        )
+    except Exception as err:
+        _log.warning( 'Unable to generate a call function for %s, using the generic one: %s', wrapper, err )
+        return fallback
@@ -1,145 +1,135 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
-import random
+from OpenGL.arrays import vbo
 import math
-
-rain_drops = []
+import time
+import numpy as np
+
+RAIN_DROP_COUNT = 100
+RAIN_SPEED = 1.2   # Distance fallen per second
+TARGET_FPS = 60    # Frame-rate cap of the update timer
+MAX_DELTA_TIME = 0.1  # Longest time step simulated at once, so a stall doesn't make the rain jump
+rng = np.random.default_rng()
+rain_x = np.empty(0)      # x position of each raindrop
+rain_y = np.empty(0)      # y position of each raindrop
+rain_speed = np.empty(0)  # speed of each raindrop
+rain_vertices = np.empty((0, 2), dtype=np.float32)  # Reused line endpoints, 2 per raindrop
+rain_stream = None  # StreamingVBO the endpoints are uploaded through, created on the first draw
 rain_angle = 0
 bg_color = 0.0 
 transition_speed = 0.02
+last_time = 0.0  # time.perf_counter() of the previous update
 
-# Initializes raindrops
-for _ in range(100):
-    rain_drops.append([
-        random.uniform(-2, 2),  # x position
-        random.uniform(0, 4),   # y position
-        0.02                    # speed
-    ])
-    
-def draw_house():
-    # House base
-    glBegin(GL_TRIANGLES)
-    glColor3f(0.96, 0.87, 0.70)
-    glVertex2f(-0.5, -0.5)
-    glVertex2f(0.5, -0.5)
-    glVertex2f(0.5, 0.5)
-    glVertex2f(-0.5, -0.5)
-    glVertex2f(-0.5, 0.5)
-    glVertex2f(0.5, 0.5)
-    glEnd()
-
-    glBegin(GL_LINES)  # House border
-    glColor3f(0.2, 0.2, 0.2)
-    glVertex2f(-0.5, -0.5)
-    glVertex2f(0.5, -0.5)
-    glVertex2f(0.5, -0.5)
-    glVertex2f(0.5, 0.5)
-    glVertex2f(0.5, 0.5)
-    glVertex2f(-0.5, 0.5)
-    glVertex2f(-0.5, 0.5)
-    glVertex2f(-0.5, -0.5)
-    glEnd()
-
-    # Roof
-    glBegin(GL_TRIANGLES)
-    glColor3f(0.4, 0.4, 0.4)
-    glVertex2f(-0.6, 0.5)
-    glVertex2f(0.6, 0.5)
-    glVertex2f(0.0, 1.0)
-    glEnd()
-
-    glBegin(GL_LINES)  # Roof border
-    glColor3f(0.2, 0.2, 0.2)
-    glVertex2f(-0.6, 0.5)
-    glVertex2f(0.6, 0.5)
-    glVertex2f(0.6, 0.5)
-    glVertex2f(0.0, 1.0)
-    glVertex2f(0.0, 1.0)
-    glVertex2f(-0.6, 0.5)
-    glEnd()
-
-    # Door
-    glBegin(GL_TRIANGLES)
-    glColor3f(0.4, 0.2, 0.0)
-    glVertex2f(-0.1, -0.5)
-    glVertex2f(0.1, -0.5)
-    glVertex2f(0.1, -0.1)
-    glVertex2f(-0.1, -0.5)
-    glVertex2f(-0.1, -0.1)
-    glVertex2f(0.1, -0.1)
-    glEnd()
-
-    glBegin(GL_LINES)  # Door border
-    glColor3f(0.2, 0.1, 0.0)  
-    glVertex2f(-0.1, -0.5)
-    glVertex2f(0.1, -0.5)
-    glVertex2f(0.1, -0.5)
-    glVertex2f(0.1, -0.1)
-    glVertex2f(0.1, -0.1)
-    glVertex2f(-0.1, -0.1)
-    glVertex2f(-0.1, -0.1)
-    glVertex2f(-0.1, -0.5)
-    glEnd()
-    
-    glPointSize(5.0)  # Door handle
-    glBegin(GL_POINTS)
-    glColor3f(0.8, 0.8, 0.0)
-    glVertex2f(0.07, -0.3)
-    glEnd()
-
-    # Function to draw a window
-    def draw_window(position):
-        glBegin(GL_TRIANGLES)
-        glColor3f(0.8, 0.9, 1.0)
-        glVertex2f(position - 0.075, 0.0)
-        glVertex2f(position + 0.075, 0.0)
-        glVertex2f(position + 0.075, 0.2)
-        glVertex2f(position - 0.075, 0.0)
-        glVertex2f(position - 0.075, 0.2)
-        glVertex2f(position + 0.075, 0.2)
-        glEnd()
+def init_rain(count):
+    # Initializes raindrops
+    global rain_x, rain_y, rain_speed, rain_vertices
+    rain_x = rng.uniform(-2, 2, count)
+    rain_y = rng.uniform(0, 4, count)
+    rain_speed = np.full(count, RAIN_SPEED)
+    rain_vertices = np.empty((2 * count, 2), dtype=np.float32)
 
-        glBegin(GL_LINES)
-        glColor3f(0.2, 0.2, 0.2)  #Border of Windows
-        glVertex2f(position - 0.075, 0.0)
-        glVertex2f(position + 0.075, 0.0)
-        glVertex2f(position + 0.075, 0.0)
-        glVertex2f(position + 0.075, 0.2)
-        glVertex2f(position + 0.075, 0.2)
-        glVertex2f(position - 0.075, 0.2)
-        glVertex2f(position - 0.075, 0.2)
-        glVertex2f(position - 0.075, 0.0)
-        glVertex2f(position, 0.0)  # Window's cross
-        glVertex2f(position, 0.2)
-        glVertex2f(position - 0.075, 0.1)
-        glVertex2f(position + 0.075, 0.1)
+init_rain(RAIN_DROP_COUNT)
+    
+def window_parts(position):
+    # Window pane, border and cross centered at x = position
+    left, right = position - 0.075, position + 0.075
+    return (
+        (GL_TRIANGLES, (0.8, 0.9, 1.0), (
+            (left, 0.0), (right, 0.0), (right, 0.2),
+            (left, 0.0), (left, 0.2), (right, 0.2))),
+        (GL_LINES, (0.2, 0.2, 0.2), (  # Border of Windows
+            (left, 0.0), (right, 0.0), (right, 0.0), (right, 0.2),
+            (right, 0.2), (left, 0.2), (left, 0.2), (left, 0.0),
+            (position, 0.0), (position, 0.2),  # Window's cross
+            (left, 0.1), (right, 0.1))),
+    )
+
+# Static house description: (primitive, color, vertices) drawn in order
+HOUSE_PARTS = (
+    (GL_TRIANGLES, (0.96, 0.87, 0.70), (  # House base
+        (-0.5, -0.5), (0.5, -0.5), (0.5, 0.5),
+        (-0.5, -0.5), (-0.5, 0.5), (0.5, 0.5))),
+    (GL_LINES, (0.2, 0.2, 0.2), (  # House border
+        (-0.5, -0.5), (0.5, -0.5), (0.5, -0.5), (0.5, 0.5),
+        (0.5, 0.5), (-0.5, 0.5), (-0.5, 0.5), (-0.5, -0.5))),
+    (GL_TRIANGLES, (0.4, 0.4, 0.4), (  # Roof
+        (-0.6, 0.5), (0.6, 0.5), (0.0, 1.0))),
+    (GL_LINES, (0.2, 0.2, 0.2), (  # Roof border
+        (-0.6, 0.5), (0.6, 0.5), (0.6, 0.5), (0.0, 1.0),
+        (0.0, 1.0), (-0.6, 0.5))),
+    (GL_TRIANGLES, (0.4, 0.2, 0.0), (  # Door
+        (-0.1, -0.5), (0.1, -0.5), (0.1, -0.1),
+        (-0.1, -0.5), (-0.1, -0.1), (0.1, -0.1))),
+    (GL_LINES, (0.2, 0.1, 0.0), (  # Door border
+        (-0.1, -0.5), (0.1, -0.5), (0.1, -0.5), (0.1, -0.1),
+        (0.1, -0.1), (-0.1, -0.1), (-0.1, -0.1), (-0.1, -0.5))),
+    (GL_POINTS, (0.8, 0.8, 0.0), (  # Door handle
+        (0.07, -0.3),)),
+) + window_parts(-0.325) + window_parts(0.325)  # Left and right window
+HOUSE_POINT_SIZE = 5.0
+
+house_list = None        # Display list holding the compiled house
+house_list_parts = None  # The HOUSE_PARTS it was compiled from
+
+def draw_house_parts(parts):
+    for primitive, color, vertices in parts:
+        if primitive == GL_POINTS:
+            glPointSize(HOUSE_POINT_SIZE)
+        glBegin(primitive)
+        glColor3f(*color)
+        for x, y in vertices:
+            glVertex2f(x, y)
         glEnd()
 
-    draw_window(-0.325)  # Left window
-    draw_window(0.325)   # Right window
+def draw_house():
+    # The house never changes, so it is compiled into a display list once and replayed every frame.
+    # The list is rebuilt only if HOUSE_PARTS is replaced with another description
+    # (an identity check, so the per-frame test does not compare the whole structure).
+    global house_list, house_list_parts
+    if house_list is None or house_list_parts is not HOUSE_PARTS:
+        if house_list is None:
+            house_list = glGenLists(1)
+        glNewList(house_list, GL_COMPILE)
+        draw_house_parts(HOUSE_PARTS)
+        glEndList()
+        house_list_parts = HOUSE_PARTS
+    glCallList(house_list)
 
 def draw_rain():
-    glBegin(GL_LINES)
+    slant = 0.1 * math.sin(math.radians(rain_angle))  # Same rain angle for every drop, computed once per frame
+    rain_vertices[0::2, 0] = rain_x  # Starting point of raindrop
+    rain_vertices[0::2, 1] = rain_y
+    rain_vertices[1::2, 0] = rain_x + slant  # End point with angle offset - creates slanted rain effect
+    rain_vertices[1::2, 1] = rain_y - 0.1
+
+    global rain_stream
+    if rain_stream is None and vbo.get_implementation():
+        rain_stream = vbo.StreamingVBO()
     glColor3f(0.7, 0.7, 1.0)
-
-    for drop in rain_drops:
-        x, y = drop[0], drop[1]  # Get current raindrop position
-        angle_rad = math.radians(rain_angle)  # Calculate rain angle in radians for diagonal fall
-        glVertex2f(x, y)  # Starting point of raindrop
-        glVertex2f(x + 0.1 * math.sin(angle_rad), y - 0.1)  # End point with angle offset - creates slanted rain effect
-    glEnd()
-
-def update_rain():
-    for drop in rain_drops:
-        angle_rad = math.radians(rain_angle)  # Convert angle to radians for calculation
-
-        drop[1] -= drop[2]  # Move raindrop down by its speed
-        drop[0] += drop[2] * math.sin(angle_rad)  # Move raindrop sideways based on angle
-        
-        if drop[1] < -2:
-            drop[1] = 4
-            drop[0] = random.uniform(-2, 2)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    if rain_stream is not None:
+        # Upload into this frame's region of the ring buffer instead of re-sending a client array
+        vertices = rain_stream.write(rain_vertices)
+        with rain_stream:
+            glVertexPointer(2, GL_FLOAT, 0, vertices)
+    else:
+        glVertexPointer(2, GL_FLOAT, 0, rain_vertices)
+    glDrawArrays(GL_LINES, 0, len(rain_vertices))  # All raindrops in one call
+    glDisableClientState(GL_VERTEX_ARRAY)
+    if rain_stream is not None:
+        rain_stream.next_frame()
+
+def update_rain(dt):
+    sin_angle = math.sin(math.radians(rain_angle))  # Convert angle to radians for calculation
+    step = rain_speed * dt  # Distance each raindrop moves during dt seconds
+
+    rain_y[:] -= step  # Move raindrops down by their speed
+    rain_x[:] += step * sin_angle  # Move raindrops sideways based on angle
+
+    fallen = rain_y < -2  # Respawn raindrops that left the screen at the top
+    rain_y[fallen] = 4
+    rain_x[fallen] = rng.uniform(-2, 2, np.count_nonzero(fallen))
 
 def keyboard(key, x, y):
     global rain_angle, bg_color
@@ -154,23 +144,46 @@ def keyboard(key, x, y):
         bg_color = max(bg_color - transition_speed, 0.0)
     glutPostRedisplay()
 
-def display():
+def render():
     glClearColor(bg_color, bg_color, bg_color, 1)
     glClear(GL_COLOR_BUFFER_BIT)
     draw_house()
     draw_rain()
-    update_rain()
-    glutSwapBuffers()
 
+def display():
+    render()
+    glutSwapBuffers()
 
-glutInit()
-glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB)
-glutInitWindowSize(800, 600)
-glutCreateWindow(b"Simple House with Rainfall")
-gluOrtho2D(-2, 2, -2, 2)
-
-glutDisplayFunc(display)
-glutKeyboardFunc(keyboard)
-glutSpecialFunc(keyboard)
-glutIdleFunc(display)
-glutMainLoop()
\ No newline at end of file
+def reshape(w, h):
+    glViewport(0, 0, w, h)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluOrtho2D(-2, 2, -2, 2)
+    glMatrixMode(GL_MODELVIEW)
+
+def update(value):
+    # Simulation runs on its own timer with the real elapsed time, independent of how often display is called
+    global last_time
+    now = time.perf_counter()
+    dt = min(now - last_time, MAX_DELTA_TIME)
+    last_time = now
+    update_rain(dt)
+    glutPostRedisplay()
+    # Wait in the event loop until the next frame is due
+    delay = 1.0 / TARGET_FPS - (time.perf_counter() - now)
+    glutTimerFunc(max(0, int(delay * 1000)), update, 0)
+
+
+if __name__ == "__main__":
+    glutInit()
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB)
+    glutInitWindowSize(800, 600)
+    glutCreateWindow(b"Simple House with Rainfall")
+
+    glutDisplayFunc(display)
+    glutReshapeFunc(reshape)
+    glutKeyboardFunc(keyboard)
+    glutSpecialFunc(keyboard)
+    last_time = time.perf_counter()
+    glutTimerFunc(0, update, 0)
+    glutMainLoop()
\ No newline at end of file
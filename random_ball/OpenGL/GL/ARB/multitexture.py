@@ -68,3 +68,8 @@ glMultiTexCoord4svARB=wrapper.wrapper(glMultiTexCoord4svARB).setInputArraySize(
     'v', 4
 )
 ### END AUTOGENERATED SECTION
+
+from OpenGL import STATE_CACHE as _STATE_CACHE
+if _STATE_CACHE:
+    from OpenGL.GL import statecache as _statecache
+    _statecache.install( globals() )
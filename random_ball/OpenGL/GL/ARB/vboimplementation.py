@@ -3,6 +3,9 @@ from OpenGL.GL.ARB import vertex_buffer_object
 from OpenGL.GL.ARB import uniform_buffer_object
 from OpenGL.GL.ARB import texture_buffer_object
 from OpenGL.GL.ARB import enhanced_layouts
+from OpenGL.GL.ARB import map_buffer_range
+from OpenGL.GL.ARB import sync
+from OpenGL.GL.ARB import buffer_storage
 
 class Implementation( vbo.Implementation ):
     """OpenGL ARB extension-based implementation of VBO interfaces"""
@@ -33,6 +36,7 @@ class Implementation( vbo.Implementation ):
                     found =True 
                     break
             assert found, name
+        self.load_optional( map_buffer_range, sync, buffer_storage )
         if self.glGenBuffers:
             self.available = True
 Implementation.register()
@@ -9,23 +9,25 @@ from OpenGL.GL.exceptional import *
 
 from OpenGL.GL.glget import *
 
-from OpenGL.GL.VERSION.GL_1_2 import *
-from OpenGL.GL.VERSION.GL_1_3 import *
-from OpenGL.GL.VERSION.GL_1_4 import *
-from OpenGL.GL.VERSION.GL_1_5 import *
-from OpenGL.GL.VERSION.GL_2_0 import *
-from OpenGL.GL.VERSION.GL_2_1 import *
-from OpenGL.GL.VERSION.GL_3_0 import *
-from OpenGL.GL.VERSION.GL_3_1 import *
-from OpenGL.GL.VERSION.GL_3_2 import *
-from OpenGL.GL.VERSION.GL_3_3 import *
-from OpenGL.GL.VERSION.GL_4_0 import *
-from OpenGL.GL.VERSION.GL_4_1 import *
-from OpenGL.GL.VERSION.GL_4_2 import *
-from OpenGL.GL.VERSION.GL_4_3 import *
-from OpenGL.GL.VERSION.GL_4_4 import *
-from OpenGL.GL.VERSION.GL_4_5 import *
-from OpenGL.GL.VERSION.GL_4_6 import *
+from OpenGL import LAZY_GL_IMPORT as _LAZY_GL_IMPORT
+if not _LAZY_GL_IMPORT:
+    from OpenGL.GL.VERSION.GL_1_2 import *
+    from OpenGL.GL.VERSION.GL_1_3 import *
+    from OpenGL.GL.VERSION.GL_1_4 import *
+    from OpenGL.GL.VERSION.GL_1_5 import *
+    from OpenGL.GL.VERSION.GL_2_0 import *
+    from OpenGL.GL.VERSION.GL_2_1 import *
+    from OpenGL.GL.VERSION.GL_3_0 import *
+    from OpenGL.GL.VERSION.GL_3_1 import *
+    from OpenGL.GL.VERSION.GL_3_2 import *
+    from OpenGL.GL.VERSION.GL_3_3 import *
+    from OpenGL.GL.VERSION.GL_4_0 import *
+    from OpenGL.GL.VERSION.GL_4_1 import *
+    from OpenGL.GL.VERSION.GL_4_2 import *
+    from OpenGL.GL.VERSION.GL_4_3 import *
+    from OpenGL.GL.VERSION.GL_4_4 import *
+    from OpenGL.GL.VERSION.GL_4_5 import *
+    from OpenGL.GL.VERSION.GL_4_6 import *
 
 from OpenGL.error import *
 GLerror = GLError
@@ -45,5 +47,24 @@ glGetFloat = glGetFloatv
 glGetInteger = glGetIntegerv 
 glGetPolygonStippleub = glGetPolygonStipple
 
-from OpenGL.GL import vboimplementation as _core_implementation
-from OpenGL.GL.ARB import vboimplementation as _arb_implementation
+from OpenGL import STATE_CACHE as _STATE_CACHE
+if _STATE_CACHE:
+    # answer repeated glGet* queries of client-set state from a per-context cache
+    from OpenGL.GL import statecache as _statecache
+    _statecache.install( globals() )
+
+if _LAZY_GL_IMPORT:
+    # resolve the VERSION modules (and the VBO implementations using them) on first use
+    from OpenGL.GL import lazyimport as _lazyimport
+    from OpenGL.GL._lazyimport_index import INDEX as _LAZY_INDEX
+    _lazy_namespace = _lazyimport.LazyNamespace(
+        globals(), _LAZY_INDEX, wrap=_statecache.wrap if _STATE_CACHE else None,
+    )
+    __getattr__ = _lazy_namespace.resolve
+    __dir__ = _lazy_namespace.names
+    from OpenGL.arrays import vbo as _vbo
+    _vbo.Implementation.register_module( 'OpenGL.GL.vboimplementation' )
+    _vbo.Implementation.register_module( 'OpenGL.GL.ARB.vboimplementation' )
+else:
+    from OpenGL.GL import vboimplementation as _core_implementation
+    from OpenGL.GL.ARB import vboimplementation as _arb_implementation
@@ -6,15 +6,19 @@ even if the local hardware only supports ARB extension-based
 shader rendering.
 
 There are also two utility methods compileProgram and compileShader
-which make it easy to create demos which are shader-using.
+which make it easy to create demos which are shader-using, their batch
+versions compilePrograms and compileShaders, which let the driver compile
+in parallel and can share shaders through a per-context ShaderMemo, and a
+ProgramCache which keeps linked program binaries on disk between runs.
 """
-import logging
+import hashlib, logging, os, struct, tempfile, time
 log = logging.getLogger( __name__ )
-from OpenGL import GL
+from OpenGL import GL, error, contextdata
 from OpenGL.GL.ARB import (
     shader_objects, fragment_shader, vertex_shader, vertex_program,
     geometry_shader4, separate_shader_objects, get_program_binary,
 )
+from OpenGL.GL.KHR import parallel_shader_compile
 from OpenGL.extensions import alternate
 from OpenGL._bytes import bytes,unicode,as_8_bit
 
@@ -27,11 +31,16 @@ __all__ = [
     'glGetShaderiv',
     'compileProgram',
     'compileShader',
+    'compilePrograms',
+    'compileShaders',
+    'ShaderMemo',
+    'getShaderMemo',
     'GL_VALIDATE_STATUS',
     'GL_LINK_STATUS',
     'ShaderCompilationError', 
     'ShaderValidationError', 
     'ShaderLinkError',
+    'ProgramCache',
     # automatically added stuff here...
 ]
 
@@ -139,13 +148,15 @@ class ShaderProgram( int ):
         """
         from OpenGL.raw.GL._types import GLint,GLenum 
         from OpenGL.arrays import GLbyteArray
+        # the wrapped glGetProgramBinary ignores a passed-in binary array
+        from OpenGL.raw.GL.ARB.get_program_binary import glGetProgramBinary
         size = GLint()
         glGetProgramiv( self, get_program_binary.GL_PROGRAM_BINARY_LENGTH, size )
         result = GLbyteArray.zeros( (size.value,))
         size2 = GLint()
         format = GLenum()
-        get_program_binary.glGetProgramBinary( self, size.value, size2, format, result )
-        return format.value, result 
+        glGetProgramBinary( self, size.value, size2, format, GLbyteArray.voidDataPointer( result ) )
+        return format.value, result[:size2.value]
     def load( self, format, binary, validate=True ):
         """Attempt to load binary-format for a pre-compiled shader
         
@@ -198,6 +209,10 @@ def compileProgram(*shaders, **named):
         ShaderCompilationError, ShaderValidationError, ShaderLinkError,
     } when a link/validation failure occurs
     """
+    program = _startLink( shaders, named )
+    return _finishLink( program, shaders, named )
+def _startLink( shaders, named ):
+    """Create a program, attach shaders and start linking it"""
     program = glCreateProgram()
     if named.get('separable'):
         glProgramParameteri( program, separate_shader_objects.GL_PROGRAM_SEPARABLE, GL_TRUE )
@@ -207,27 +222,43 @@ def compileProgram(*shaders, **named):
         glAttachShader(program, shader)
     program = ShaderProgram( program )
     glLinkProgram(program)
+    return program
+def _finishLink( program, shaders, named ):
+    """Check a linked program, then delete its (un-memoized) shaders"""
     if named.get('validate', True):
         program.check_validate()
     program.check_linked()
+    memo = contextdata.getValue( MEMO_KEY )
     for shader in shaders:
-        glDeleteShader(shader)
+        if memo is None or shader not in memo.names:
+            glDeleteShader(shader)
     return program
-def compileShader( source, shaderType ):
+def compileShader( source, shaderType, memoize=False ):
     """Compile shader source of given type
 
     source -- GLSL source-code for the shader
     shaderType -- GLenum GL_VERTEX_SHADER, GL_FRAGMENT_SHADER, etc,
+    memoize -- if True, return the shader compiled for the same source and
+        type in the current context (see ShaderMemo) or compile and keep it
 
     returns GLuint compiled shader reference
     raises RuntimeError when a compilation failure occurs
     """
+    if memoize:
+        return compileShaders( (source, shaderType), memoize=True )[0]
+    source = _sources( source )
+    return _checkCompile( _startCompile( source, shaderType ), source, shaderType )
+
+def _sources( source ):
     if isinstance( source, (bytes,unicode)):
         source = [ source ]
-    source = [ as_8_bit(s) for s in source ]
+    return [ as_8_bit(s) for s in source ]
+def _startCompile( source, shaderType ):
     shader = glCreateShader(shaderType)
     glShaderSource( shader, source )
     glCompileShader( shader )
+    return shader
+def _checkCompile( shader, source, shaderType ):
     result = glGetShaderiv( shader, GL_COMPILE_STATUS )
     if not(result):
         # TODO: this will be wrong if the user has
@@ -242,6 +273,344 @@ def compileShader( source, shaderType ):
         )
     return shader
 
+def _waitForCompletion( objects, query, idle=None ):
+    """Poll GL_COMPLETION_STATUS_KHR until the GL has finished with all objects
+
+    objects -- shaders (query glGetShaderiv) or programs (glGetProgramiv)
+    idle -- called between polls, default sleeps POLL_INTERVAL
+
+    Without KHR_parallel_shader_compile (or for a single object) returns
+    at once, the status queries which follow then wait for the GL.
+    """
+    if len( objects ) < 2 or not getShaderMemo().parallel_compile():
+        return
+    from OpenGL.raw.GL._types import GLint
+    status = GLint()
+    def complete( item ):
+        query( item, parallel_shader_compile.GL_COMPLETION_STATUS_KHR, status )
+        return status.value
+    pending = list( objects )
+    while pending:
+        pending = [item for item in pending if not complete( item )]
+        if pending:
+            if idle is None:
+                time.sleep( POLL_INTERVAL )
+            else:
+                idle()
+
+def compileShaders( *shaders, **named ):
+    """Compile (source, shaderType) pairs, submitting all of them before checking any
+
+    memoize (keyword only) -- as for compileShader, identical sources
+        within the call are then also compiled only once
+    idle (keyword only) -- called while polling for completion, see
+        compilePrograms
+
+    Submitting every compile first lets drivers with
+    KHR_parallel_shader_compile compile them concurrently, completion is
+    then polled instead of blocking in glGetShaderiv.
+
+    returns list of GLuint compiled shader references
+    raises ShaderCompilationError for the first source which fails
+    """
+    memoize = named.get( 'memoize', False )
+    memo = getShaderMemo() if memoize else None
+    results = []
+    started = []
+    # key -> shader started by this call, repeats within the batch share it
+    batch = {}
+    for source, shaderType in shaders:
+        source = _sources( source )
+        shader = key = None
+        if memo is not None:
+            key = memo.key( source, shaderType )
+            shader = batch.get( key )
+            if shader is not None:
+                memo.stats['hits'] += 1
+            else:
+                shader = memo.get( source, shaderType )
+        if shader is None:
+            shader = _startCompile( source, shaderType )
+            started.append( (shader, source, shaderType) )
+            if key is not None:
+                batch[key] = shader
+        results.append( shader )
+    _waitForCompletion( [shader for (shader, source, shaderType) in started], glGetShaderiv, named.get( 'idle' ))
+    try:
+        for shader, source, shaderType in started:
+            _checkCompile( shader, source, shaderType )
+    except ShaderCompilationError:
+        for shader, source, shaderType in started:
+            glDeleteShader( shader )
+        raise
+    if memo is not None:
+        for shader, source, shaderType in started:
+            memo.add( shader, source, shaderType )
+    return results
+
+def compilePrograms( *programs, **named ):
+    """Compile and link several programs, overlapping the driver's work
+
+    programs -- sequences of (source, shaderType) pairs, one per program
+    memoize (keyword only) -- share compiled shaders between the programs
+        and later calls through the current context's ShaderMemo, default True
+    idle (keyword only) -- called between completion polls while the
+        driver compiles or links in the background, e.g. to draw a
+        loading screen; default sleeps POLL_INTERVAL
+    separable, retrievable, validate (keyword only) -- as for compileProgram
+
+    All shaders are submitted, then all programs linked, before any status
+    is checked, see compileShaders.
+
+    returns list of ShaderProgram, in the order of programs
+    """
+    named.setdefault( 'memoize', True )
+    pairs = [ list( program ) for program in programs ]
+    shaders = compileShaders( *[pair for program in pairs for pair in program], **named )
+    grouped = []
+    for program in pairs:
+        grouped.append( shaders[:len(program)] )
+        shaders = shaders[len(program):]
+    linked = [ _startLink( program, named ) for program in grouped ]
+    _waitForCompletion( linked, glGetProgramiv, named.get( 'idle' ))
+    return [
+        _finishLink( program, shaders, named )
+        for (program, shaders) in zip( linked, grouped )
+    ]
+
+POLL_INTERVAL = 0.0005
+MEMO_KEY = 'OpenGL.GL.shaders.memo'
+
+class ShaderMemo( object ):
+    """Compiled shader objects of one context by (source hash, shaderType)
+
+    compileShader( ..., memoize=True ) and compilePrograms return the same
+    shader object for the same source and type instead of compiling it
+    again, e.g. for a vertex shader shared by several programs or scenes.
+    compileProgram does not delete memoized shaders, clear() does (and must
+    be called before the context is destroyed if the shaders should be
+    freed explicitly).  Do not glDeleteShader memoized shaders yourself.
+    """
+    def __init__( self ):
+        self.shaders = {}
+        self.names = set()
+        self.parallel = None
+        self.stats = dict( hits=0, misses=0 )
+    @staticmethod
+    def key( source, shaderType ):
+        digest = hashlib.sha1()
+        for s in source:
+            digest.update( s )
+            digest.update( b'\0' )
+        return digest.hexdigest(), int( shaderType )
+    def get( self, source, shaderType ):
+        """The memoized shader for source (list of bytes) and shaderType, or None"""
+        shader = self.shaders.get( self.key( source, shaderType ))
+        if shader is None:
+            self.stats['misses'] += 1
+        else:
+            self.stats['hits'] += 1
+        return shader
+    def add( self, shader, source, shaderType ):
+        self.shaders[self.key( source, shaderType )] = shader
+        self.names.add( shader )
+    def parallel_compile( self ):
+        """Does the context compile in the background? (enables it on first call)"""
+        if self.parallel is None:
+            self.parallel = bool( parallel_shader_compile.glInitParallelShaderCompileKHR() )
+            if self.parallel:
+                # let the implementation choose its maximum number of threads
+                parallel_shader_compile.glMaxShaderCompilerThreadsKHR( 0xFFFFFFFF )
+        return self.parallel
+    def clear( self ):
+        """Delete the memoized shaders"""
+        for shader in self.names:
+            glDeleteShader( shader )
+        self.shaders.clear()
+        self.names.clear()
+
+def getShaderMemo( context=None ):
+    """Get (creating if necessary) the ShaderMemo of context (default current)"""
+    memo = contextdata.getValue( MEMO_KEY, context=context )
+    if memo is None:
+        memo = ShaderMemo()
+        contextdata.setValue( MEMO_KEY, memo, context=context )
+    return memo
+
+class ProgramCache( object ):
+    """On-disk cache of linked program binaries (glGetProgramBinary)
+
+    compileProgram links a program from source the first time and stores
+    its binary under a hash of the sources, shader types and program flags
+    together with the GL renderer, version, vendor (driver) and GLSL
+    version.  Later runs load the binary with glProgramBinary instead of
+    compiling and linking:
+
+        cache = ProgramCache()
+        program = cache.compileProgram(
+            (vertex_source, GL_VERTEX_SHADER),
+            (fragment_source, GL_FRAGMENT_SHADER),
+        )
+
+    Binaries the GL rejects (e.g. after a driver update changed the binary
+    format) are removed and the program is compiled from source again, as
+    it is when the GL offers no binary formats at all.  Files are written
+    atomically and the least recently used ones are removed once the cache
+    holds more than max_bytes.
+
+    The directory defaults to $PYOPENGL_PROGRAM_CACHE, or "pyopengl/programs"
+    in $XDG_CACHE_HOME (~/.cache).
+    """
+    SUFFIX = '.program'
+    # magic, binary format
+    HEADER = struct.Struct( '<4sI' )
+    MAGIC = b'PYGL'
+    def __init__( self, directory=None, max_bytes=64<<20 ):
+        self.directory = directory or self.default_directory()
+        self.max_bytes = max_bytes
+        self.stats = dict( hits=0, misses=0, rejected=0, stored=0, evicted=0 )
+    @staticmethod
+    def default_directory():
+        directory = os.environ.get( 'PYOPENGL_PROGRAM_CACHE' )
+        if not directory:
+            directory = os.path.join(
+                os.environ.get( 'XDG_CACHE_HOME' ) or os.path.join( os.path.expanduser( '~' ), '.cache' ),
+                'pyopengl', 'programs',
+            )
+        return directory
+    @staticmethod
+    def supported():
+        """Can the current context save and load program binaries?"""
+        return bool(
+            get_program_binary.glProgramBinary and
+            GL.glGetIntegerv( get_program_binary.GL_NUM_PROGRAM_BINARY_FORMATS )
+        )
+    def key( self, shaders, separable=False ):
+        """Hex digest identifying shaders ((source, shaderType) pairs) on the current GL"""
+        digest = hashlib.sha256()
+        for name in (GL.GL_RENDERER, GL.GL_VERSION, GL.GL_VENDOR, GL.GL_SHADING_LANGUAGE_VERSION):
+            digest.update( GL.glGetString( name ) or b'' )
+            digest.update( b'\0' )
+        digest.update( b'separable' if separable else b'' )
+        for source, shaderType in shaders:
+            if isinstance( source, (bytes,unicode)):
+                source = [ source ]
+            digest.update( b'\0%d\0' % (int( shaderType ),) )
+            for s in source:
+                digest.update( as_8_bit( s ))
+        return digest.hexdigest()
+    def path( self, key ):
+        return os.path.join( self.directory, key + self.SUFFIX )
+    def read( self, key ):
+        """Return (format, binary) stored for key, or None"""
+        filename = self.path( key )
+        try:
+            with open( filename, 'rb' ) as fh:
+                data = fh.read()
+            # mtime orders the entries for eviction
+            os.utime( filename )
+        except OSError:
+            return None
+        if len( data ) <= self.HEADER.size:
+            return None
+        magic, format = self.HEADER.unpack_from( data )
+        if magic != self.MAGIC:
+            return None
+        return format, data[self.HEADER.size:]
+    def write( self, key, format, binary ):
+        """Atomically store binary for key, then evict down to max_bytes"""
+        try:
+            os.makedirs( self.directory, exist_ok=True )
+            fd, temporary = tempfile.mkstemp( dir=self.directory, suffix='.tmp' )
+            try:
+                with os.fdopen( fd, 'wb' ) as fh:
+                    fh.write( self.HEADER.pack( self.MAGIC, format ))
+                    fh.write( binary )
+                os.replace( temporary, self.path( key ))
+            except BaseException:
+                os.unlink( temporary )
+                raise
+        except OSError as err:
+            log.info( 'Unable to write program cache entry %s: %s', self.path( key ), err )
+            return False
+        self.stats['stored'] += 1
+        self.evict()
+        return True
+    def remove( self, key ):
+        try:
+            os.unlink( self.path( key ))
+        except OSError:
+            pass
+    def evict( self ):
+        """Remove the least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        try:
+            names = os.listdir( self.directory )
+        except OSError:
+            return
+        for name in names:
+            if name.endswith( self.SUFFIX ):
+                try:
+                    stat = os.stat( os.path.join( self.directory, name ))
+                except OSError:
+                    continue
+                entries.append( (stat.st_mtime, stat.st_size, name) )
+        total = sum( size for (mtime, size, name) in entries )
+        entries.sort()
+        while entries and total > self.max_bytes:
+            mtime, size, name = entries.pop( 0 )
+            try:
+                os.unlink( os.path.join( self.directory, name ))
+            except OSError:
+                continue
+            total -= size
+            self.stats['evicted'] += 1
+    def load( self, key, separable=False, validate=True ):
+        """Create a program from the binary stored for key, or return None"""
+        entry = self.read( key )
+        if entry is None:
+            return None
+        format, binary = entry
+        program = ShaderProgram( glCreateProgram() )
+        if separable:
+            glProgramParameteri( program, separate_shader_objects.GL_PROGRAM_SEPARABLE, GL_TRUE )
+        try:
+            program.load( format, binary, validate=validate )
+        except (ShaderLinkError, ShaderValidationError, error.GLError) as err:
+            log.info( 'Program binary %s rejected, recompiling: %s', key, err )
+            GL.glDeleteProgram( program )
+            self.remove( key )
+            self.stats['rejected'] += 1
+            return None
+        return program
+    def compileProgram( self, *shaders, **named ):
+        """Load or compile and link a program from (source, shaderType) pairs
+
+        Takes the same keyword arguments as the module's compileProgram
+        (retrievable is always set).  Raises the same errors when the
+        sources fail to compile or link.
+        """
+        separable = bool( named.get( 'separable' ))
+        validate = named.get( 'validate', True )
+        key = None
+        if self.supported():
+            key = self.key( shaders, separable )
+            program = self.load( key, separable, validate )
+            if program is not None:
+                self.stats['hits'] += 1
+                return program
+        self.stats['misses'] += 1
+        named['retrievable'] = key is not None
+        program = compileProgram(
+            *[ compileShader( source, shaderType ) for (source, shaderType) in shaders ],
+            **named
+        )
+        if key is not None:
+            format, binary = program.retrieve()
+            if len( binary ):
+                self.write( key, format, bytes( binary ))
+        return program
+
 class ShaderCompilationError(RuntimeError):
     """Raised when a shader compilation fails"""
 class ShaderValidationError(RuntimeError):
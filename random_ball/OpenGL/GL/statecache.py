@@ -0,0 +1,249 @@
+"""Client-side cache of glGet* state values (see OpenGL.STATE_CACHE)
+
+Legacy code tends to ask GL for state it set itself: gluProject/gluUnProject
+fetch the modelview and projection matrices and the viewport on every call,
+picking code re-reads GL_VIEWPORT each frame, and the LookupInt sizes in
+OpenGL.raw.GL._glgets query GL_NUM_COMPRESSED_TEXTURE_FORMATS or the pixel
+map sizes whenever their arrays are allocated.  Each query is a glGet* call
+which stalls until the driver has caught up with the command stream.
+
+With STATE_CACHE set, OpenGL.GL and OpenGL.GLU wrap glGetBooleanv,
+glGetIntegerv, glGetFloatv and glGetDoublev so that the values of the pnames
+in CACHEABLE are remembered per context, and wrap the functions which can
+change those values (INVALIDATES: glViewport, glViewportIndexedf(v),
+glViewportArrayv, glMatrixMode, glLoadIdentity,
+the glLoadMatrix/glMultMatrix/glTranslate/glRotate/glScale/glOrtho/glFrustum
+family, glPushMatrix/glPopMatrix, gluOrtho2D, gluPerspective, gluLookAt,
+gluPickMatrix, glPixelMap*) so that they drop the cached values first.  The
+texture matrix and stack depth belong to the active texture unit and are
+dropped by glActiveTexture(ARB).  In lazy import mode (LAZY_GL_IMPORT) the
+lazily loaded functions are wrapped as they are loaded.
+glPopAttrib, glCallList(s) and glEndList (for GL_COMPILE_AND_EXECUTE lists)
+can change anything and drop everything but the implementation limits.
+
+Only calls made through the wrapped Python functions are seen, state changed
+by other libraries, by shaders or through the raw modules must be followed by
+invalidate().  Cached array values are returned as copies, calls passing in
+their own output array are answered from the cache only for scalar ctypes
+outputs (as used by LookupInt).  report() gives the hit rates::
+
+    from OpenGL.GL import statecache
+    print( statecache.report() )
+"""
+import ctypes
+from OpenGL import contextdata, platform
+from OpenGL.raw.GL.VERSION import GL_1_0 as _GL_1_0
+from OpenGL.raw.GL.VERSION import GL_1_1 as _GL_1_1
+from OpenGL.raw.GL.VERSION import GL_1_3 as _GL_1_3
+
+GETTERS = ('glGetBooleanv', 'glGetIntegerv', 'glGetFloatv', 'glGetDoublev')
+
+# state of the active texture unit
+TEXTURE_UNIT = frozenset( [
+    _GL_1_0.GL_TEXTURE_MATRIX, _GL_1_0.GL_TEXTURE_STACK_DEPTH,
+] )
+MATRICES = frozenset( [
+    _GL_1_0.GL_MODELVIEW_MATRIX, _GL_1_0.GL_PROJECTION_MATRIX,
+    _GL_1_0.GL_MODELVIEW_STACK_DEPTH, _GL_1_0.GL_PROJECTION_STACK_DEPTH,
+] ) | TEXTURE_UNIT
+VIEWPORT = frozenset( [_GL_1_0.GL_VIEWPORT] )
+MATRIX_MODE = frozenset( [_GL_1_0.GL_MATRIX_MODE] )
+PIXEL_MAP_SIZES = frozenset( [
+    _GL_1_0.GL_PIXEL_MAP_I_TO_I_SIZE, _GL_1_0.GL_PIXEL_MAP_S_TO_S_SIZE,
+    _GL_1_0.GL_PIXEL_MAP_I_TO_R_SIZE, _GL_1_0.GL_PIXEL_MAP_I_TO_G_SIZE,
+    _GL_1_0.GL_PIXEL_MAP_I_TO_B_SIZE, _GL_1_0.GL_PIXEL_MAP_I_TO_A_SIZE,
+    _GL_1_0.GL_PIXEL_MAP_R_TO_R_SIZE, _GL_1_0.GL_PIXEL_MAP_G_TO_G_SIZE,
+    _GL_1_0.GL_PIXEL_MAP_B_TO_B_SIZE, _GL_1_0.GL_PIXEL_MAP_A_TO_A_SIZE,
+] )
+# implementation limits, fixed for the lifetime of the context
+LIMITS = frozenset( [
+    _GL_1_3.GL_NUM_COMPRESSED_TEXTURE_FORMATS,
+    _GL_1_0.GL_MAX_TEXTURE_SIZE, _GL_1_0.GL_MAX_VIEWPORT_DIMS,
+    _GL_1_0.GL_MAX_MODELVIEW_STACK_DEPTH, _GL_1_0.GL_MAX_PROJECTION_STACK_DEPTH,
+    _GL_1_0.GL_MAX_TEXTURE_STACK_DEPTH, _GL_1_0.GL_MAX_ATTRIB_STACK_DEPTH,
+    _GL_1_1.GL_MAX_CLIENT_ATTRIB_STACK_DEPTH, _GL_1_0.GL_MAX_NAME_STACK_DEPTH,
+    _GL_1_0.GL_MAX_LIST_NESTING, _GL_1_0.GL_MAX_EVAL_ORDER,
+    _GL_1_0.GL_MAX_PIXEL_MAP_TABLE, _GL_1_0.GL_MAX_LIGHTS,
+    _GL_1_0.GL_MAX_CLIP_PLANES, _GL_1_0.GL_SUBPIXEL_BITS,
+] )
+STATE = MATRICES | VIEWPORT | MATRIX_MODE | PIXEL_MAP_SIZES
+CACHEABLE = STATE | LIMITS
+# callers such as LookupInt pass plain integers
+NAMES = dict( (int( pname ), pname.name) for pname in CACHEABLE )
+
+# function name -> pnames whose cached values the function invalidates
+INVALIDATES = {
+    'glViewport': VIEWPORT,
+    # GL 4.1/ARB_viewport_array, viewport 0 is GL_VIEWPORT
+    'glViewportIndexedf': VIEWPORT, 'glViewportIndexedfv': VIEWPORT,
+    'glViewportArrayv': VIEWPORT,
+    # only the current mode's matrix changes, but which one that is
+    # is not worth tracking here
+    'glLoadIdentity': MATRICES,
+    'glLoadMatrixd': MATRICES, 'glLoadMatrixf': MATRICES,
+    'glMultMatrixd': MATRICES, 'glMultMatrixf': MATRICES,
+    'glLoadTransposeMatrixd': MATRICES, 'glLoadTransposeMatrixf': MATRICES,
+    'glMultTransposeMatrixd': MATRICES, 'glMultTransposeMatrixf': MATRICES,
+    'glTranslated': MATRICES, 'glTranslatef': MATRICES,
+    'glRotated': MATRICES, 'glRotatef': MATRICES,
+    'glScaled': MATRICES, 'glScalef': MATRICES,
+    'glOrtho': MATRICES, 'glFrustum': MATRICES,
+    'glPushMatrix': MATRICES, 'glPopMatrix': MATRICES,
+    'glMatrixMode': MATRIX_MODE,
+    'glActiveTexture': TEXTURE_UNIT, 'glActiveTextureARB': TEXTURE_UNIT,
+    'glPixelMapfv': PIXEL_MAP_SIZES, 'glPixelMapuiv': PIXEL_MAP_SIZES,
+    'glPixelMapusv': PIXEL_MAP_SIZES,
+    'glPopAttrib': STATE,
+    'glCallList': STATE, 'glCallLists': STATE, 'glEndList': STATE,
+    'gluOrtho2D': MATRICES, 'gluPerspective': MATRICES,
+    'gluLookAt': MATRICES, 'gluPickMatrix': MATRICES,
+}
+# aliases defined by OpenGL.GL which must see the wrapped functions
+ALIASES = {
+    'glRotate': 'glRotated', 'glTranslate': 'glTranslated', 'glScale': 'glScaled',
+    'glGetBoolean': 'glGetBooleanv', 'glGetDouble': 'glGetDoublev',
+    'glGetFloat': 'glGetFloatv', 'glGetInteger': 'glGetIntegerv',
+}
+CONTEXT_KEY = 'OpenGL.GL.statecache'
+# context -> its cache, while that cache holds STATE values; setters only
+# look here, so that they cost one dictionary lookup while nothing is cached
+FILLED = {}
+
+class StateCache( object ):
+    """One context's cached glGet* values, {pname: {kind: value}}"""
+    def __init__( self, context ):
+        self.context = context
+        self.state = {}
+        self.limits = {}
+        self.stats = dict( hits=0, misses=0, invalidations=0 )
+        self.by_pname = {}
+    def get( self, pname, kind ):
+        """Cached value of pname for kind (getter name, or (name, ctypes type)), or None"""
+        values = (self.limits if pname in LIMITS else self.state).get( pname )
+        value = None if values is None else values.get( kind )
+        counts = self.by_pname.get( pname )
+        if counts is None:
+            counts = self.by_pname[pname] = [0, 0]
+        if value is None:
+            self.stats['misses'] += 1
+            counts[1] += 1
+        else:
+            self.stats['hits'] += 1
+            counts[0] += 1
+        return value
+    def set( self, pname, kind, value ):
+        if pname in LIMITS:
+            self.limits.setdefault( pname, {} )[kind] = value
+        else:
+            self.state.setdefault( pname, {} )[kind] = value
+            FILLED[self.context] = self
+    def invalidate( self, pnames=STATE ):
+        """Drop the cached values of pnames (limits are never dropped)"""
+        for pname in pnames:
+            if self.state.pop( pname, None ) is not None:
+                self.stats['invalidations'] += 1
+        if not self.state:
+            FILLED.pop( self.context, None )
+    def clear( self ):
+        self.state.clear()
+        self.limits.clear()
+        FILLED.pop( self.context, None )
+    def hit_rate( self ):
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / float( total ) if total else 0.0
+    def counters( self ):
+        """Call statistics, the overall hit rate and {pname name: (hits, misses)}"""
+        result = dict( self.stats )
+        result['hit_rate'] = self.hit_rate()
+        result['cached'] = len( self.state ) + len( self.limits )
+        result['pnames'] = dict(
+            (NAMES.get( pname, str( pname ) ), tuple( counts ))
+            for pname, counts in self.by_pname.items()
+        )
+        return result
+
+def getStateCache( context=None ):
+    """Get (creating if necessary) the state cache of context (default current)"""
+    context = contextdata.getContext( context )
+    cache = contextdata.getValue( CONTEXT_KEY, context=context )
+    if cache is None:
+        cache = StateCache( context )
+        contextdata.setValue( CONTEXT_KEY, cache, context=context )
+    return cache
+
+def invalidate( pnames=STATE ):
+    """Drop cached values of pnames in every context's cache"""
+    for cache in list( FILLED.values() ):
+        cache.invalidate( pnames )
+
+def report( context=None ):
+    """Counters of context's cache (default current), see StateCache.counters"""
+    return getStateCache( context ).counters()
+
+def cached_getter( function, name ):
+    """Wrap a glGet*v function to answer CACHEABLE pnames from the cache"""
+    def getter( pname, *args ):
+        if pname not in CACHEABLE:
+            return function( pname, *args )
+        if not args:
+            cache = getStateCache()
+            value = cache.get( pname, name )
+            if value is None:
+                value = function( pname )
+                cache.set( pname, name, value )
+            return value.copy() if hasattr( value, 'copy' ) else value
+        if len( args ) == 1 and isinstance( args[0], ctypes._SimpleCData ):
+            cache = getStateCache()
+            kind = (name, type( args[0] ))
+            value = cache.get( pname, kind )
+            if value is None:
+                function( pname, args[0] )
+                cache.set( pname, kind, args[0].value )
+            else:
+                args[0].value = value
+            return args[0]
+        return function( pname, *args )
+    getter.__name__ = name
+    getter.__doc__ = function.__doc__
+    getter.__wrapped__ = function
+    getter.statecache = True
+    return getter
+
+def invalidating( function, name, pnames ):
+    """Wrap a state-changing function to drop the current context's cached values of pnames first"""
+    def setter( *args, **named ):
+        # the current context is only looked up once some cache holds one of
+        # pnames, usually a single one: the current context's
+        for cache in FILLED.values():
+            if not pnames.isdisjoint( cache.state ):
+                cache = FILLED.get( platform.GetCurrentContext() )
+                if cache is not None:
+                    cache.invalidate( pnames )
+                break
+        return function( *args, **named )
+    setter.__name__ = name
+    setter.__doc__ = function.__doc__
+    setter.__wrapped__ = function
+    setter.statecache = True
+    return setter
+
+def wrap( name, function ):
+    """Return function wrapped as a cached getter or invalidating function, if name is one"""
+    if getattr( function, 'statecache', False ):
+        return function
+    if name in GETTERS:
+        return cached_getter( function, name )
+    pnames = INVALIDATES.get( name )
+    if pnames is not None:
+        return invalidating( function, name, pnames )
+    return function
+
+def install( namespace ):
+    """Replace the getters and invalidating functions present in namespace (a module's globals())"""
+    for name in GETTERS + tuple( INVALIDATES ):
+        function = namespace.get( name )
+        if function is not None:
+            namespace[name] = wrap( name, function )
+    for alias, name in ALIASES.items():
+        if alias in namespace and name in namespace:
+            namespace[alias] = namespace[name]
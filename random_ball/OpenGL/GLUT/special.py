@@ -22,7 +22,7 @@ platform module *not* in the module here!
 """
 from OpenGL.platform import CurrentContextIsValid, GLUT_GUARD_CALLBACKS, PLATFORM
 GLUT = PLATFORM.GLUT
-from OpenGL import contextdata, error, platform, logs
+from OpenGL import contextdata, error, platform, logs, _configflags
 from OpenGL.raw import GLUT as _simple
 from OpenGL._bytes import bytes, unicode,as_8_bit
 import ctypes, os, sys, traceback
@@ -350,3 +350,21 @@ def glutDestroyWindow( window ):
         _log.error( """Error attempting to clean up context data for GLUT window %s: %s""", window, result )
     return _base_glutDestroyWindow( window )
 glutDestroyWindow.wrappedOperation = _simple.glutDestroyWindow
+
+_DEFERRED_ERRORS = _configflags.ERROR_CHECKING and _configflags.DEFERRED_ERROR_CHECKING
+if _DEFERRED_ERRORS or _configflags.OBJECT_POOL:
+    def glutSwapBuffers( ):
+        """Swap buffers, then run the frame-boundary work
+
+        Deletes the GL objects queued by the object pool (OBJECT_POOL) and
+        raises any GL error deferred during the frame (DEFERRED_ERROR_CHECKING)
+        """
+        result = _simple.glutSwapBuffers( )
+        if _configflags.OBJECT_POOL:
+            from OpenGL import objectpool
+            objectpool.end_frame()
+        if _DEFERRED_ERRORS:
+            from OpenGL.raw.GL import _errors
+            _errors._error_checker.checkDeferred( _simple.glutSwapBuffers )
+        return result
+    glutSwapBuffers.wrappedOperation = _simple.glutSwapBuffers
@@ -16,7 +16,21 @@ from OpenGL._configflags import ERROR_ON_COPY
 from OpenGL.arrays import formathandler
 from OpenGL._bytes import bytes,unicode,as_8_bit
 HANDLED_TYPES = (list,tuple)
-import operator
+import array, operator, struct
+from itertools import chain, repeat
+
+# lists with at least this many top-level items are converted with numpy
+NUMPY_THRESHOLD = 64
+_NUMPY = []
+def _numpy():
+    """Import numpy on first use, None if it is not installed"""
+    if not _NUMPY:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _NUMPY.append( numpy )
+    return _NUMPY[0]
 
 def err_on_copy( func ):
     """Decorator which raises informative error if we try to copy while ERROR_ON_COPY"""
@@ -71,26 +85,43 @@ class ListHandler( formathandler.FormatHandler ):
     @classmethod
     def dimsOf( cls, x ):
         """Calculate total dimension-set of the elements in x
-        
-        This is *extremely* messy, as it has to track nested arrays
-        where the arrays could be different sizes on all sorts of 
-        levels...
+
+        Raises ValueError for non-uniform (ragged) nested lists
         """
-        try:
-            dimensions = [ len(x) ]
-        except (TypeError,AttributeError,ValueError) as err:
-            return []
-        else:
-            childDimension = None
-            for child in x:
-                newDimension = cls.dimsOf( child )
-                if childDimension is not None:
-                    if newDimension != childDimension:
-                        raise ValueError( 
-                            """Non-uniform array encountered: %s versus %s"""%(
-                                newDimension, childDimension,
-                            ), x
-                        )
+        return cls.flatten( x )[0]
+    @classmethod
+    def shapeOf( cls, value ):
+        """Dimensions of value, following the first element of each level only"""
+        shape = []
+        while isinstance( value, HANDLED_TYPES ):
+            shape.append( len(value) )
+            if not value:
+                break
+            value = value[0]
+        return tuple(shape)
+    @classmethod
+    def flatten( cls, value ):
+        """Flatten nested lists/tuples in one pass per nesting level
+
+        returns (shape, items) where shape is the tuple of dimensions
+        (taken from the first element at each level) and items is a flat
+        list of the leaf values; a non-list value has shape ()
+        """
+        shape = cls.shapeOf( value )
+        if not shape:
+            return (), [value]
+        items = value
+        for dim in shape[1:]:
+            if not all( map( isinstance, items, repeat( HANDLED_TYPES ))) or set( map( len, items )) != {dim}:
+                raise ValueError(
+                    """Non-uniform array encountered, expected %s"""%( shape, ), value
+                )
+            items = list( chain.from_iterable( items ))
+        if any( map( isinstance, items, repeat( HANDLED_TYPES ))):
+            raise ValueError(
+                """Non-uniform array encountered, expected %s"""%( tuple(shape), ), value
+            )
+        return shape, items
 
     @classmethod
     def arrayToGLType( cls, value ):
@@ -108,10 +139,8 @@ class ListHandler( formathandler.FormatHandler ):
     def arraySize( cls, value, typeCode = None ):
         """Given a data-value, calculate dimensions for the array"""
         dims = 1
-        for base in cls.types( value ):
-            length = getattr( base, '_length_', None)
-            if length is not None:
-                dims *= length
+        for length in cls.typeDimensions( value.__class__ ):
+            dims *= length
         return dims 
     @classmethod
     def types( cls, value ):
@@ -125,36 +154,88 @@ class ListHandler( formathandler.FormatHandler ):
     @classmethod
     def dims( cls, value ):
         """Produce iterable of all dimensions"""
-        for base in cls.types( value ):
-            length = getattr( base, '_length_', None)
-            if length is not None:
-                yield length
+        return iter( cls.typeDimensions( value.__class__ ) )
+    @classmethod
+    def typeDimensions( cls, arrayType ):
+        """Dimensions of a (nested) ctypes array type, cached per type"""
+        try:
+            return _TYPE_DIMENSIONS[ arrayType ]
+        except KeyError:
+            dimensions = _TYPE_DIMENSIONS[ arrayType ] = tuple([
+                length for length in [
+                    getattr( base, '_length_', None )
+                    for base in cls.types( arrayType )
+                ]
+                if length is not None
+            ])
+            return dimensions
+    @classmethod
+    def shapedType( cls, shape, typeCode ):
+        """Nested ctypes array type for shape, with its dimensions pre-cached"""
+        key = (shape, typeCode)
+        try:
+            return _SHAPED_TYPES[ key ]
+        except KeyError:
+            arrayType = GL_TYPE_TO_ARRAY_MAPPING[ typeCode ]
+            for dim in shape[::-1]:
+                arrayType *= dim
+            _TYPE_DIMENSIONS[ arrayType ] = shape
+            _SHAPED_TYPES[ key ] = arrayType
+            return arrayType
     @err_on_copy
     @classmethod
     def asArray( cls, value, typeCode=None ):
         """Convert given value to a ctypes array value of given typeCode
-        
-        This does a *lot* of work just to get the data into the correct
-        format.  It's not going to be anywhere near as fast as a numpy
-        or similar approach!
+
+        Large nested lists go through numpy when it is available, otherwise
+        the list is flattened in one pass per nesting level and the leaf
+        values are packed into a single buffer with array.array (or
+        struct.pack_into for types array does not support).  Values the
+        packers refuse (out-of-range integers etc.) are converted by the
+        ctypes constructor itself, so conversion rules match ctypes.
         """
         if typeCode is None:
             raise NotImplementedError( """Haven't implemented type-inference for lists yet""" )
-        arrayType = GL_TYPE_TO_ARRAY_MAPPING[ typeCode ]
-        if isinstance( value, (list,tuple)):
-            subItems = [
-                cls.asArray( item, typeCode )
-                for item in value
-            ]
-            if subItems:
-                for dim in cls.dimensions( subItems[0] )[::-1]:
-                    arrayType *= dim
-                arrayType *= len( subItems )
-                result = arrayType()
-                result[:] = subItems
+        if not isinstance( value, HANDLED_TYPES ):
+            return GL_TYPE_TO_ARRAY_MAPPING[ typeCode ]( value )
+        if len( value ) >= NUMPY_THRESHOLD and _numpy() is not None:
+            result = cls.asArrayNumpy( value, typeCode )
+            if result is not None:
                 return result
-        else:
-            return arrayType( value )
+        shape, items = cls.flatten( value )
+        arrayType = cls.shapedType( shape, typeCode )
+        baseType = GL_TYPE_TO_ARRAY_MAPPING[ typeCode ]
+        code = baseType._type_
+        try:
+            if code in array.typecodes:
+                return arrayType.from_buffer_copy( array.array( code, items ) )
+            result = arrayType()
+            struct.pack_into( '%d%s'%( len(items), code ), result, 0, *items )
+            return result
+        except (TypeError, ValueError, OverflowError, struct.error):
+            flat = (baseType * len(items))( *items )
+            return arrayType.from_buffer_copy( flat )
+    @classmethod
+    def asArrayNumpy( cls, value, typeCode ):
+        """Convert nested numeric lists with numpy, or None if numpy cannot do it losslessly"""
+        numpy = _numpy()
+        baseType = GL_TYPE_TO_ARRAY_MAPPING[ typeCode ]
+        if baseType._type_ not in NUMPY_KINDS:
+            return None
+        try:
+            source = numpy.array( value )
+        except (TypeError, ValueError):
+            return None
+        if source.dtype.kind not in NUMPY_KINDS[ baseType._type_ ]:
+            # e.g. floats for an integer type, which ctypes refuses
+            return None
+        if source.shape != cls.shapeOf( value ):
+            # sequences other than lists/tuples at the leaves
+            return None
+        target = source.astype( numpy.dtype( baseType ), copy=False )
+        return cls.shapedType( source.shape, typeCode ).from_buffer_copy(
+            numpy.ascontiguousarray( target )
+        )
     @err_on_copy
     @classmethod
     def unitSize( cls, value, typeCode=None ):
@@ -183,6 +264,14 @@ ARRAY_TO_GL_TYPE_MAPPING = {
     _types.GLbyte: GL_1_1.GL_BYTE,
     _types.GLubyte: GL_1_1.GL_UNSIGNED_BYTE,
 }
+# nested ctypes array type -> dimensions, and (shape, typeCode) -> array type
+_TYPE_DIMENSIONS = {}
+_SHAPED_TYPES = {}
+# ctypes type code -> numpy dtype kinds which convert to it the way ctypes would
+NUMPY_KINDS = dict(
+    [(code, 'biuf') for code in 'fd']
+    + [(code, 'biu') for code in 'bBhHiIlLqQ']
+)
 GL_TYPE_TO_ARRAY_MAPPING = {
     GL_1_1.GL_DOUBLE: _types.GLdouble,
     GL_1_1.GL_FLOAT: _types.GLfloat,
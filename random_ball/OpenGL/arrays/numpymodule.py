@@ -36,9 +36,20 @@ if NumpyHandler is None:
     # Numpy's "ctypes" interface actually creates a new ctypes object
     # in python for every access of the .ctypes attribute... which can take
     # ridiculously large periods when you multiply it by millions of iterations
+    # __array_interface__ builds a new dict on every access, a writable
+    # C-contiguous ndarray's address is far cheaper to get via the buffer protocol
+    _addressof = ctypes.addressof
+    _from_buffer = ctypes.c_char.from_buffer
+    _ndarray = numpy.ndarray
     if hasattr(testArray,'__array_interface__'):
         def dataPointer( cls, instance ):
             """Convert given instance to a data-pointer value (integer)"""
+            if instance.__class__ is _ndarray:
+                try:
+                    return _addressof( _from_buffer( instance ))
+                except (TypeError, ValueError):
+                    # read-only, non-contiguous or empty
+                    pass
             try:
                 return long(instance.__array_interface__['data'][0])
             except AttributeError:
@@ -166,6 +177,12 @@ if NumpyHandler is None:
             Although this doesn't raise an error, it does tend to slow
             down rendering.
             """
+            if source.__class__ is _ndarray and (typeCode is None or cls.hasDtype( source, typeCode )):
+                try:
+                    if source.flags.contiguous:
+                        return source
+                except AttributeError:
+                    pass
             typeCode = GL_TYPE_TO_ARRAY_MAPPING[ typeCode ]
             try:
                 contiguous = source.flags.contiguous
@@ -198,6 +215,19 @@ if NumpyHandler is None:
                     if typeCode is None:
                         typeCode = source.dtype.char
                     return numpy.ascontiguousarray( source, typeCode )
+        # (dtype, GL type constant) -> whether the dtype is the one GL expects
+        _DTYPE_MATCHES = {}
+        @classmethod
+        def hasDtype( cls, value, typeCode ):
+            """Is value's dtype the array type for GL typeCode? (cached per dtype)"""
+            key = (value.dtype, typeCode)
+            try:
+                return cls._DTYPE_MATCHES[ key ]
+            except KeyError:
+                match = cls._DTYPE_MATCHES[ key ] = (
+                    value.dtype == GL_TYPE_TO_ARRAY_MAPPING[ typeCode ]
+                )
+                return match
         @classmethod
         def unitSize( cls, value, typeCode=None ):
             """Determine unit size of an array (if possible)"""
@@ -216,7 +246,7 @@ if NumpyHandler is None:
                 pp._temporary_array_ = (array,)
                 return pp
             else:
-                if typeCode and instance.dtype != GL_TYPE_TO_ARRAY_MAPPING[ typeCode ]:
+                if typeCode and not cls.hasDtype( instance, typeCode ):
                     raise error.CopyError(
                         """Array of type %r passed, required array of type %r""",
                         instance.dtype.char, typeCode,
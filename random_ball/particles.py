@@ -0,0 +1,116 @@
+from OpenGL.GL import *
+from OpenGL.arrays import vbo
+import numpy as np
+
+
+class ParticleSystem:
+    """Balls stored as contiguous NumPy arrays (struct of arrays) instead of one list per ball."""
+
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float64)          # x, y
+        self.prev_pos = np.zeros((capacity, 2), dtype=np.float64)     # x, y before the last step
+        self.vel = np.zeros((capacity, 2), dtype=np.float64)          # dx, dy
+        self.color = np.zeros((capacity, 3), dtype=np.float32)        # r, g, b
+        self.is_blinking = np.zeros(capacity, dtype=bool)
+        self.blink_start = np.zeros(capacity, dtype=np.float64)
+        self.stream = None  # StreamingVBO for the per-frame vertex data, created on the first draw
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        capacity = len(self.pos)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('pos', 'prev_pos', 'vel', 'color', 'is_blinking', 'blink_start'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, x, y, dx, dy, color, is_blinking, blink_start):
+        self.add_many([(x, y)], [(dx, dy)], [color], is_blinking, blink_start)
+
+    def add_many(self, pos, vel, color, is_blinking, blink_start):
+        """Appends len(pos) balls; pos/vel are (n, 2) and color is (n, 3)."""
+        n = len(pos)
+        self._reserve(n)
+        live = slice(self.count, self.count + n)
+        self.pos[live] = pos
+        self.prev_pos[live] = pos
+        self.vel[live] = vel
+        self.color[live] = color
+        self.is_blinking[live] = is_blinking
+        self.blink_start[live] = blink_start
+        self.count += n
+
+    def clear(self):
+        self.count = 0
+
+    def step(self):
+        """Moves every ball by its velocity and bounces it off the screen edges."""
+        pos = self.pos[:self.count]
+        vel = self.vel[:self.count]
+        self.prev_pos[:self.count] = pos
+        pos += vel
+        outside = np.abs(pos) > 1.0
+        vel[outside] *= -1  # Reverse direction
+        np.clip(pos, -1.0, 1.0, out=pos)  # Keep within bounds
+
+    def scale_speed(self, factor):
+        self.vel[:self.count] *= factor
+
+    def set_blinking(self, is_blinking, now):
+        self.is_blinking[:self.count] = is_blinking
+        if is_blinking:
+            self.blink_start[:self.count] = now
+
+    def visible(self, now):
+        """Mask of balls shown at time `now`: blinking balls are shown 1 second out of every 2."""
+        blink_time = (now - self.blink_start[:self.count]) % 2.0
+        return ~self.is_blinking[:self.count] | (blink_time < 1.0)
+
+    def interpolated(self, alpha):
+        """Positions a fraction `alpha` of the way from the previous step to the current one."""
+        if alpha >= 1.0:
+            return self.pos[:self.count]
+        prev = self.prev_pos[:self.count]
+        return prev + (self.pos[:self.count] - prev) * alpha
+
+    def draw(self, now, alpha=1.0):
+        """Draws the visible balls as GL_POINTS with one glDrawArrays call.
+
+        The arrays are streamed through a StreamingVBO when buffer objects are available.
+        alpha interpolates between the last two simulation steps (see interpolated).
+        """
+        if not self.count:
+            return
+        pos = self.interpolated(alpha)
+        color = self.color[:self.count]
+        if self.is_blinking[:self.count].any():
+            shown = self.visible(now)
+            pos, color = pos[shown], color[shown]
+        count = len(pos)
+        if not count:
+            return
+        if self.stream is None and vbo.get_implementation():
+            self.stream = vbo.StreamingVBO()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        if self.stream is not None:
+            # Both arrays go into this frame's region of the ring buffer
+            pos, color = self.stream.write(pos), self.stream.write(color)
+            self.stream.bind()
+        glVertexPointer(2, GL_DOUBLE, 0, pos)
+        glColorPointer(3, GL_FLOAT, 0, color)
+        if self.stream is not None:
+            self.stream.unbind()
+        glDrawArrays(GL_POINTS, 0, count)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        if self.stream is not None:
+            self.stream.next_frame()
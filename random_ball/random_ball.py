@@ -4,13 +4,21 @@ from OpenGL.GLU import *
 import random
 import math
 import time
+from particles import ParticleSystem
 
-points = []          # List to store points: [x, y, dx, dy, color, is_blinking, blink_start]
-point_speed = 0.001  # Base speed
+points = ParticleSystem()  # Balls stored as arrays: pos, vel, color, is_blinking, blink_start
+point_speed = 0.001  # Base speed, distance moved per simulation step
 current_speed = point_speed  # Track current speed for new points
 is_frozen = False    # Freeze state
 is_blinking = False  # Blink state
 
+TARGET_FPS = 60          # Frames drawn per second
+SIMULATION_HZ = 240      # Fixed simulation steps per second, independent of the frame rate
+STEP_TIME = 1.0 / SIMULATION_HZ
+MAX_FRAME_TIME = 0.25    # Longest stretch simulated in one frame, so a stall doesn't trigger a burst of steps
+accumulator = 0.0        # Simulation time not yet consumed by a full step
+last_time = 0.0          # time.perf_counter() of the previous frame
+
 def generate_random_color():
     return [random.random() for _ in range(3)]  # Random RGB values
 
@@ -30,14 +38,11 @@ def mouse(button, state, x, y):
     if button == GLUT_RIGHT_BUTTON:
         dx, dy = generate_random_direction()
         color = generate_random_color()
-        points.append([gl_x, gl_y, dx, dy, color, is_blinking, time.time()])
+        points.add(gl_x, gl_y, dx, dy, color, is_blinking, time.time())
     
     elif button == GLUT_LEFT_BUTTON: 
         is_blinking = not is_blinking
-        for point in points:
-            point[5] = is_blinking 
-            if is_blinking:
-                point[6] = time.time()
+        points.set_blinking(is_blinking, time.time())
 
 def keyboard_special(key, x, y):
     global current_speed
@@ -46,14 +51,10 @@ def keyboard_special(key, x, y):
 
     if key == GLUT_KEY_UP:
         current_speed *= 1.2
-        for point in points:
-            point[2] *= 1.2
-            point[3] *= 1.2
+        points.scale_speed(1.2)
     elif key == GLUT_KEY_DOWN:
         current_speed *= 0.8
-        for point in points:
-            point[2] *= 0.8
-            point[3] *= 0.8
+        points.scale_speed(0.8)
 
 def keyboard(key, x, y):
     global is_frozen
@@ -63,48 +64,63 @@ def keyboard(key, x, y):
 def update_points():
     if is_frozen:
         return
-    current_time = time.time()
-    for point in points:  # Update position for all points
-        point[0] += point[2]
-        point[1] += point[3]
-        # Bounce from screen edges
-        if abs(point[0]) > 1.0:
-            point[2] *= -1  # Reverse x direction
-            point[0] = max(min(point[0], 1.0), -1.0)  # Keep within bounds
-        if abs(point[1]) > 1.0:
-            point[3] *= -1  # Reverse y direction
-            point[1] = max(min(point[1], 1.0), -1.0)  # Keep within bounds
-
-def display():
+    points.step()  # Update position for all points and bounce from screen edges
+
+def advance(dt):
+    """Runs as many fixed simulation steps as fit into the elapsed time dt (seconds)."""
+    global accumulator
+    accumulator += min(dt, MAX_FRAME_TIME)
+    while accumulator >= STEP_TIME:
+        update_points()
+        accumulator -= STEP_TIME
+
+def render_alpha():
+    # Fraction of the next step already elapsed, used to interpolate positions when drawing
+    if is_frozen:
+        return 1.0
+    return accumulator / STEP_TIME
+
+def timer(value):
+    global last_time
+    now = time.perf_counter()
+    advance(now - last_time)
+    last_time = now
+    glutPostRedisplay()
+    # Sleep in the event loop until the next frame is due instead of spinning in an idle callback
+    delay = 1.0 / TARGET_FPS - (time.perf_counter() - now)
+    glutTimerFunc(max(0, int(delay * 1000)), timer, 0)
+
+def render():
     glClear(GL_COLOR_BUFFER_BIT)
     glClearColor(0.0, 0.0, 0.0, 1.0)
 
     glPointSize(5.0)  # Draw points
-    glBegin(GL_POINTS)
-    current_time = time.time()
-    for point in points:  # Handle blinking with 1-second transition
-        if point[5]:  # If point should blink
-            blink_time = (current_time - point[6]) % 2.0  # 2-second cycle
-            if blink_time < 1.0:  # Show point for 1 second
-                glColor3f(*point[4])
-                glVertex2f(point[0], point[1])
-        else:  # If not blinking, always show
-            glColor3f(*point[4])
-            glVertex2f(point[0], point[1])
-    glEnd()
-    glutSwapBuffers()
+    points.draw(time.time(), render_alpha())  # Blinking points are shown for 1 second of every 2-second cycle
 
+def display():
+    render()
+    glutSwapBuffers()
 
-glutInit()
-glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB)
-glutInitWindowSize(800, 800)
-glutCreateWindow(b"Amazing Box")
-
-glutDisplayFunc(display)
-glutIdleFunc(lambda: (update_points(), glutPostRedisplay()))
-glutMouseFunc(mouse)
-glutKeyboardFunc(keyboard)
-glutSpecialFunc(keyboard_special)
-gluOrtho2D(-1, 1, -1, 1)
-
-glutMainLoop()
\ No newline at end of file
+def reshape(w, h):
+    glViewport(0, 0, w, h)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluOrtho2D(-1, 1, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+
+
+if __name__ == "__main__":
+    glutInit()
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB)
+    glutInitWindowSize(800, 800)
+    glutCreateWindow(b"Amazing Box")
+
+    glutDisplayFunc(display)
+    glutReshapeFunc(reshape)
+    last_time = time.perf_counter()
+    glutTimerFunc(0, timer, 0)
+    glutMouseFunc(mouse)
+    glutKeyboardFunc(keyboard)
+    glutSpecialFunc(keyboard_special)
+
+    glutMainLoop()
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Shared helpers for the tests.
+
+PyOpenGL reads its PYOPENGL_* flags once, when OpenGL is first imported, so
+every check that needs a GL context runs in a fresh process (see run_gl).
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PRELUDE = '''
+import headless
+runner = headless.HeadlessRunner(%r)
+from OpenGL.GL import *
+'''
+
+
+def _run_gl(source, demo='random_ball', **flags):
+    """Runs source on the demo's headless context with PYOPENGL_<flag>=<value>; returns stdout.
+
+    Fails the calling test if the process exits non-zero (including a crash).
+    """
+    environ = dict(os.environ)
+    environ.update(('PYOPENGL_%s' % name, str(value)) for name, value in flags.items())
+    process = subprocess.run(
+        [sys.executable, '-c', PRELUDE % (demo,) + textwrap.dedent(source)],
+        cwd=ROOT, env=environ, capture_output=True, text=True, timeout=300,
+    )
+    if process.returncode:
+        pytest.fail('GL check exited with %s:\n%s%s' % (process.returncode, process.stdout, process.stderr))
+    return process.stdout
+
+
+@pytest.fixture
+def run_gl():
+    return _run_gl
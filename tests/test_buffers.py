@@ -0,0 +1,72 @@
+"""Buffer-protocol objects passed to GL through OpenGL.arrays.buffers.BufferHandler."""
+
+UPLOAD = '''
+        import array, mmap
+        import numpy as np
+        from OpenGL.arrays import ArrayDatatype
+        values = array.array('f', [1.5, 2.5, 3.5, 4.5])
+        def upload(data):
+            glBindBuffer(GL_ARRAY_BUFFER, glGenBuffers(1))
+            size = ArrayDatatype.arrayByteCount(data)
+            glBufferData(GL_ARRAY_BUFFER, size, data, GL_STATIC_DRAW)
+            stored = np.frombuffer(glGetBufferSubData(GL_ARRAY_BUFFER, 0, size), 'f').tolist()
+            print(type(ArrayDatatype.getHandler(data)).__name__, ArrayDatatype.arraySize(data), stored)
+'''
+
+
+def test_buffer_objects_round_trip(run_gl, tmp_path):
+    path = tmp_path / 'values.bin'
+    output = run_gl(UPLOAD + '''
+        writable = mmap.mmap(-1, 16)
+        writable.write(values.tobytes())
+        with open(%r, 'wb') as f:
+            f.write(values.tobytes())
+        with open(%r, 'rb') as f:
+            readonly = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        upload(values)
+        upload(memoryview(values))
+        upload(memoryview(values.tobytes()))
+        upload(writable)
+        upload(readonly)
+        upload(memoryview(values)[::2])
+    ''' % (str(path), str(path)))
+    stored = '[1.5, 2.5, 3.5, 4.5]'
+    assert output.split('\n')[:6] == [
+        'BufferHandler 4 ' + stored,
+        'BufferHandler 4 ' + stored,
+        'BufferHandler 16 ' + stored,
+        'BufferHandler 16 ' + stored,
+        'BufferHandler 16 ' + stored,
+        'BufferHandler 2 [1.5, 3.5]',
+    ]
+
+
+def test_contiguous_buffers_are_not_copied(run_gl):
+    output = run_gl(UPLOAD + '''
+        from OpenGL.arrays.buffers import BufferHandler
+        address = values.buffer_info()[0]
+        print(BufferHandler.dataPointer(BufferHandler.asArray(values, GL_FLOAT)) == address)
+        print(BufferHandler.dataPointer(BufferHandler.asArray(memoryview(values)[1:], GL_FLOAT)) == address + 4)
+        strided = BufferHandler.asArray(memoryview(values)[::2], GL_FLOAT)
+        print(strided.c_contiguous, BufferHandler.dataPointer(strided) != address)
+    ''')
+    assert output.split('\n')[:3] == ['True', 'True', 'True True']
+
+
+def test_typed_buffer_is_converted(run_gl):
+    output = run_gl(UPLOAD + '''
+        glMatrixMode(GL_MODELVIEW)
+        glLoadMatrixf(array.array('i', [2, 0, 0, 0, 0, 3, 0, 0, 0, 0, 4, 0, 0, 0, 0, 1]))
+        print(glGetFloatv(GL_MODELVIEW_MATRIX).diagonal().tolist())
+    ''')
+    assert output.split('\n')[0] == '[2.0, 3.0, 4.0, 1.0]'
+
+
+def test_float_buffer_is_truncated_for_integer_types(run_gl):
+    output = run_gl(UPLOAD + '''
+        from OpenGL.arrays.buffers import BufferHandler
+        print(BufferHandler.asArray(array.array('d', [1.5, 2.0, -3.7]), GL_INT).tolist())
+        print(BufferHandler.asArray(memoryview(values), GL_UNSIGNED_SHORT).tolist())
+        print(np.array([1.5, 2.0, -3.7]).astype('i').tolist())
+    ''')
+    assert output.split('\n')[:3] == ['[1, 2, -3]', '[1, 2, 3, 4]', '[1, 2, -3]']
@@ -0,0 +1,59 @@
+"""Error attribution with PYOPENGL_DEFERRED_ERROR_CHECKING."""
+
+
+def test_error_names_oldest_recorded_call(run_gl):
+    output = run_gl('''
+        from OpenGL import error
+        glFinish()
+        glEnable(0x9999)
+        glLoadIdentity()
+        try:
+            glFinish()
+        except error.GLError as err:
+            print(err.baseOperation.__name__, err.syncPoint.__name__, err.droppedCalls, len(err.recentCalls))
+    ''', DEFERRED_ERROR_CHECKING='1')
+    assert output.split('\n')[0] == 'glEnable glFinish 0 3'
+
+
+def test_overflowed_history_names_sync_point(run_gl):
+    # the failing glEnable is pushed out of the history by later calls, so
+    # none of the recorded (innocent) calls may be blamed for it
+    output = run_gl('''
+        from OpenGL import error
+        glFinish()
+        glEnable(0x9999)
+        for i in range(40):
+            glLoadIdentity()
+        try:
+            glFinish()
+        except error.GLError as err:
+            print(err.baseOperation.__name__, err.droppedCalls > 0, len(err.recentCalls))
+            print('may not be in recentCalls' in str(err))
+        glEnable(0x9999)
+        try:
+            glFinish()
+        except error.GLError as err:
+            print(err.baseOperation.__name__, err.droppedCalls)
+    ''', DEFERRED_ERROR_CHECKING='1')
+    assert output.split('\n')[:3] == ['glFinish True 16', 'True', 'glEnable 0']
+
+
+def test_headless_frame_is_a_sync_point(run_gl):
+    # the synchronous readback never calls glFinish, each frame must still
+    # report its own errors
+    output = run_gl('''
+        from OpenGL import error
+        render = runner.module.render
+        def failing():
+            render()
+            glEnable(0x9999)
+        runner.module.render = failing
+        try:
+            runner.frame(1.0 / 60)
+        except error.GLError as err:
+            print(err.syncPoint.__name__)
+        runner.module.render = render
+        runner.frame(1.0 / 60)
+        print('clean')
+    ''', DEFERRED_ERROR_CHECKING='1')
+    assert output.split('\n')[:2] == ['frame', 'clean']
@@ -0,0 +1,26 @@
+"""Frame readback in headless.HeadlessRunner."""
+import pytest
+
+
+@pytest.mark.parametrize('buffers', [0, 3])
+def test_odd_width_frames_are_not_skewed(run_gl, buffers):
+    # 5 * 3 bytes per row is not a multiple of the default pack alignment of 4
+    output = run_gl('''
+        import numpy as np
+        glPixelStorei(GL_PACK_ALIGNMENT, 4)
+        def render():
+            glClearColor(0, 0, 0, 1)
+            glClear(GL_COLOR_BUFFER_BIT)
+            glEnable(GL_SCISSOR_TEST)
+            glScissor(0, 0, 2, 3)
+            glClearColor(1, 0, 0, 1)
+            glClear(GL_COLOR_BUFFER_BIT)
+            glDisable(GL_SCISSOR_TEST)
+        runner.module.render = render
+        runner.width, runner.height = 5, 3
+        images = []
+        runner.run(2, on_frame=lambda index, image: images.append(image[:, :, 0].tolist()), buffers=%d)
+        print(images)
+    ''' % (buffers,))
+    red = [255, 255, 0, 0, 0]
+    assert output.split('\n')[0] == str([[red] * 3] * 2)
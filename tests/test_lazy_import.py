@@ -0,0 +1,37 @@
+"""OpenGL.GL star-imports with and without PYOPENGL_LAZY_GL_IMPORT."""
+import json
+
+import pytest
+
+CORE_NAMES = '''
+        import json
+        from OpenGL.GL import lazyimport
+        from OpenGL.GL.VERSION import GL_1_1
+        namespace = {}
+        exec('from OpenGL.GL import *', namespace)
+        core = lazyimport._public(GL_1_1)
+        print(json.dumps(sorted(name for name in core if name in namespace)))
+        print(json.dumps(sorted(name for name in core if name not in namespace)))
+'''
+
+
+def core_names(run_gl, lazy):
+    provided, missing = run_gl(CORE_NAMES, LAZY_GL_IMPORT=lazy).split('\n')[:2]
+    return json.loads(provided), json.loads(missing)
+
+
+def test_lazy_star_import_provides_the_core(run_gl):
+    eager, eager_missing = core_names(run_gl, '0')
+    lazy, lazy_missing = core_names(run_gl, '1')
+    assert lazy_missing == [] and eager_missing == []
+    assert lazy == eager
+    assert 'glGetPointerv' in lazy
+
+
+@pytest.mark.parametrize('name', ['glGetPointerv', 'glGenBuffers'])
+def test_lazy_attribute_lookup(run_gl, name):
+    output = run_gl('''
+        from OpenGL import GL
+        print(callable(GL.%s))
+    ''' % (name,), LAZY_GL_IMPORT='1')
+    assert output.split('\n')[0] == 'True'
@@ -0,0 +1,73 @@
+"""Exactness of catch_the_diamond's vectorized line_raster against the scalar draw_line_midpoint."""
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import ROOT
+
+os.environ.setdefault('PYOPENGL_PLATFORM', 'egl')
+sys.path.insert(0, os.path.join(ROOT, 'catch_the_diamond'))
+import catch_the_diamond  # noqa: E402
+import line_raster  # noqa: E402
+
+
+@pytest.fixture
+def scalar_line(monkeypatch):
+    """draw_line_midpoint in scalar mode, returning the drawn points in order."""
+    points = []
+    monkeypatch.setattr(catch_the_diamond, 'BATCHED_RASTERIZER', False)
+    monkeypatch.setattr(catch_the_diamond, 'draw_point', lambda x, y: points.append((int(round(x)), int(round(y)))))
+
+    def draw(x1, y1, x2, y2):
+        del points[:]
+        catch_the_diamond.draw_line_midpoint(x1, y1, x2, y2)
+        return np.array(points, dtype=np.int64).reshape(-1, 2)
+    return draw
+
+
+# one segment per zone (0-7) from the origin, plus the diagonals between zones
+ZONE_SEGMENTS = [
+    (0, 0, 10, 3), (0, 0, 3, 10), (0, 0, -3, 10), (0, 0, -10, 3),
+    (0, 0, -10, -3), (0, 0, -3, -10), (0, 0, 3, -10), (0, 0, 10, -3),
+    (0, 0, 7, 7), (0, 0, -7, 7), (0, 0, -7, -7), (0, 0, 7, -7),
+]
+DEGENERATE_SEGMENTS = [
+    (5, 5, 5, 5), (0, 0, 0, 9), (0, 9, 0, 0), (0, 0, 9, 0), (9, 0, 0, 0),
+    (0, 0, 1, 1), (0, 0, 1, 0), (2.4, 3.6, 2.6, 3.4), (-0.5, 1.5, 4.5, -2.5),
+]
+
+
+@pytest.mark.parametrize('segment', ZONE_SEGMENTS)
+def test_zones(scalar_line, segment):
+    dx, dy = segment[2] - segment[0], segment[3] - segment[1]
+    if abs(dx) != abs(dy):
+        assert line_raster.find_zones(dx, dy) == catch_the_diamond.find_zone(*segment)
+    for forward in (segment, segment[2:] + segment[:2]):
+        np.testing.assert_array_equal(line_raster.rasterize_line(*forward), scalar_line(*forward))
+
+
+@pytest.mark.parametrize('segment', DEGENERATE_SEGMENTS)
+def test_degenerate_segments(scalar_line, segment):
+    np.testing.assert_array_equal(line_raster.rasterize_line(*segment), scalar_line(*segment))
+
+
+def test_random_segments(scalar_line):
+    rng = random.Random(2024)
+    segments = [tuple(rng.uniform(-300, 300) for i in range(4)) for j in range(500)]
+    segments += [tuple(rng.randint(-20, 20) for i in range(4)) for j in range(500)]
+    expected = [scalar_line(*segment) for segment in segments]
+    for segment, points in zip(segments, expected):
+        np.testing.assert_array_equal(line_raster.rasterize_line(*segment), points)
+    # the batch is the concatenation of the single segments
+    batch = line_raster.rasterize_segments(*zip(*segments))
+    np.testing.assert_array_equal(batch, np.concatenate(expected))
+
+
+def test_polygon_is_its_closed_outline(scalar_line):
+    vertices = [(0, 0), (40, 5), (25, 30), (-10, 18)]
+    edges = zip(vertices, vertices[1:] + vertices[:1])
+    expected = np.concatenate([scalar_line(a[0], a[1], b[0], b[1]) for a, b in edges])
+    np.testing.assert_array_equal(line_raster.rasterize_polygon(vertices), expected)
@@ -0,0 +1,53 @@
+"""Nested list conversion in OpenGL.arrays.lists.ListHandler."""
+import pytest
+
+CONVERT = '''
+        from OpenGL.arrays.lists import ListHandler
+        def convert(value, typeCode):
+            try:
+                result = ListHandler.asArray(value, typeCode)
+            except (TypeError, ValueError) as err:
+                return '%s %s' % (type(err).__name__, err.args[0])
+            return '%s %s' % (type(result).__name__, list(result))
+'''
+
+
+@pytest.mark.parametrize('rows', [2, 70])  # below and above NUMPY_THRESHOLD
+def test_ragged_list_raises_value_error(run_gl, rows):
+    output = run_gl(CONVERT + '''
+        print(convert([[1.0, 2.0]] * (%d - 1) + [[3.0]], GL_FLOAT))
+    ''' % (rows,))
+    assert output.split('\n')[0] == 'ValueError Non-uniform array encountered, expected (%d, 2)' % (rows,)
+
+
+def test_empty_list_gives_empty_array(run_gl):
+    output = run_gl(CONVERT + '''
+        print(convert([], GL_FLOAT))
+        print(convert([], GL_UNSIGNED_BYTE))
+    ''')
+    assert output.split('\n')[:2] == ['c_float_Array_0 []', 'c_ubyte_Array_0 []']
+
+
+@pytest.mark.parametrize('rows', [2, 70])
+def test_nested_values_match_ctypes(run_gl, rows):
+    output = run_gl(CONVERT + '''
+        import ctypes
+        value = [[float(i), i + 0.5, -i] for i in range(%d)]
+        result = ListHandler.asArray(value, GL_FLOAT)
+        expected = ((ctypes.c_float * 3) * len(value))(*[(ctypes.c_float * 3)(*row) for row in value])
+        print(type(result).__name__, bytes(result) == bytes(expected))
+    ''' % (rows,))
+    assert output.split('\n')[0] == 'c_float_Array_3_Array_%d True' % (rows,)
+
+
+def test_packer_rejects_fall_back_to_ctypes(run_gl):
+    # out-of-range integers wrap and floats for integer types fail the way
+    # the ctypes constructor handles them
+    output = run_gl(CONVERT + '''
+        print(convert([300, 1, -1], GL_UNSIGNED_BYTE))
+        print(convert([1.5, 2], GL_INT))
+    ''')
+    assert output.split('\n')[:2] == [
+        'c_ubyte_Array_3 [44, 1, 255]',
+        "TypeError 'float' object cannot be interpreted as an integer",
+    ]
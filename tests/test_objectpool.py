@@ -0,0 +1,36 @@
+"""VBO buffer names from OpenGL.objectpool with PYOPENGL_OBJECT_POOL."""
+
+
+def test_resized_vbo_returns_to_its_size_class(run_gl):
+    output = run_gl('''
+        import gc
+        import numpy as np
+        from OpenGL import objectpool
+        from OpenGL.arrays import vbo
+        pool = objectpool.getPool()
+        for explicit in (True, False):
+            buffer = vbo.VBO(np.zeros(16, 'f'))
+            with buffer:
+                pass
+            buffer.set_array(np.zeros(4096, 'f'))
+            if explicit:
+                buffer.delete()
+            else:
+                del buffer
+                gc.collect()
+        print(sorted(key for (kind, key), names in pool.pooled.items() if names and key))
+    ''', OBJECT_POOL='1')
+    assert output.split('\n')[0] == '[256]'
+
+
+def test_headless_frame_deletes_pending_names(run_gl):
+    output = run_gl('''
+        from OpenGL import objectpool
+        pool = objectpool.getPool()
+        for i in range(3):
+            pool.discard('buffer', pool.acquire('buffer'))
+        print(pool.counters()['pending'])
+        runner.frame(1.0 / 60)
+        print(pool.counters()['pending'], pool.stats['deleted'])
+    ''', OBJECT_POOL='1')
+    assert output.split('\n')[:2] == ['3', '0 3']
@@ -0,0 +1,49 @@
+"""Asynchronous frame readback through OpenGL.GL.PixelReadPipeline."""
+import pytest
+
+FRAMES = '''
+        import numpy as np
+        def frames(pipeline, count, out=None):
+            seen = []
+            def record(image):
+                if image is not None:
+                    seen.append(int(np.asarray(image)[0, 0, 0]))
+            for frame in range(count):
+                glClearColor(frame / 255.0, 0, 0, 1)
+                glClear(GL_COLOR_BUFFER_BIT)
+                record(pipeline.read(out))
+            early = list(seen)
+            for image in pipeline.drain(out):
+                record(image)
+            return early, seen
+'''
+
+
+@pytest.mark.parametrize('mode', ['persistent', 'map_range', 'sync'])
+@pytest.mark.parametrize('buffers', [1, 2, 3])
+def test_frames_arrive_in_order(run_gl, mode, buffers):
+    output = run_gl(FRAMES + '''
+        pipeline = PixelReadPipeline(4, 4, GL_RGB, GL_UNSIGNED_BYTE, buffers=%d, mode=%r)
+        early, seen = frames(pipeline, 6)
+        print(early)
+        print(seen)
+        print(pipeline.pending, pipeline.stats['reads'], pipeline.stats['fetches'])
+        pipeline.delete()
+    ''' % (buffers, mode))
+    assert output.split('\n')[:3] == [
+        str(list(range(6 - (buffers - 1)))),
+        str(list(range(6))),
+        '[] 6 6',
+    ]
+
+
+def test_drain_into_passed_array(run_gl):
+    output = run_gl(FRAMES + '''
+        pipeline = PixelReadPipeline(4, 4, GL_RGB, GL_UNSIGNED_BYTE, buffers=3)
+        out = np.zeros((4, 4, 3), np.uint8)
+        early, seen = frames(pipeline, 4, out)
+        print(seen, out[0, 0].tolist())
+        print(list(pipeline.drain()), pipeline.read(out) is None)
+        pipeline.delete()
+    ''')
+    assert output.split('\n')[:2] == ['[0, 1, 2, 3] [3, 0, 0]', '[] True']
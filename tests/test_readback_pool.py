@@ -0,0 +1,29 @@
+"""glGetTexImage/glReadPixels destination arrays with PYOPENGL_READBACK_POOL."""
+import pytest
+
+
+@pytest.mark.parametrize('pool', ['0', '1'])
+def test_get_tex_image_follows_copy_tex_image_resize(run_gl, pool):
+    # glCopyTexImage2D re-specifies the level without going through the
+    # glTexImage* wrappers; the read must still get a 32x32 destination
+    output = run_gl('''
+        import numpy as np
+        texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, 2, 2, 0, GL_RGBA, GL_UNSIGNED_BYTE, np.zeros((2, 2, 4), np.uint8))
+        print(glGetTexImage(GL_TEXTURE_2D, 0, GL_RGBA, GL_UNSIGNED_BYTE, outputType=None).shape)
+        glCopyTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, 0, 0, 32, 32, 0)
+        print(glGetTexImage(GL_TEXTURE_2D, 0, GL_RGBA, GL_UNSIGNED_BYTE, outputType=None).shape)
+        print(len(glGetTexImage(GL_TEXTURE_2D, 0, GL_RGBA, GL_UNSIGNED_BYTE)))
+    ''', READBACK_POOL=pool)
+    assert output.split('\n')[:3] == ['(2, 2, 4)', '(32, 32, 4)', str(32 * 32 * 4)]
+
+
+def test_pooled_read_pixels_reuses_array(run_gl):
+    output = run_gl('''
+        first = glReadPixels(0, 0, 8, 8, GL_RGB, GL_UNSIGNED_BYTE, outputType=None)
+        second = glReadPixels(0, 0, 8, 8, GL_RGB, GL_UNSIGNED_BYTE, outputType=None)
+        other = glReadPixels(0, 0, 4, 8, GL_RGB, GL_UNSIGNED_BYTE, outputType=None)
+        print(first is second, other is first, other.shape)
+    ''', READBACK_POOL='1')
+    assert output.split('\n')[0] == 'True False (4, 8, 3)'
@@ -0,0 +1,33 @@
+"""Batched, memoized shader compilation in OpenGL.GL.shaders."""
+
+VARIANTS = '''
+        from OpenGL.GL import shaders
+        VS = "#version 120\\nvoid main(){gl_Position=ftransform(); gl_FrontColor = gl_Color;}\\n"
+        FS = "#version 120\\nvoid main(){gl_FragColor=gl_Color * %d.0;}\\n"
+        programs = [[(VS, GL_VERTEX_SHADER), (FS % i, GL_FRAGMENT_SHADER)] for i in range(8)]
+'''
+
+
+def test_batch_compiles_shared_shader_once(run_gl):
+    output = run_gl(VARIANTS + '''
+        built = shaders.compilePrograms(*programs)
+        memo = shaders.getShaderMemo()
+        print(memo.stats['misses'], memo.stats['hits'], len(memo.names))
+        print(all(glGetProgramiv(program, GL_LINK_STATUS) for program in built))
+        vertex = set()
+        for program in built:
+            attached = glGetAttachedShaders(program)
+            vertex.update(s for s in attached if glGetShaderiv(s, GL_SHADER_TYPE) == GL_VERTEX_SHADER)
+        print(len(vertex))
+    ''')
+    assert output.split('\n')[:3] == ['9 7 9', 'True', '1']
+
+
+def test_second_batch_is_fully_memoized(run_gl):
+    output = run_gl(VARIANTS + '''
+        shaders.compilePrograms(*programs)
+        shaders.compilePrograms(*programs)
+        memo = shaders.getShaderMemo()
+        print(memo.stats['misses'], memo.stats['hits'], len(memo.names))
+    ''')
+    assert output.split('\n')[0] == '9 23 9'
@@ -0,0 +1,81 @@
+"""glGet* answers from OpenGL.GL.statecache with PYOPENGL_STATE_CACHE."""
+import pytest
+
+
+@pytest.mark.parametrize('lazy', ['0', '1'])
+def test_texture_matrix_follows_active_texture(run_gl, lazy):
+    output = run_gl('''
+        from OpenGL import GL
+        GL.glMatrixMode(GL.GL_TEXTURE)
+        GL.glActiveTexture(GL.GL_TEXTURE1)
+        GL.glLoadIdentity()
+        GL.glScaled(2, 2, 2)
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glLoadIdentity()
+        print(GL.glGetDoublev(GL.GL_TEXTURE_MATRIX).diagonal().tolist())
+        GL.glActiveTexture(GL.GL_TEXTURE1)
+        print(GL.glGetDoublev(GL.GL_TEXTURE_MATRIX).diagonal().tolist())
+        GL.glPushMatrix()
+        print(GL.glGetIntegerv(GL.GL_TEXTURE_STACK_DEPTH))
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        print(GL.glGetIntegerv(GL.GL_TEXTURE_STACK_DEPTH))
+    ''', STATE_CACHE='1', LAZY_GL_IMPORT=lazy)
+    assert output.split('\n')[:4] == ['[1.0, 1.0, 1.0, 1.0]', '[2.0, 2.0, 2.0, 1.0]', '2', '1']
+
+
+def test_texture_matrix_follows_active_texture_arb(run_gl):
+    output = run_gl('''
+        from OpenGL.GL.ARB.multitexture import glActiveTextureARB
+        glMatrixMode(GL_TEXTURE)
+        glActiveTextureARB(GL_TEXTURE1)
+        glLoadIdentity()
+        glScaled(3, 3, 3)
+        glActiveTextureARB(GL_TEXTURE0)
+        glLoadIdentity()
+        print(glGetDoublev(GL_TEXTURE_MATRIX)[0, 0])
+        glActiveTextureARB(GL_TEXTURE1)
+        print(glGetDoublev(GL_TEXTURE_MATRIX)[0, 0])
+    ''', STATE_CACHE='1')
+    assert output.split('\n')[:2] == ['1.0', '3.0']
+
+
+def test_viewport_and_projection_invalidation(run_gl):
+    output = run_gl('''
+        from OpenGL.GLU import gluOrtho2D, gluProject
+        from OpenGL.GL import statecache
+        glViewport(0, 0, 100, 50)
+        print(glGetIntegerv(GL_VIEWPORT).tolist(), glGetIntegerv(GL_VIEWPORT).tolist())
+        glViewport(0, 0, 30, 20)
+        print(glGetIntegerv(GL_VIEWPORT).tolist())
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        gluOrtho2D(0, 30, 0, 20)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        print(round(gluProject(15, 10, 0)[0], 3))
+        glTranslatef(1, 0, 0)
+        print(round(gluProject(15, 10, 0)[0], 3))
+        print(statecache.report()['hits'] > 0)
+    ''', STATE_CACHE='1')
+    assert output.split('\n')[:5] == ['[0, 0, 100, 50] [0, 0, 100, 50]', '[0, 0, 30, 20]', '15.0', '16.0', 'True']
+
+
+@pytest.mark.parametrize('lazy', ['0', '1'])
+def test_indexed_viewport_invalidation(run_gl, lazy):
+    output = run_gl('''
+        from OpenGL import GL
+        from OpenGL.GL.ARB import viewport_array
+        GL.glViewport(0, 0, 100, 50)
+        print(GL.glGetIntegerv(GL.GL_VIEWPORT).tolist())
+        GL.glViewportIndexedf(0, 0, 0, 30, 20)
+        print(GL.glGetIntegerv(GL.GL_VIEWPORT).tolist())
+        GL.glViewportIndexedfv(0, [0, 0, 40, 20])
+        print(GL.glGetIntegerv(GL.GL_VIEWPORT).tolist())
+        GL.glViewportArrayv(0, 1, [0, 0, 50, 20])
+        print(GL.glGetIntegerv(GL.GL_VIEWPORT).tolist())
+        viewport_array.glViewportIndexedf(0, 0, 0, 60, 20)
+        print(GL.glGetIntegerv(GL.GL_VIEWPORT).tolist())
+    ''', STATE_CACHE='1', LAZY_GL_IMPORT=lazy)
+    assert output.split('\n')[:5] == [
+        '[0, 0, 100, 50]', '[0, 0, 30, 20]', '[0, 0, 40, 20]', '[0, 0, 50, 20]', '[0, 0, 60, 20]',
+    ]
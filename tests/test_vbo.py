@@ -0,0 +1,47 @@
+"""Dirty-range uploads from OpenGL.arrays.vbo.VBO.__setitem__."""
+import pytest
+
+READ_BACK = '''
+        import numpy as np
+        from OpenGL.arrays import vbo
+        def contents(buffer):
+            with buffer:
+                data = glGetBufferSubData(GL_ARRAY_BUFFER, 0, buffer.size)
+            return np.frombuffer(data, 'f').reshape(buffer.data.shape).tolist()
+'''
+
+
+@pytest.mark.parametrize('layout', [
+    'np.arange(200, dtype="f").reshape(100, 2)',
+    'np.arange(400, dtype="f").reshape(200, 2)[::2]',
+    'np.asfortranarray(np.arange(200, dtype="f").reshape(100, 2))',
+])
+def test_dirty_rows_reach_buffer(run_gl, layout):
+    output = run_gl(READ_BACK + '''
+        data = %s
+        buffer = vbo.VBO(data)
+        with buffer:
+            pass
+        buffer[2:4] = np.array([[-1, -2], [-3, -4]], 'f')
+        buffer[80:81] = np.array([[-5, -6]], 'f')
+        print(contents(buffer) == data.tolist(), buffer.stats['uploads'], buffer.stats['full_uploads'])
+    ''' % (layout,))
+    assert output.split('\n')[0] == 'True 2 1'
+
+
+def test_nearby_writes_coalesce(run_gl):
+    # 8-byte rows, merge_gap 64 bytes: rows 10-11 and 14 merge, row 60 stays apart
+    output = run_gl(READ_BACK + '''
+        data = np.zeros((100, 2), 'f')
+        buffer = vbo.VBO(data)
+        with buffer:
+            pass
+        buffer[14:15] = np.array([[3, 3]], 'f')
+        buffer[10:12] = np.array([[1, 1], [2, 2]], 'f')
+        buffer[60:61] = np.array([[4, 4]], 'f')
+        print(buffer._copy_segments)
+        print(contents(buffer) == data.tolist(), buffer.stats['uploads'], buffer.stats['calls_saved'])
+        buffer[0:60] = np.ones((60, 2), 'f')
+        print(buffer.copied, contents(buffer) == data.tolist(), buffer.stats['orphans'], buffer.stats['full_uploads'])
+    ''')
+    assert output.split('\n')[:3] == ['[(80, 120), (480, 488)]', 'True 2 1', 'False True 1 2']
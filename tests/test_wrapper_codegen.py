@@ -0,0 +1,91 @@
+"""Generated wrapper call functions with PYOPENGL_WRAPPER_CODEGEN.
+
+Each check runs once with the generic Wrapper call pipeline and once with the
+generated functions, and the last line of output (a repr of the results)
+must be the same.
+"""
+import pytest
+
+CALLS = '''
+        import numpy as np
+        from OpenGL import GL
+        results = []
+        def plain(value):
+            if isinstance(value, (tuple, list)):
+                return [plain(item) for item in value]
+            return value.tolist() if hasattr(value, 'tolist') else value
+        def record(call):
+            try:
+                value = call()
+            except Exception as err:
+                value = (type(err).__name__, str(err.args[0]) if err.args else '')
+            results.append(plain(value))
+'''
+
+# output arrays, created or passed in; optional NULL output arguments
+OUTPUTS = CALLS + '''
+        record(lambda: glGetIntegerv(GL_VIEWPORT))
+        record(lambda: glGetDoublev(GL_MODELVIEW_MATRIX))
+        record(lambda: glGenTextures(2))
+        record(lambda: glGenBuffers(1))
+        passed = np.zeros(4, 'i')
+        record(lambda: glGetIntegerv(GL_VIEWPORT, passed) is passed)
+        record(lambda: passed)
+        record(lambda: glReadPixels(0, 0, 2, 2, GL_RGB, GL_UNSIGNED_BYTE))
+        record(lambda: GL.glGetIntegerv._finalCall.__code__.co_filename.startswith('<wrapper'))
+        print(repr(results))
+'''
+
+# cResolvers (glShaderSource) and single and MultiReturn returnValues
+RESOLVERS = CALLS + '''
+        shader = glCreateShader(GL_VERTEX_SHADER)
+        record(lambda: glShaderSource(shader, ['#version 120\\n', 'uniform float scale;\\n', 'void main(){gl_Position=ftransform()*scale;}\\n']))
+        glCompileShader(shader)
+        record(lambda: glGetShaderiv(shader, GL_COMPILE_STATUS))
+        record(lambda: glGetShaderSource(shader))
+        program = glCreateProgram()
+        glAttachShader(program, shader)
+        glLinkProgram(program)
+        record(lambda: glGetProgramInfoLog(program))
+        record(lambda: glGetActiveUniformName(program, 0, 32))
+        record(lambda: glGetActiveUniform(program, 0))
+        print(repr(results))
+'''
+
+# failing conversions are re-run through the generic function
+FAILURES = CALLS + '''
+        class Opaque(object):
+            def __repr__(self):
+                return 'Opaque()'
+        record(lambda: glVertexPointer(2, GL_FLOAT, 0, Opaque()))
+        record(lambda: glGetIntegerv())
+        record(lambda: glGetIntegerv(GL_VIEWPORT, 'not an array'))
+        record(lambda: glShaderSource(glCreateShader(GL_VERTEX_SHADER), 5))
+        record(lambda: glGetIntegerv(GL_VIEWPORT))
+        print(repr(results))
+'''
+
+
+@pytest.mark.parametrize('source', [OUTPUTS, RESOLVERS, FAILURES], ids=['outputs', 'resolvers', 'failures'])
+def test_generated_calls_match_generic(run_gl, tmp_path, source):
+    generic = run_gl(source, WRAPPER_CODEGEN='0').strip().split('\n')[-1]
+    generated = run_gl(source, WRAPPER_CODEGEN='1', WRAPPER_CODEGEN_CACHE=tmp_path).strip().split('\n')[-1]
+    if source is OUTPUTS:
+        # apart from which call function glGetIntegerv uses
+        assert generic.endswith(', False]') and generated.endswith(', True]')
+        generic, generated = generic[:-len('False]')], generated[:-len('True]')]
+    assert generated == generic
+
+
+def test_generation_failure_keeps_generic_call(run_gl, tmp_path):
+    output = run_gl('''
+        from OpenGL import GL, wrappercodegen
+        def broken(key):
+            raise RuntimeError('no code for %r' % (key,))
+        wrappercodegen.source = broken
+        wrappercodegen.CACHE.builders.clear()
+        wrappercodegen.CACHE.code = {}
+        print(GL.glGetFloatv(GL.GL_VIEWPORT).tolist())
+        print(GL.glGetFloatv._finalCall.__code__.co_filename.startswith('<wrapper'))
+    ''', WRAPPER_CODEGEN='1', WRAPPER_CODEGEN_CACHE=tmp_path)
+    assert output.split('\n')[:2] == ['[0.0, 0.0, 800.0, 800.0]', 'False']